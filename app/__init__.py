@@ -2,19 +2,43 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from app.config import Config
+from app.database import RoutingSession, configure_engines, init_engines
+from app.json_provider import FastJSONProvider
 from app.schemas import ma
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
+    app.json = FastJSONProvider(app)
     
+    configure_engines(app)
     db.init_app(app)
+    init_engines(app, db)
     jwt.init_app(app)
     ma.init_app(app)
     
+    from app.services.book_service import BookService
+    from app.services.catalog_snapshot import catalog_snapshot
+    from app.services.change_feed import book_change_feed
+    from app.services.response_cache import response_cache
+    from app.services.password_hasher import password_hasher
+    from app.services.token_blocklist import token_blocklist
+    from app.services.compression import response_compressor
+    from app.services.metrics import request_metrics
+    from app.services.admission import admission_control
+    book_change_feed.init_app(app)
+    BookService.init_app(app)
+    catalog_snapshot.init_app(app)
+    response_cache.init_app(app)
+    password_hasher.init_app(app)
+    token_blocklist.init_app(app)
+    request_metrics.init_app(app)
+    admission_control.init_app(app)
+    response_compressor.init_app(app)
+    
     # Initialize API with Swagger
     from app.api import api
     api.init_app(app)
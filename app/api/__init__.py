@@ -1,3 +1,4 @@
+from flask import current_app
 from flask_restx import Api
 from app.api.auth import api as auth_ns
 from app.api.books import api as books_ns
@@ -9,5 +10,13 @@ api = Api(
     doc='/docs/'
 )
 
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    """Encode RESTX responses with the app's JSON provider instead of the stdlib"""
+    response = current_app.json.response(data)
+    response.status_code = code
+    response.headers.extend(headers or {})
+    return response
+
 api.add_namespace(auth_ns, path='/users')
 api.add_namespace(books_ns, path='/books')
@@ -1,6 +1,9 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from werkzeug.exceptions import ServiceUnavailable
 from app.services.auth_service import AuthService, ValidationError
+from app.services.password_hasher import HasherBusyError, RETRY_AFTER
 from marshmallow import ValidationError as MarshmallowValidationError
 
 api = Namespace('auth', description='Authentication operations')
@@ -24,9 +27,14 @@ user_response = api.model('UserResponse', {
 
 token_response = api.model('TokenResponse', {
     'access_token': fields.String(description='JWT access token'),
+    'refresh_token': fields.String(description='JWT refresh token for POST /users/refresh'),
     'user': fields.Nested(user_response)
 })
 
+refresh_response = api.model('RefreshResponse', {
+    'access_token': fields.String(description='New JWT access token')
+})
+
 @api.route('/signup')
 class Signup(Resource):
     @api.expect(signup_model)
@@ -43,6 +51,8 @@ class Signup(Resource):
                 api.abort(400, str(e.messages))
             else:
                 api.abort(400, str(e))
+        except HasherBusyError as e:
+            raise ServiceUnavailable(str(e), retry_after=RETRY_AFTER)
 
 @api.route('/login')
 class Login(Resource):
@@ -60,3 +70,24 @@ class Login(Resource):
                 api.abort(400, str(e.messages))
             else:
                 api.abort(401, str(e))
+        except HasherBusyError as e:
+            raise ServiceUnavailable(str(e), retry_after=RETRY_AFTER)
+
+@api.route('/refresh')
+class Refresh(Resource):
+    @api.doc(security='Bearer')
+    @jwt_required(refresh=True)
+    @api.marshal_with(refresh_response)
+    def post(self):
+        """Exchange a refresh token for a new access token"""
+        return AuthService.refresh(get_jwt_identity(), get_jwt())
+
+@api.route('/logout')
+class Logout(Resource):
+    @api.doc(security='Bearer')
+    @jwt_required(verify_type=False)
+    @api.response(204, 'Session revoked')
+    def post(self):
+        """Revoke the presented access or refresh token and its login session"""
+        AuthService.logout(get_jwt())
+        return '', 204
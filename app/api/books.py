@@ -1,7 +1,11 @@
-from flask import request
+from flask import current_app, request, stream_with_context
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.services.book_service import BookService, ValidationError
+from app.services.book_service import BookService, ValidationError, VersionConflictError, FACETS, book_filters
+from app.schemas.book_schemas import BOOK_FIELDS, BOOK_LIST_FIELDS
+from app.services.response_cache import cached_response
+from app.services.export_service import ExportService
+from app.services.import_service import ImportService, ReportedErrors
 from marshmallow import ValidationError as MarshmallowValidationError
 
 api = Namespace('books', description='Book management operations')
@@ -24,43 +28,100 @@ book_response = api.model('BookResponse', {
     'price': fields.Float(description='Book price'),
     'release_date': fields.String(description='Release date'),
     'description': fields.String(description='Book description'),
-    'created_at': fields.String(description='Creation timestamp')
+    'created_at': fields.String(description='Creation timestamp'),
+    'version': fields.Integer(description='Incremented on every update; the ETag of the book')
 })
 
 book_list_response = api.model('BookListResponse', {
     'books': fields.List(fields.Nested(book_response)),
-    'total': fields.Integer(description='Total number of books'),
+    'total': fields.Integer(description='Total number of books (null with include_total=none)'),
+    'total_estimated': fields.Boolean(description='Whether total is an estimate'),
     'pages': fields.Integer(description='Total pages'),
     'current_page': fields.Integer(description='Current page')
 })
 
+book_cursor_response = api.model('BookCursorResponse', {
+    'books': fields.List(fields.Nested(book_response)),
+    'next_cursor': fields.String(description='Cursor for the next page, null on the last page'),
+    'prev_cursor': fields.String(description='Cursor for the previous page, null on the first page'),
+    'limit': fields.Integer(description='Items per page'),
+    'total': fields.Integer(description='Total number of books (only with include_total)'),
+    'total_estimated': fields.Boolean(description='Whether total is an estimate')
+})
+
+book_bulk_update_model = api.inherit('BookBulkUpdate', book_model, {
+    'id': fields.Integer(required=True, description='ID of the book to update')
+})
+
+bulk_item_result = api.model('BulkItemResult', {
+    'index': fields.Integer(description='Position of the item in the request'),
+    'id': fields.Integer(description='Book ID'),
+    'status': fields.String(description='created, updated or deleted'),
+    'errors': fields.Raw(description='Validation errors when the item failed')
+})
+
+bulk_response = api.model('BulkResponse', {
+    'results': fields.List(fields.Nested(bulk_item_result)),
+    'succeeded': fields.Integer(description='Items applied'),
+    'failed': fields.Integer(description='Items rejected')
+})
+
+book_batch_response = api.model('BookBatchResponse', {
+    'books': fields.List(fields.Nested(book_response)),
+    'missing': fields.List(fields.Integer, description='Requested IDs that do not exist')
+})
+
+def bulk_status(result):
+    """200 when every item succeeded, 207 Multi-Status on partial failure"""
+    return 207 if result['failed'] else 200
+
 @api.route('')
 class BookList(Resource):
-    @api.marshal_with(book_list_response)
+    @api.response(200, 'Success (BookCursorResponse in cursor mode)', book_list_response)
     @api.doc(params={
         'page': 'Page number',
         'per_page': 'Items per page',
-        'author': 'Filter by author',
-        'category': 'Filter by category',
+        'cursor': 'Opaque cursor from a previous response (enables cursor mode)',
+        'limit': 'Items per page in cursor mode (enables cursor mode)',
+        'sort': 'Sort field: id, price or release_date',
+        'fields': f'Comma-separated fields to return (default: all but description); any of {", ".join(BOOK_FIELDS)}',
+        'include_total': 'Total to report: exact, estimate or none (default exact, none in cursor mode)',
+        'q': 'Full-text search over title, author, category and description',
+        'author': 'Filter by author (case-insensitive exact match)',
+        'category': 'Filter by category (case-insensitive exact match)',
         'min_price': 'Minimum price',
         'max_price': 'Maximum price',
-        'release_year': 'Filter by release year'
+        'release_year': 'Filter by release year',
+        'release_from': 'Earliest release date (YYYY-MM-DD)',
+        'release_to': 'Latest release date (YYYY-MM-DD)'
     })
+    @cached_response
     def get(self):
         """Get list of books with pagination and filters"""
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        filters = {
-            'author': request.args.get('author'),
-            'category': request.args.get('category'),
-            'min_price': request.args.get('min_price'),
-            'max_price': request.args.get('max_price'),
-            'release_year': request.args.get('release_year')
-        }
+        filters = book_filters(request.args)
+        
+        sort = request.args.get('sort', 'id')
         
         try:
-            return BookService.get_books_with_filters(page, per_page, filters)
+            fields = BookService.parse_fields(request.args.get('fields'), BOOK_LIST_FIELDS)
+            if 'cursor' in request.args or 'limit' in request.args:
+                return BookService.get_books_by_cursor(
+                    cursor=request.args.get('cursor'),
+                    limit=request.args.get('limit', 10, type=int),
+                    filters=filters,
+                    sort=sort,
+                    include_total=BookService.parse_total_mode(request.args.get('include_total'), 'none'),
+                    fields=fields
+                )
+            
+            return BookService.get_books_with_filters(
+                page, per_page, filters, sort,
+                include_total=BookService.parse_total_mode(request.args.get('include_total')),
+                fields=fields
+            )
         except (ValidationError, MarshmallowValidationError) as e:
             if isinstance(e, MarshmallowValidationError):
                 api.abort(400, str(e.messages))
@@ -68,7 +129,7 @@ class BookList(Resource):
                 api.abort(400, str(e))
 
     @api.expect(book_model)
-    @api.marshal_with(book_response, code=201)
+    @api.response(201, 'Created', book_response)
     @api.doc(security='Bearer')
     @jwt_required()
     def post(self):
@@ -84,14 +145,250 @@ class BookList(Resource):
             else:
                 api.abort(400, str(e))
 
+@api.route('/bulk')
+class BookBulk(Resource):
+    @api.expect([book_model])
+    @api.response(200, 'All items created', bulk_response)
+    @api.response(207, 'Some items failed', bulk_response)
+    @api.doc(security='Bearer')
+    @jwt_required()
+    def post(self):
+        """Create many books in one transaction (requires authentication)"""
+        try:
+            result = BookService.bulk_create_books(request.get_json())
+            return result, bulk_status(result)
+        except ValidationError as e:
+            api.abort(400, str(e))
+
+    @api.expect([book_bulk_update_model])
+    @api.response(200, 'All items updated', bulk_response)
+    @api.response(207, 'Some items failed', bulk_response)
+    @api.doc(security='Bearer')
+    @jwt_required()
+    def patch(self):
+        """Update many books in one transaction (requires authentication)"""
+        try:
+            result = BookService.bulk_update_books(request.get_json())
+            return result, bulk_status(result)
+        except ValidationError as e:
+            api.abort(400, str(e))
+
+    @api.expect([fields.Integer])
+    @api.response(200, 'All items deleted', bulk_response)
+    @api.response(207, 'Some items failed', bulk_response)
+    @api.doc(security='Bearer')
+    @jwt_required()
+    def delete(self):
+        """Delete many books by ID in one transaction (requires authentication)"""
+        try:
+            result = BookService.bulk_delete_books(request.get_json())
+            return result, bulk_status(result)
+        except ValidationError as e:
+            api.abort(400, str(e))
+
+@api.route('/batch')
+class BookBatch(Resource):
+    @api.response(200, 'Success', book_batch_response)
+    @api.doc(params={
+        'ids': 'Comma-separated book IDs; results keep this order',
+        'fields': f'Comma-separated fields to return (default: all); any of {", ".join(BOOK_FIELDS)}'
+    })
+    @cached_response
+    def get(self):
+        """Get many books by ID in one request"""
+        try:
+            return BookService.get_books_by_ids(
+                BookService.parse_book_ids(request.args.get('ids')),
+                BookService.parse_fields(request.args.get('fields'))
+            )
+        except ValidationError as e:
+            api.abort(400, str(e))
+
+    @api.expect([fields.Integer])
+    @api.response(200, 'Success', book_batch_response)
+    @api.doc(params={'fields': f'Comma-separated fields to return (default: all); any of {", ".join(BOOK_FIELDS)}'})
+    def post(self):
+        """Get many books by ID, sent as a JSON array for long lists"""
+        try:
+            return BookService.get_books_by_ids(
+                request.get_json(),
+                BookService.parse_fields(request.args.get('fields'))
+            )
+        except ValidationError as e:
+            api.abort(400, str(e))
+
+@api.route('/export')
+class BookExport(Resource):
+    @api.doc(params={
+        'format': 'ndjson (default) or csv',
+        'q': 'Full-text search over title, author, category and description',
+        'author': 'Filter by author (case-insensitive exact match)',
+        'category': 'Filter by category (case-insensitive exact match)',
+        'min_price': 'Minimum price',
+        'max_price': 'Maximum price',
+        'release_year': 'Filter by release year',
+        'release_from': 'Earliest release date (YYYY-MM-DD)',
+        'release_to': 'Latest release date (YYYY-MM-DD)'
+    })
+    def get(self):
+        """Stream every matching book as NDJSON or CSV (gzip with Accept-Encoding)"""
+        filters = book_filters(request.args)
+        fmt = request.args.get('format', 'ndjson')
+        compress = request.accept_encodings['gzip'] > 0
+        
+        try:
+            chunks, mimetype = ExportService.export_books(filters, fmt, compress)
+        except ValidationError as e:
+            api.abort(400, str(e))
+        
+        response = current_app.response_class(stream_with_context(chunks), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=books.{fmt}'
+        response.vary.add('Accept-Encoding')
+        if compress:
+            response.content_encoding = 'gzip'
+        return response
+
+import_response = api.model('ImportResponse', {
+    'rows': fields.Integer(description='Last row number read'),
+    'imported': fields.Integer(description='Books created'),
+    'failed': fields.Integer(description='Rows rejected'),
+    'seconds': fields.Float(description='Import duration'),
+    'rows_per_sec': fields.Float(description='Throughput'),
+    'errors': fields.List(fields.Raw, description='First rejected rows with their errors')
+})
+
+@api.route('/import')
+class BookImport(Resource):
+    @api.doc(security='Bearer', params={
+        'file': {'description': 'CSV or NDJSON file', 'in': 'formData', 'type': 'file'},
+        'format': 'csv or ndjson (default: from the file name)',
+        'skip': 'Rows to skip, to resume an interrupted import'
+    })
+    @api.response(200, 'Success', import_response)
+    @jwt_required()
+    def post(self):
+        """Import books from an uploaded CSV or NDJSON file (requires authentication)"""
+        upload = request.files.get('file')
+        if upload is None:
+            api.abort(400, 'Missing file upload')
+        
+        errors = ReportedErrors()
+        
+        try:
+            fmt = ImportService.detect_format(upload.filename, request.args.get('format'))
+            summary = ImportService.import_books(
+                upload.stream, fmt,
+                start_row=request.args.get('skip', 0, type=int),
+                on_error=errors
+            )
+        except ValidationError as e:
+            api.abort(400, str(e))
+        
+        return {**summary, 'errors': errors.rows()}
+
+@api.route('/search')
+class BookSearch(Resource):
+    @api.response(200, 'Success', book_list_response)
+    @api.doc(params={
+        'q': 'Search terms (prefix matched, ranked by relevance)',
+        'page': 'Page number',
+        'per_page': 'Items per page'
+    })
+    @cached_response
+    def get(self):
+        """Full-text search for books"""
+        q = request.args.get('q', '')
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        
+        try:
+            return BookService.search_books(q, page, per_page)
+        except (ValidationError, MarshmallowValidationError) as e:
+            if isinstance(e, MarshmallowValidationError):
+                api.abort(400, str(e.messages))
+            else:
+                api.abort(400, str(e))
+
+facet_value = api.model('FacetValue', {
+    'value': fields.Raw(description='Category, author, release year or price range'),
+    'count': fields.Integer(description='Matching books')
+})
+
+facets_response = api.model('FacetsResponse', {
+    'total': fields.Integer(description='Total matching books'),
+    'facets': fields.Nested(api.model('Facets', {
+        facet: fields.List(fields.Nested(facet_value)) for facet in FACETS
+    }))
+})
+
+@api.route('/facets')
+class BookFacets(Resource):
+    @api.response(200, 'Success', facets_response)
+    @api.doc(params={
+        'limit': 'Most frequent values returned per facet (default 10, max 100)',
+        'q': 'Full-text search over title, author, category and description',
+        'author': 'Filter by author (case-insensitive exact match)',
+        'category': 'Filter by category (case-insensitive exact match)',
+        'min_price': 'Minimum price',
+        'max_price': 'Maximum price',
+        'release_year': 'Filter by release year',
+        'release_from': 'Earliest release date (YYYY-MM-DD)',
+        'release_to': 'Latest release date (YYYY-MM-DD)'
+    })
+    @cached_response
+    def get(self):
+        """Book counts per category, author, release year and price range"""
+        try:
+            return BookService.get_facets(book_filters(request.args), request.args.get('limit', 10, type=int))
+        except ValidationError as e:
+            api.abort(400, str(e))
+
+price_stats_response = api.model('PriceStatsResponse', {
+    'count': fields.Integer(description='Matching books'),
+    'min': fields.Float(description='Lowest price'),
+    'max': fields.Float(description='Highest price'),
+    'mean': fields.Float(description='Mean price'),
+    'percentiles': fields.Raw(description='p25, p50, p75, p90 and p99 prices'),
+    'histogram': fields.List(fields.Raw, description='Equal-width price ranges from min to max with counts')
+})
+
+@api.route('/stats')
+class BookStats(Resource):
+    @api.response(200, 'Success', price_stats_response)
+    @api.doc(params={
+        'bins': 'Histogram buckets (default 10, max 100)',
+        'q': 'Full-text search over title, author, category and description',
+        'author': 'Filter by author (case-insensitive exact match)',
+        'category': 'Filter by category (case-insensitive exact match)',
+        'min_price': 'Minimum price',
+        'max_price': 'Maximum price',
+        'release_year': 'Filter by release year',
+        'release_from': 'Earliest release date (YYYY-MM-DD)',
+        'release_to': 'Latest release date (YYYY-MM-DD)'
+    })
+    @cached_response
+    def get(self):
+        """Price statistics for the matching books"""
+        try:
+            return BookService.get_price_stats(book_filters(request.args), request.args.get('bins', 10, type=int))
+        except ValidationError as e:
+            api.abort(400, str(e))
+
 @api.route('/<int:book_id>')
 class BookDetail(Resource):
-    @api.marshal_with(book_response)
+    @api.response(200, 'Success', book_response)
+    @api.doc(params={'fields': f'Comma-separated fields to return (default: all); any of {", ".join(BOOK_FIELDS)}'})
+    @cached_response
     def get(self, book_id):
         """Get book details by ID"""
         try:
-            book = BookService.get_book_by_id(book_id)
-            return book
+            fields = BookService.parse_fields(request.args.get('fields'))
+        except ValidationError as e:
+            api.abort(400, str(e))
+        
+        try:
+            book, version = BookService.get_versioned_book(book_id, fields)
+            return book, 200, {'ETag': BookService.book_etag(book_id, version, fields)}
         except (ValidationError, MarshmallowValidationError) as e:
             if isinstance(e, MarshmallowValidationError):
                 api.abort(400, str(e.messages))
@@ -99,29 +396,41 @@ class BookDetail(Resource):
                 api.abort(404, str(e))
 
     @api.expect(book_model)
-    @api.marshal_with(book_response)
-    @api.doc(security='Bearer')
+    @api.response(200, 'Success', book_response)
+    @api.response(412, 'The book changed since the If-Match version')
+    @api.doc(security='Bearer', params={'If-Match': {'in': 'header', 'description': 'ETag from GET /books/<id>'}})
     @jwt_required()
     def patch(self, book_id):
         """Update book (requires authentication)"""
         data = request.get_json()
         
         try:
-            book = BookService.update_book(book_id, data)
-            return book
+            versions = BookService.parse_if_match(request.headers.get('If-Match'), book_id)
+            book = BookService.update_book(book_id, data, versions)
+            return book, 200, {'ETag': BookService.book_etag(book_id, book['version'])}
+        except VersionConflictError as e:
+            return {'message': str(e)}, 412, {'ETag': BookService.book_etag(book_id, e.version)}
         except (ValidationError, MarshmallowValidationError) as e:
             if isinstance(e, MarshmallowValidationError):
                 api.abort(400, str(e.messages))
             else:
                 api.abort(400, str(e))
 
-    @api.doc(security='Bearer')
+    @api.response(412, 'The book changed since the If-Match version')
+    @api.doc(security='Bearer', params={'If-Match': {'in': 'header', 'description': 'ETag from GET /books/<id>'}})
     @jwt_required()
     def delete(self, book_id):
         """Delete book (requires authentication)"""
         try:
-            BookService.delete_book(book_id)
+            versions = BookService.parse_if_match(request.headers.get('If-Match'), book_id)
+        except ValidationError as e:
+            api.abort(400, str(e))
+        
+        try:
+            BookService.delete_book(book_id, versions)
             return {'message': 'Book deleted successfully'}, 200
+        except VersionConflictError as e:
+            return {'message': str(e)}, 412, {'ETag': BookService.book_etag(book_id, e.version)}
         except (ValidationError, MarshmallowValidationError) as e:
             if isinstance(e, MarshmallowValidationError):
                 api.abort(400, str(e.messages))
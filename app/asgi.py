@@ -0,0 +1,146 @@
+"""ASGI application serving the book read endpoints on an async stack
+
+GET /books, /books/search and /books/<id> are answered by AsyncBookService;
+every other request is handed to the regular Flask app through asgiref.
+Needs the packages in requirements-async.txt; asgi.py is the entry point.
+"""
+import re
+from urllib.parse import parse_qsl
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import BadRequest
+from werkzeug.http import parse_accept_header, parse_etags
+from app import create_app
+from app.config import Config
+from app.schemas.book_schemas import BOOK_LIST_FIELDS
+from app.services.async_book_service import async_book_service
+from app.services.book_service import BookService, ValidationError, book_filters
+from app.services.compression import response_compressor
+
+
+BOOK_DETAIL_PATH = re.compile(r'/books/(\d+)')
+
+
+async def list_books(args):
+    """(page, None): list responses carry no ETag on this path"""
+    filters = book_filters(args)
+    sort = args.get('sort', 'id')
+    fields = BookService.parse_fields(args.get('fields'), BOOK_LIST_FIELDS)
+
+    if 'cursor' in args or 'limit' in args:
+        return await async_book_service.get_books_by_cursor(
+            cursor=args.get('cursor'),
+            limit=args.get('limit', 10, type=int),
+            filters=filters,
+            sort=sort,
+            include_total=BookService.parse_total_mode(args.get('include_total'), 'none'),
+            fields=fields
+        ), None
+
+    return await async_book_service.get_books_with_filters(
+        args.get('page', 1, type=int),
+        args.get('per_page', 10, type=int),
+        filters,
+        sort,
+        include_total=BookService.parse_total_mode(args.get('include_total')),
+        fields=fields
+    ), None
+
+
+async def search_books(args):
+    return await async_book_service.search_books(
+        args.get('q', ''),
+        args.get('page', 1, type=int),
+        args.get('per_page', 10, type=int)
+    ), None
+
+
+async def get_book(book_id, args):
+    """(book, ETag) with the same tag the WSGI detail route sends, for If-Match writes"""
+    try:
+        fields = BookService.parse_fields(args.get('fields'))
+    except ValidationError as e:
+        # A bad fields= value is a 400 even though a missing book is a 404
+        raise BadRequest(str(e))
+    book, version = await async_book_service.get_versioned_book(book_id, fields)
+    return book, BookService.book_etag(book_id, version, fields)
+
+
+def resolve(path):
+    """Async handler and its not-found status for a read path, or None to fall through"""
+    if path == '/books':
+        return list_books, 400
+    if path == '/books/search':
+        return search_books, 400
+
+    match = BOOK_DETAIL_PATH.fullmatch(path)
+    if match:
+        book_id = int(match.group(1))
+        return (lambda args: get_book(book_id, args)), 404
+    return None
+
+
+def create_asgi_app(config_class=Config):
+    flask_app = create_app(config_class)
+    async_book_service.init_app(flask_app)
+    wsgi_app = WsgiToAsgi(flask_app)
+
+    async def send_json(send, scope, status, data, etag=None):
+        body = flask_app.json.encode(data)
+        headers = [(b'content-type', b'application/json'), (b'vary', b'Accept-Encoding')]
+        request_headers = dict(scope['headers'])
+
+        accept = request_headers.get(b'accept-encoding', b'').decode('latin-1')
+        encoding = response_compressor.negotiate(parse_accept_header(accept), len(body))
+
+        if etag:
+            # Same strong tag as the WSGI path, including the content-coding suffix
+            if encoding:
+                etag = f'{etag[:-1]}-{encoding}"'
+            headers += [(b'etag', etag.encode()), (b'cache-control', b'no-cache')]
+            if_none_match = parse_etags(request_headers.get(b'if-none-match', b'').decode('latin-1') or None)
+            if if_none_match.contains_weak(etag.strip('"')):
+                await send({'type': 'http.response.start', 'status': 304, 'headers': headers[1:]})
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+
+        if encoding:
+            body = response_compressor.compress(body, encoding)
+            headers.append((b'content-encoding', encoding.encode()))
+
+        headers.append((b'content-length', str(len(body)).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                BookService.start_cache_warmup(flask_app)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_book_service.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await lifespan(receive, send)
+
+        route = resolve(scope['path']) if scope['type'] == 'http' and scope['method'] == 'GET' else None
+        if route is None:
+            return await wsgi_app(scope, receive, send)
+
+        handler, error_status = route
+        args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+        with flask_app.app_context():
+            try:
+                data, etag = await handler(args)
+            except ValidationError as e:
+                return await send_json(send, scope, error_status, {'message': str(e)})
+            except BadRequest as e:
+                return await send_json(send, scope, 400, {'message': e.description})
+            await send_json(send, scope, 200, data, etag)
+
+    app.flask_app = flask_app
+    return app
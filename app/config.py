@@ -7,3 +7,110 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-string'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
+    
+    # Optional read-only database (replica, or the same SQLite file for a
+    # separate read pool); GET paths use it, writes always go to the primary
+    SQLALCHEMY_READ_DATABASE_URI = os.environ.get('READ_DATABASE_URL')
+    # Async read path (asgi.py); derived from the read/primary URL when unset
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URL')
+    
+    # Connection pools (not used by in-memory SQLite)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_READ_POOL_SIZE = int(os.environ.get('DB_READ_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
+    # SQLite connection pragmas
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', 'true').lower() == 'true'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+    
+    # Cached COUNT(*) results for paginated book lists, keyed by filter set
+    BOOK_TOTALS_CACHE_SIZE = int(os.environ.get('BOOK_TOTALS_CACHE_SIZE', 1024))
+    BOOK_TOTALS_CACHE_TTL = int(os.environ.get('BOOK_TOTALS_CACHE_TTL', 300))
+    # include_total=estimate counts exactly up to this many rows, then extrapolates
+    BOOK_TOTAL_ESTIMATE_THRESHOLD = int(os.environ.get('BOOK_TOTAL_ESTIMATE_THRESHOLD', 10000))
+    
+    # Rendered GET /books responses: memory (per worker), sqlite (shared file) or none
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 2048))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH')
+    
+    # Per-request metrics at /metrics, and the slow-query log (app.slow_queries logger)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+    SLOW_QUERY_LOG_SIZE = int(os.environ.get('SLOW_QUERY_LOG_SIZE', 100))
+    
+    # JSON encoding: orjson (used when installed) or stdlib
+    JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson')
+    
+    # Response compression negotiated from Accept-Encoding; br needs the Brotli package
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+    COMPRESSION_MIMETYPES = os.environ.get(
+        'COMPRESSION_MIMETYPES', 'application/json,text/html,text/plain,text/css,application/javascript'
+    ).split(',')
+    # Compressed bodies of cached responses, keyed by ETag and encoding
+    COMPRESSION_CACHE_SIZE = int(os.environ.get('COMPRESSION_CACHE_SIZE', 256))
+    
+    # Serialized books cached by BookService.get_book_by_id
+    BOOK_CACHE_ENABLED = os.environ.get('BOOK_CACHE_ENABLED', 'true').lower() == 'true'
+    BOOK_CACHE_SIZE = int(os.environ.get('BOOK_CACHE_SIZE', 10000))
+    BOOK_CACHE_TTL = int(os.environ.get('BOOK_CACHE_TTL', 300))
+    # Seconds between reads of the book_change feed for other workers' writes
+    BOOK_CHANGE_SYNC_INTERVAL = float(os.environ.get('BOOK_CHANGE_SYNC_INTERVAL', 1))
+    # Most-requested IDs are saved here on shutdown and preloaded on startup;
+    # the share of lookups counted to find them
+    BOOK_CACHE_WARM_COUNT = int(os.environ.get('BOOK_CACHE_WARM_COUNT', 500))
+    BOOK_CACHE_WARM_PATH = os.environ.get('BOOK_CACHE_WARM_PATH')
+    BOOK_CACHE_WARM_SAMPLE_RATE = float(os.environ.get('BOOK_CACHE_WARM_SAMPLE_RATE', 0.05))
+    
+    # Upper bound on items accepted by one /books/bulk request
+    BOOK_BULK_MAX_ITEMS = int(os.environ.get('BOOK_BULK_MAX_ITEMS', 1000))
+    
+    # Upper bound on IDs accepted by one /books/batch request
+    BOOK_BATCH_MAX_IDS = int(os.environ.get('BOOK_BATCH_MAX_IDS', 500))
+    
+    # Rows per transaction for CSV/NDJSON imports (capped at BOOK_BULK_MAX_ITEMS)
+    BOOK_IMPORT_BATCH_SIZE = int(os.environ.get('BOOK_IMPORT_BATCH_SIZE', 1000))
+    
+    # Password hashing: werkzeug method string incl. cost, e.g. 'scrypt:32768:8:1'
+    # or 'pbkdf2:sha256:600000'. Stored hashes are upgraded on the next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    # Hashes allowed to wait for a worker before new ones are rejected with 503
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    
+    # Admission control: concurrent requests per endpoint class (read, expensive
+    # list/search/aggregates, auth, write). A class's limit shrinks while its
+    # latency is over the target; excess requests wait in a bounded queue for
+    # up to ADMISSION_QUEUE_TIMEOUT seconds, then get 503 with Retry-After.
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_LIMITS = os.environ.get('ADMISSION_LIMITS', 'read=64,expensive=16,auth=8,write=16')
+    ADMISSION_TARGET_LATENCY_MS = os.environ.get('ADMISSION_TARGET_LATENCY_MS',
+                                                 'read=100,expensive=500,auth=2000,write=250')
+    ADMISSION_QUEUE_SIZE = int(os.environ.get('ADMISSION_QUEUE_SIZE', 32))
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 2))
+    ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', 1))
+    
+    # Opt-in per-client token buckets (JWT identity, else IP) as class=rate/burst;
+    # clients over their rate get 429 with Retry-After
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+    RATE_LIMITS = os.environ.get('RATE_LIMITS', 'expensive=10/20,auth=1/5')
+    RATE_LIMIT_MAX_CLIENTS = int(os.environ.get('RATE_LIMIT_MAX_CLIENTS', 10000))
+    
+    # Seconds between pulls of token revocations made by other workers
+    TOKEN_BLOCKLIST_SYNC_INTERVAL = float(os.environ.get('TOKEN_BLOCKLIST_SYNC_INTERVAL', 5))
+    
+    # Opt-in NumPy snapshot of price/category/author/release date for list
+    # filtering and price stats (SQLite only); polls for other workers' writes
+    BOOK_SNAPSHOT_ENABLED = os.environ.get('BOOK_SNAPSHOT_ENABLED', 'false').lower() == 'true'
+    BOOK_SNAPSHOT_POLL_INTERVAL = float(os.environ.get('BOOK_SNAPSHOT_POLL_INTERVAL', 1))
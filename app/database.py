@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import sqlalchemy as sa
+from flask_sqlalchemy.session import Session
+
+
+# Bind key of the optional read-only engine (a replica, or a second pool on
+# the same SQLite file)
+READ_BIND = 'read'
+
+_reading = ContextVar('reading', default=False)
+
+
+class RoutingSession(Session):
+    """Session that sends reads inside read_only() to the read bind
+
+    Flushes and INSERT/UPDATE/DELETE statements always use the primary, so a
+    read_only() block that ends up writing still writes to the right place.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and _reading.get() and not self._flushing
+                and not isinstance(clause, sa.sql.dml.UpdateBase)):
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def read_only():
+    """Route queries in this block (or decorated function) to the read bind"""
+    token = _reading.set(True)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+def is_memory_sqlite(uri):
+    url = sa.engine.make_url(uri)
+    return url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:')
+
+
+def configure_engines(app):
+    """Fill in engine options and the read bind from Config before db.init_app"""
+    pool_options = {
+        'pool_size': app.config['DB_POOL_SIZE'],
+        'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        'pool_recycle': app.config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': app.config['DB_POOL_PRE_PING'],
+    }
+
+    # In-memory SQLite uses a single static connection, which takes no pool options
+    if not is_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**pool_options, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+
+    read_uri = app.config['SQLALCHEMY_READ_DATABASE_URI']
+    if read_uri:
+        read_options = {} if is_memory_sqlite(read_uri) else {**pool_options, 'pool_size': app.config['DB_READ_POOL_SIZE']}
+        app.config['SQLALCHEMY_BINDS'] = {
+            **(app.config.get('SQLALCHEMY_BINDS') or {}),
+            READ_BIND: {'url': read_uri, **read_options},
+        }
+
+
+def set_sqlite_pragmas(app, engine):
+    """Apply journal and I/O pragmas to every new SQLite connection of engine"""
+    pragmas = []
+    if app.config['SQLITE_WAL']:
+        # WAL lets readers run alongside a writer instead of queueing behind it
+        pragmas.append('PRAGMA journal_mode=WAL')
+    pragmas.append(f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}")
+    pragmas.append(f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}")
+    pragmas.append(f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT'])}")
+
+    @sa.event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def init_engines(app, db):
+    """Hook the SQLite pragmas onto each engine once db.init_app has created them"""
+    # The read bind mirrors the primary schema and owns no tables; dropping its
+    # empty metadata keeps create_all()/drop_all() on the primary only
+    metadata = db.metadatas.get(READ_BIND)
+    if metadata is not None and not metadata.tables:
+        del db.metadatas[READ_BIND]
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                set_sqlite_pragmas(app, engine)
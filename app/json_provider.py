@@ -0,0 +1,57 @@
+import json
+import time
+from flask.json.provider import DefaultJSONProvider
+from app.services.metrics import record_serialization
+
+try:
+    import orjson
+except ImportError:
+    # Optional: without orjson the stdlib json module encodes everything
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed
+
+    Output is compact and keeps dict order, so serializers control field
+    order. Values orjson does not handle natively (and dates, which Flask
+    formats as HTTP dates) go through Flask's default hook, so both encoders
+    produce equivalent documents. JSON_ENCODER=stdlib, and calls passing
+    json.dumps keyword arguments, use the stdlib.
+    """
+
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None and app.config.get('JSON_ENCODER', 'orjson') == 'orjson'
+        if orjson is not None:
+            self.options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def encode(self, obj):
+        """Compact UTF-8 JSON bytes for obj"""
+        if self.use_orjson:
+            return orjson.dumps(obj, default=self.default, option=self.options)
+        return json.dumps(obj, default=self.default, ensure_ascii=self.ensure_ascii,
+                          sort_keys=self.sort_keys, separators=(',', ':')).encode()
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or not self.use_orjson:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs or not self.use_orjson:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if self._app.debug:
+            # Indented output for humans
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        started = time.perf_counter()
+        body = self.encode(obj) + b'\n'
+        record_serialization(time.perf_counter() - started)
+        return self._app.response_class(body, mimetype=self.mimetype)
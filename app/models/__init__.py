@@ -1,4 +1,5 @@
 from app.models.user import User
 from app.models.book import Book
+from app.models.revoked_token import RevokedToken
 
-__all__ = ['User', 'Book']
+__all__ = ['User', 'Book', 'RevokedToken']
@@ -6,9 +6,196 @@ class Book(db.Model):
     title = db.Column(db.String(200), nullable=False)
     author = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(50), nullable=False)
-    price = db.Column(db.Float, nullable=False)
-    release_date = db.Column(db.Date, nullable=False)
+    price = db.Column(db.Float, nullable=False, index=True)
+    release_date = db.Column(db.Date, nullable=False, index=True)
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
+    # Incremented by every update; served as the ETag and checked by If-Match
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
     # Removed to_dict() since we're using Marshmallow schemas for serialization
+
+
+# Author and category filters compare lower(column), so they are indexed on
+# the same expression. The composites put the equality column first and the
+# range column second; the leading column also serves single-column lookups.
+db.Index('ix_book_author_release_date', db.func.lower(Book.author), Book.release_date)
+db.Index('ix_book_category_price', db.func.lower(Book.category), Book.price)
+db.Index('ix_book_category_release_date', db.func.lower(Book.category), Book.release_date)
+
+
+# Full-text search index over the text columns. It is an external-content FTS5
+# table, so it stores only the index and reads column values back from book;
+# the triggers keep it in sync for every writer, not just BookService.
+book_fts = db.table(
+    'book_fts',
+    db.column('rowid'),
+    db.column('book_fts'),
+    db.column('title'),
+    db.column('author'),
+    db.column('category'),
+    db.column('description'),
+)
+
+BOOK_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS book_fts USING fts5(
+        title, author, category, description,
+        content='book', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_fts_insert AFTER INSERT ON book BEGIN
+        INSERT INTO book_fts(rowid, title, author, category, description)
+        VALUES (new.id, new.title, new.author, new.category, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_fts_delete AFTER DELETE ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, category, description)
+        VALUES ('delete', old.id, old.title, old.author, old.category, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_fts_update
+    AFTER UPDATE OF title, author, category, description ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, category, description)
+        VALUES ('delete', old.id, old.title, old.author, old.category, old.description);
+        INSERT INTO book_fts(rowid, title, author, category, description)
+        VALUES (new.id, new.title, new.author, new.category, new.description);
+    END
+    """,
+]
+
+for statement in BOOK_FTS_DDL:
+    db.event.listen(Book.__table__, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+db.event.listen(Book.__table__, 'before_drop', db.DDL('DROP TABLE IF EXISTS book_fts').execute_if(dialect='sqlite'))
+
+
+# Price facet buckets: upper bounds of each range, the last one is open-ended
+PRICE_BUCKET_BOUNDS = (10, 20, 30, 50, 100)
+PRICE_BUCKET_LABELS = (
+    [f'{low}-{high}' for low, high in zip((0,) + PRICE_BUCKET_BOUNDS, PRICE_BUCKET_BOUNDS)]
+    + [f'{PRICE_BUCKET_BOUNDS[-1]}+']
+)
+
+
+# Book counts per facet value for the unfiltered facets sidebar. Like the
+# search index, triggers keep it in sync for every writer, so reading it never
+# scans book. Values are the SQL expressions each facet groups by.
+book_facet_count = db.table(
+    'book_facet_count',
+    db.column('facet'),
+    db.column('value'),
+    db.column('count'),
+)
+
+BOOK_FACET_EXPRESSIONS = {
+    'category': '{row}.category',
+    'author': '{row}.author',
+    'release_year': 'substr({row}.release_date, 1, 4)',
+    'price': 'CASE {} ELSE \'{}\' END'.format(
+        ' '.join(f"WHEN {{row}}.price < {bound} THEN '{label}'"
+                 for bound, label in zip(PRICE_BUCKET_BOUNDS, PRICE_BUCKET_LABELS)),
+        PRICE_BUCKET_LABELS[-1]
+    ),
+}
+
+
+def facet_values_sql(row, delta=None):
+    """VALUES rows of (facet, value[, delta]) for the old or new row in a trigger"""
+    suffix = f', {delta}' if delta is not None else ''
+    return ', '.join(f"('{facet}', {expression.format(row=row)}{suffix})"
+                     for facet, expression in BOOK_FACET_EXPRESSIONS.items())
+
+
+def facet_change_sql(row, delta):
+    statement = (f'INSERT INTO book_facet_count(facet, value, count) VALUES {facet_values_sql(row, delta)} '
+                 f'ON CONFLICT(facet, value) DO UPDATE SET count = count + excluded.count;')
+    if delta < 0:
+        # Drop values that no longer have books, touching only this row's keys
+        statement += (f' DELETE FROM book_facet_count WHERE count <= 0 '
+                      f'AND (facet, value) IN (VALUES {facet_values_sql(row)});')
+    return statement
+
+
+BOOK_FACET_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS book_facet_count (
+        facet TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (facet, value)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS book_facet_insert AFTER INSERT ON book BEGIN
+        {facet_change_sql('new', 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS book_facet_delete AFTER DELETE ON book BEGIN
+        {facet_change_sql('old', -1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS book_facet_update
+    AFTER UPDATE OF category, author, release_date, price ON book BEGIN
+        {facet_change_sql('old', -1)}
+        {facet_change_sql('new', 1)}
+    END
+    """,
+]
+
+for statement in BOOK_FACET_DDL:
+    db.event.listen(Book.__table__, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+db.event.listen(Book.__table__, 'before_drop', db.DDL('DROP TABLE IF EXISTS book_facet_count').execute_if(dialect='sqlite'))
+
+
+# Feed of changed book ids for the in-memory caches and catalog snapshots in
+# every worker. Each write appends the book id; a NULL book_id means "reload
+# everything" (written after bulk loads that bypass the triggers). Only the newest
+# BOOK_CHANGE_LOG_SIZE entries are kept; a reader that falls further behind
+# reloads in full.
+BOOK_CHANGE_LOG_SIZE = 100000
+
+book_change = db.table(
+    'book_change',
+    db.column('seq'),
+    db.column('book_id'),
+)
+
+BOOK_CHANGE_PRUNE = (f'DELETE FROM book_change WHERE seq <= '
+                     f'(SELECT max(seq) FROM book_change) - {BOOK_CHANGE_LOG_SIZE};')
+
+BOOK_CHANGE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS book_change (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        book_id INTEGER
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS book_change_insert AFTER INSERT ON book BEGIN
+        INSERT INTO book_change(book_id) VALUES (new.id);
+        {BOOK_CHANGE_PRUNE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS book_change_delete AFTER DELETE ON book BEGIN
+        INSERT INTO book_change(book_id) VALUES (old.id);
+        {BOOK_CHANGE_PRUNE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS book_change_update AFTER UPDATE ON book BEGIN
+        INSERT INTO book_change(book_id) VALUES (new.id);
+        {BOOK_CHANGE_PRUNE}
+    END
+    """,
+]
+
+for statement in BOOK_CHANGE_DDL:
+    db.event.listen(Book.__table__, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+db.event.listen(Book.__table__, 'before_drop', db.DDL('DROP TABLE IF EXISTS book_change').execute_if(dialect='sqlite'))
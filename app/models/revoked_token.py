@@ -0,0 +1,14 @@
+from app import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    # Workers sync by id, so ids freed by pruning must never be handed out again
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    token_type = db.Column(db.String(10), nullable=False)
+    user_id = db.Column(db.Integer, index=True)
+    # Rows are only needed until the token would have expired anyway
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
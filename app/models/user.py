@@ -1,5 +1,4 @@
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
 class User(db.Model):
@@ -8,10 +7,16 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Set by PasswordHasher.init_app
+    password_hasher = None
+    
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = self.password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return self.password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return self.password_hasher.needs_rehash(self.password_hash)
     
     # Removed to_dict() since we're using Marshmallow schemas for serialization
@@ -1,10 +1,41 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, jsonify
 
 health_bp = Blueprint('health', __name__)
 
+def service_stats():
+    """Counters reported by each service, shared by /health/stats and /metrics"""
+    from app.services.admission import admission_control
+    from app.services.auth_service import AuthService
+    from app.services.book_service import BookService
+    from app.services.catalog_snapshot import catalog_snapshot
+    from app.services.compression import response_compressor
+    from app.services.response_cache import response_cache
+    return {
+        'auth': AuthService.get_login_stats(),
+        'totals': BookService.get_total_stats(),
+        'books': BookService.get_book_cache_stats(),
+        'responses': response_cache.stats(),
+        'snapshot': catalog_snapshot.stats(),
+        'compression': response_compressor.stats(),
+        'admission': admission_control.stats()
+    }
+
 @health_bp.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'Online Library API is running'
     })
+
+@health_bp.route('/health/stats', methods=['GET'])
+def cache_stats():
+    from app.services.metrics import request_metrics
+    return jsonify({**service_stats(), 'slow_queries': request_metrics.slow_query_stats()})
+
+@health_bp.route('/metrics', methods=['GET'])
+def metrics():
+    from app.services.metrics import request_metrics
+    return current_app.response_class(
+        request_metrics.render(service_stats()),
+        mimetype='text/plain; version=0.0.4'
+    )
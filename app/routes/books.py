@@ -1,6 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.services.book_service import BookService, ValidationError
+from app.services.book_service import BookService, ValidationError, VersionConflictError, book_filters
+from app.schemas.book_schemas import BOOK_LIST_FIELDS
+from app.services.response_cache import cached_response
+from app.services.export_service import ExportService
+from app.services.import_service import ImportService, ReportedErrors
 
 books_bp = Blueprint('books', __name__, url_prefix='/books')
 
@@ -17,20 +21,173 @@ def create_book():
         return jsonify({'error': 'Internal server error'}), 500
 
 @books_bp.route('', methods=['GET'])
+@cached_response
 def get_books():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
-    filters = {
-        'author': request.args.get('author'),
-        'category': request.args.get('category'),
-        'min_price': request.args.get('min_price'),
-        'max_price': request.args.get('max_price'),
-        'release_year': request.args.get('release_year')
-    }
+    filters = book_filters(request.args)
+    
+    sort = request.args.get('sort', 'id')
     
     try:
-        result = BookService.get_books_with_filters(page, per_page, filters)
+        fields = BookService.parse_fields(request.args.get('fields'), BOOK_LIST_FIELDS)
+        if 'cursor' in request.args or 'limit' in request.args:
+            result = BookService.get_books_by_cursor(
+                cursor=request.args.get('cursor'),
+                limit=request.args.get('limit', 10, type=int),
+                filters=filters,
+                sort=sort,
+                include_total=BookService.parse_total_mode(request.args.get('include_total'), 'none'),
+                fields=fields
+            )
+        else:
+            result = BookService.get_books_with_filters(
+                page, per_page, filters, sort,
+                include_total=BookService.parse_total_mode(request.args.get('include_total')),
+                fields=fields
+            )
+        return jsonify(result)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@books_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_books():
+    try:
+        result = BookService.bulk_create_books(request.get_json())
+        return jsonify(result), 207 if result['failed'] else 200
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@books_bp.route('/bulk', methods=['PATCH'])
+@jwt_required()
+def bulk_update_books():
+    try:
+        result = BookService.bulk_update_books(request.get_json())
+        return jsonify(result), 207 if result['failed'] else 200
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@books_bp.route('/bulk', methods=['DELETE'])
+@jwt_required()
+def bulk_delete_books():
+    try:
+        result = BookService.bulk_delete_books(request.get_json())
+        return jsonify(result), 207 if result['failed'] else 200
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@books_bp.route('/batch', methods=['GET'])
+@cached_response
+def get_books_batch():
+    try:
+        result = BookService.get_books_by_ids(
+            BookService.parse_book_ids(request.args.get('ids')),
+            BookService.parse_fields(request.args.get('fields'))
+        )
+        return jsonify(result)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@books_bp.route('/batch', methods=['POST'])
+def post_books_batch():
+    try:
+        result = BookService.get_books_by_ids(
+            request.get_json(),
+            BookService.parse_fields(request.args.get('fields'))
+        )
+        return jsonify(result)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@books_bp.route('/export', methods=['GET'])
+def export_books():
+    filters = book_filters(request.args)
+    fmt = request.args.get('format', 'ndjson')
+    compress = request.accept_encodings['gzip'] > 0
+    
+    try:
+        chunks, mimetype = ExportService.export_books(filters, fmt, compress)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = current_app.response_class(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=books.{fmt}'
+    response.vary.add('Accept-Encoding')
+    if compress:
+        response.content_encoding = 'gzip'
+    return response
+
+@books_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_books():
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({'error': 'Missing file upload'}), 400
+    
+    errors = ReportedErrors()
+    
+    try:
+        fmt = ImportService.detect_format(upload.filename, request.args.get('format'))
+        summary = ImportService.import_books(
+            upload.stream, fmt,
+            start_row=request.args.get('skip', 0, type=int),
+            on_error=errors
+        )
+        return jsonify({**summary, 'errors': errors.rows()})
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@books_bp.route('/search', methods=['GET'])
+@cached_response
+def search_books():
+    q = request.args.get('q', '')
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    
+    try:
+        result = BookService.search_books(q, page, per_page)
+        return jsonify(result)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@books_bp.route('/facets', methods=['GET'])
+@cached_response
+def get_facets():
+    filters = book_filters(request.args)
+    
+    try:
+        result = BookService.get_facets(filters, request.args.get('limit', 10, type=int))
+        return jsonify(result)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@books_bp.route('/stats', methods=['GET'])
+@cached_response
+def get_price_stats():
+    filters = book_filters(request.args)
+    
+    try:
+        result = BookService.get_price_stats(filters, request.args.get('bins', 10, type=int))
         return jsonify(result)
     except ValidationError as e:
         return jsonify({'error': str(e)}), 400
@@ -38,10 +195,16 @@ def get_books():
         return jsonify({'error': 'Internal server error'}), 500
 
 @books_bp.route('/<int:book_id>', methods=['GET'])
+@cached_response
 def get_book(book_id):
     try:
-        book = BookService.get_book_by_id(book_id)
-        return jsonify(book)
+        fields = BookService.parse_fields(request.args.get('fields'))
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        book, version = BookService.get_versioned_book(book_id, fields)
+        return jsonify(book), 200, {'ETag': BookService.book_etag(book_id, version, fields)}
     except ValidationError as e:
         return jsonify({'error': str(e)}), 404
     except Exception as e:
@@ -52,8 +215,12 @@ def get_book(book_id):
 def update_book(book_id):
     data = request.get_json()
     try:
-        book = BookService.update_book(book_id, data)
-        return jsonify({'message': 'Book updated successfully', 'book': book})
+        versions = BookService.parse_if_match(request.headers.get('If-Match'), book_id)
+        book = BookService.update_book(book_id, data, versions)
+        return (jsonify({'message': 'Book updated successfully', 'book': book}), 200,
+                {'ETag': BookService.book_etag(book_id, book['version'])})
+    except VersionConflictError as e:
+        return jsonify({'error': str(e)}), 412, {'ETag': BookService.book_etag(book_id, e.version)}
     except ValidationError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -63,8 +230,15 @@ def update_book(book_id):
 @jwt_required()
 def delete_book(book_id):
     try:
-        BookService.delete_book(book_id)
+        versions = BookService.parse_if_match(request.headers.get('If-Match'), book_id)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        BookService.delete_book(book_id, versions)
         return jsonify({'message': 'Book deleted successfully'}), 200
+    except VersionConflictError as e:
+        return jsonify({'error': str(e)}), 412, {'ETag': BookService.book_etag(book_id, e.version)}
     except ValidationError as e:
         return jsonify({'error': str(e)}), 404
     except Exception as e:
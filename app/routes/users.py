@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from app.services.auth_service import AuthService, ValidationError
+from app.services.password_hasher import HasherBusyError, RETRY_AFTER
 
 users_bp = Blueprint('users', __name__, url_prefix='/users')
 
@@ -11,6 +13,8 @@ def signup():
         return jsonify({'message': 'User created successfully', 'user': user}), 201
     except ValidationError as e:
         return jsonify({'error': str(e)}), 400
+    except HasherBusyError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(RETRY_AFTER)}
     except Exception as e:
         return jsonify({'error': 'Internal server error'}), 500
 
@@ -22,5 +26,21 @@ def login():
         return jsonify(result)
     except ValidationError as e:
         return jsonify({'error': str(e)}), 401
+    except HasherBusyError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(RETRY_AFTER)}
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@users_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    return jsonify(AuthService.refresh(get_jwt_identity(), get_jwt()))
+
+@users_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    try:
+        AuthService.logout(get_jwt())
+        return '', 204
     except Exception as e:
         return jsonify({'error': 'Internal server error'}), 500
@@ -1,3 +1,28 @@
 from flask_marshmallow import Marshmallow
+from marshmallow import fields
 
 ma = Marshmallow()
+
+
+def compile_serializer(schema_class, only=None):
+    """Build a dump function equivalent to schema_class(only=only).dump(obj) for one object
+
+    Field lookups are resolved once here instead of on every call. Only plain
+    attribute fields are supported; dates and datetimes use isoformat(), which
+    is marshmallow's default format.
+    """
+    plan = []
+    for name, field in schema_class(only=only).dump_fields.items():
+        temporal = isinstance(field, fields.DateTime)
+        if temporal and field.format not in (None, 'iso'):
+            raise ValueError(f'Unsupported format for {name}: {field.format}')
+        plan.append((field.data_key or name, field.attribute or name, temporal))
+
+    def serialize(obj):
+        data = {}
+        for key, attribute, temporal in plan:
+            value = getattr(obj, attribute)
+            data[key] = value.isoformat() if temporal and value is not None else value
+        return data
+
+    return serialize
@@ -1,5 +1,7 @@
+from functools import lru_cache
 from marshmallow import Schema, fields, validate
 from datetime import datetime
+from app.schemas import compile_serializer
 
 class BookCreateSchema(Schema):
     title = fields.String(required=True, validate=validate.Length(min=1, max=200))
@@ -17,6 +19,9 @@ class BookUpdateSchema(Schema):
     release_date = fields.Date()
     description = fields.String()
 
+class BookBulkUpdateSchema(BookUpdateSchema):
+    id = fields.Integer(required=True, strict=True)
+
 class BookResponseSchema(Schema):
     id = fields.Integer()
     title = fields.String()
@@ -26,3 +31,21 @@ class BookResponseSchema(Schema):
     release_date = fields.Date()
     description = fields.String()
     created_at = fields.DateTime()
+    version = fields.Integer()
+
+
+# Single-pass serializer for API responses, equivalent to BookResponseSchema().dump
+serialize_book = compile_serializer(BookResponseSchema)
+
+# Fields a client can pick with fields=. List responses leave out the long
+# description unless it is asked for, so list queries never read it.
+BOOK_FIELDS = tuple(BookResponseSchema().dump_fields)
+BOOK_LIST_FIELDS = tuple(name for name in BOOK_FIELDS if name != 'description')
+
+
+@lru_cache(maxsize=None)
+def book_serializer(fields):
+    """serialize_book restricted to a tuple of BOOK_FIELDS names"""
+    if fields == BOOK_FIELDS:
+        return serialize_book
+    return compile_serializer(BookResponseSchema, only=fields)
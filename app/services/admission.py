@@ -0,0 +1,254 @@
+import math
+import time
+import threading
+from collections import OrderedDict
+from flask import current_app, g, request
+from flask_jwt_extended import decode_token
+
+
+# Only the API namespaces are governed; health, metrics and docs stay reachable
+PROTECTED_PREFIXES = ('/books', '/users')
+
+# GET routes that scan or aggregate many rows
+EXPENSIVE_ROUTES = frozenset({'/books', '/books/search', '/books/export', '/books/facets', '/books/stats'})
+
+# POST /books/batch carries IDs in the body but is a read
+READ_ROUTES = frozenset({'/books/batch'})
+
+# An adaptive limit never drops below this share of its configured budget
+MIN_LIMIT_FRACTION = 0.25
+
+# Weight of the newest sample in the latency moving average
+LATENCY_SMOOTHING = 0.2
+
+
+def parse_budgets(value, cast=int):
+    """'read=64,write=16' -> {'read': 64, 'write': 16}"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, amount = item.partition('=')
+        budgets[name.strip()] = cast(amount)
+    return budgets
+
+
+def parse_rate(value):
+    """'10/20' -> (10.0 tokens per second, burst of 20)"""
+    rate, _, burst = value.partition('/')
+    return float(rate), int(burst or max(1, math.ceil(float(rate))))
+
+
+def classify_request(rule, method):
+    """Endpoint class of a request: read, expensive, auth, write, or None if exempt"""
+    if rule is None:
+        return 'read' if request.path.startswith(PROTECTED_PREFIXES) else None
+    if not rule.startswith(PROTECTED_PREFIXES):
+        return None
+    if rule.startswith('/users'):
+        return 'auth'
+    if method in ('GET', 'HEAD'):
+        return 'expensive' if rule in EXPENSIVE_ROUTES else 'read'
+    return 'read' if rule in READ_ROUTES else 'write'
+
+
+class ConcurrencyLimiter:
+    """Caps requests of one class in flight, with a bounded queue and an AIMD limit
+
+    While the smoothed service time stays under the target, a saturated
+    limiter raises its limit by 1/limit per completion, up to the configured
+    budget. Above the target it cuts the limit by 10% per slow completion,
+    down to MIN_LIMIT_FRACTION of the budget, so a worker that slows down
+    admits less work instead of queueing more.
+    """
+
+    def __init__(self, name, limit, queue_size, target_latency):
+        self.name = name
+        self.max_limit = limit
+        self.min_limit = max(1, int(limit * MIN_LIMIT_FRACTION))
+        self.limit = float(limit)
+        self.queue_size = queue_size
+        self.target_latency = target_latency
+        self.latency = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+
+    def _has_room(self):
+        return self.in_flight < int(self.limit)
+
+    def acquire(self, timeout):
+        """Take a slot, waiting up to timeout seconds in the queue; False if rejected"""
+        with self._cond:
+            if not self._has_room():
+                if self.waiting >= self.queue_size:
+                    self.rejected += 1
+                    return False
+                self.waiting += 1
+                try:
+                    admitted = self._cond.wait_for(self._has_room, timeout)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self.rejected += 1
+                    return False
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self, seconds):
+        """Free a slot and adapt the limit to the request's service time"""
+        with self._cond:
+            saturated = self.in_flight >= int(self.limit) or self.waiting
+            self.in_flight -= 1
+            self.latency = seconds if self.latency is None else (
+                LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * self.latency)
+
+            if self.target_latency:
+                if self.latency > self.target_latency and seconds > self.target_latency:
+                    self.limit = max(self.min_limit, self.limit * 0.9)
+                elif self.latency <= self.target_latency and saturated:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit': int(self.limit),
+                'max_limit': self.max_limit,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'latency_ms': round(self.latency * 1000, 3) if self.latency is not None else None
+            }
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets for one endpoint class
+
+    Each client (JWT identity, else IP) may burst up to burst requests, then
+    gets rate requests per second. Buckets live in an LRU capped at
+    max_clients; an evicted client simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate, burst, max_clients):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        self.limited = 0
+        self._lock = threading.Lock()
+
+    def consume(self, client):
+        """0 if a token was taken, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self.buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                self.limited += 1
+                wait = (1 - tokens) / self.rate
+            self.buckets[client] = (tokens, now)
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+            return wait
+
+    def stats(self):
+        with self._lock:
+            return {'rate': self.rate, 'burst': self.burst, 'clients': len(self.buckets), 'limited': self.limited}
+
+
+class AdmissionControl:
+    """Sheds load before it queues: per-class concurrency limits and per-client rate limits
+
+    Requests are classified as cheap reads, expensive list/search/aggregate
+    reads, auth (password hashing) or writes. Each class has its own adaptive
+    ConcurrencyLimiter, so slow scans cannot take every worker thread from
+    detail reads or logins. A request that finds its class full waits in a
+    bounded queue for up to ADMISSION_QUEUE_TIMEOUT seconds, then gets 503
+    with Retry-After. Optional token buckets (RATE_LIMITS) answer 429 to
+    clients that exceed their rate on the protected classes. Limits are per
+    worker process.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.queue_timeout = 2.0
+        self.retry_after = 1
+        self.limiters = {}
+        self.rate_limiters = {}
+
+    def init_app(self, app):
+        self.enabled = app.config['ADMISSION_ENABLED']
+        self.queue_timeout = app.config['ADMISSION_QUEUE_TIMEOUT']
+        self.retry_after = app.config['ADMISSION_RETRY_AFTER']
+
+        targets = parse_budgets(app.config['ADMISSION_TARGET_LATENCY_MS'], float)
+        self.limiters = {
+            name: ConcurrencyLimiter(name, limit, app.config['ADMISSION_QUEUE_SIZE'], targets.get(name, 0) / 1000)
+            for name, limit in parse_budgets(app.config['ADMISSION_LIMITS']).items()
+        } if self.enabled else {}
+        self.rate_limiters = {
+            name: TokenBucketLimiter(*parse_rate(rate), app.config['RATE_LIMIT_MAX_CLIENTS'])
+            for name, rate in parse_budgets(app.config['RATE_LIMITS'], str).items()
+        } if app.config['RATE_LIMIT_ENABLED'] else {}
+
+        if self.limiters or self.rate_limiters:
+            app.before_request(self.admit)
+            app.teardown_request(self.release)
+
+    def client_key(self):
+        """JWT identity when the request carries a valid token, else the remote address"""
+        header = request.headers.get('Authorization', '')
+        if header.startswith('Bearer '):
+            try:
+                return f"user:{decode_token(header[7:])['sub']}"
+            except Exception:
+                pass
+        return f'ip:{request.remote_addr}'
+
+    def reject(self, status, message, retry_after):
+        response = current_app.json.response({'message': message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    def admit(self):
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        endpoint_class = classify_request(rule, request.method)
+        if endpoint_class is None:
+            return None
+
+        rate_limiter = self.rate_limiters.get(endpoint_class)
+        if rate_limiter is not None:
+            wait = rate_limiter.consume(self.client_key())
+            if wait:
+                return self.reject(429, 'Rate limit exceeded, retry later', math.ceil(wait))
+
+        limiter = self.limiters.get(endpoint_class)
+        if limiter is None:
+            return None
+        if not limiter.acquire(self.queue_timeout):
+            return self.reject(503, 'Server is busy, retry shortly', self.retry_after)
+        g.admission = (limiter, time.perf_counter())
+        return None
+
+    def release(self, exc=None):
+        admission = g.pop('admission', None)
+        if admission is not None:
+            limiter, started = admission
+            limiter.release(time.perf_counter() - started)
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'classes': {name: limiter.stats() for name, limiter in self.limiters.items()},
+            'rate_limits': {name: limiter.stats() for name, limiter in self.rate_limiters.items()}
+        }
+
+
+admission_control = AdmissionControl()
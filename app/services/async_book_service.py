@@ -0,0 +1,189 @@
+import math
+import time
+from flask import current_app
+from app import db
+from app.database import READ_BIND, is_memory_sqlite, set_sqlite_pragmas
+from app.models.book import Book
+from app.schemas.book_schemas import serialize_book, book_serializer, BOOK_FIELDS, BOOK_LIST_FIELDS
+from app.services.book_service import BookService, ValidationError, TOTAL_MODES, totals_cache, book_cache
+from app.services.change_feed import book_change_feed
+
+
+# Async drivers substituted for the sync ones in the configured database URL
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+class AsyncBookService:
+    """Async versions of the BookService read paths
+
+    Statements come from the BookService builders, so filters, ordering,
+    cursors and search behave identically; only execution differs. Queries go
+    through an AsyncEngine so one worker can keep many requests waiting on the
+    database at once. Methods must run inside an app context.
+    """
+
+    def __init__(self):
+        self.engine = None
+
+    def init_app(self, app):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = app.config['ASYNC_DATABASE_URI']
+        if not url:
+            # Reads use the read bind when there is one, like the sync path
+            with app.app_context():
+                url = (db.engines.get(READ_BIND) or db.engine).url
+            driver = ASYNC_DRIVERS.get(url.get_backend_name())
+            if driver is None:
+                raise ValueError(f'No async driver known for {url.drivername}; set ASYNC_DATABASE_URL')
+            url = url.set(drivername=driver)
+
+        if is_memory_sqlite(url):
+            raise ValueError('The async read path needs a file or server database, not in-memory SQLite')
+
+        self.engine = create_async_engine(
+            url,
+            pool_size=app.config['DB_READ_POOL_SIZE'],
+            max_overflow=app.config['DB_MAX_OVERFLOW'],
+            pool_timeout=app.config['DB_POOL_TIMEOUT'],
+            pool_recycle=app.config['DB_POOL_RECYCLE'],
+            pool_pre_ping=app.config['DB_POOL_PRE_PING']
+        )
+        if self.engine.dialect.name == 'sqlite':
+            set_sqlite_pragmas(app, self.engine.sync_engine)
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    async def get_books_with_filters(self, page=1, per_page=10, filters=None, sort='id', include_total='exact',
+                                     fields=BOOK_LIST_FIELDS):
+        """Async BookService.get_books_with_filters"""
+        if filters is None:
+            filters = {}
+
+        # Same page normalisation as db.paginate(error_out=False)
+        offset_page = max(page, 1)
+        per_page = per_page if per_page >= 1 else 20
+        statement = BookService.build_list_statement(filters, sort, fields)
+        statement = statement.limit(per_page).offset((offset_page - 1) * per_page)
+
+        async with self.engine.connect() as connection:
+            books = (await connection.execute(statement)).all()
+            total, estimated = await self.count_books(connection, filters, include_total)
+
+        serialize = book_serializer(fields)
+        return {
+            'books': [serialize(book) for book in books],
+            'total': total,
+            'total_estimated': estimated,
+            'pages': math.ceil(total / per_page) if total is not None else None,
+            'current_page': page
+        }
+
+    async def get_books_by_cursor(self, cursor=None, limit=10, filters=None, sort='id', include_total='none',
+                                  fields=BOOK_LIST_FIELDS):
+        """Async BookService.get_books_by_cursor"""
+        if filters is None:
+            filters = {}
+
+        statement, position = BookService.build_cursor_statement(cursor, limit, filters, sort, fields)
+        async with self.engine.connect() as connection:
+            books = (await connection.execute(statement)).all()
+            total, estimated = await self.count_books(connection, filters, include_total)
+
+        page = BookService.build_cursor_page(books, limit, position, sort, fields)
+        page['total'], page['total_estimated'] = total, estimated
+        return page
+
+    async def search_books(self, q, page=1, per_page=10):
+        """Async BookService.search_books"""
+        if self.engine.dialect.name != 'sqlite':
+            return await self.get_books_with_filters(page, per_page, {'q': q})
+
+        offset_page = max(page, 1)
+        per_page = per_page if per_page >= 1 else 20
+        statement = BookService.build_search_statement(q)
+
+        async with self.engine.connect() as connection:
+            books = (await connection.execute(
+                statement.limit(per_page).offset((offset_page - 1) * per_page)
+            )).all()
+            total = (await connection.execute(
+                db.select(db.func.count()).select_from(statement.order_by(None).subquery())
+            )).scalar()
+
+        return {
+            'books': [serialize_book(book) for book in books],
+            'total': total,
+            'pages': math.ceil(total / per_page),
+            'current_page': page
+        }
+
+    async def get_book_by_id(self, book_id, fields=BOOK_FIELDS):
+        """Async BookService.get_book_by_id, sharing its entity cache"""
+        return (await self.get_versioned_book(book_id, fields))[0]
+
+    async def get_versioned_book(self, book_id, fields=BOOK_FIELDS):
+        """Async BookService.get_versioned_book: (book, version) for the detail ETag"""
+        if book_cache.maxsize:
+            book_change_feed.sync()
+            BookService.count_book_request(book_id)
+            cached = book_cache.get(book_id)
+            if cached is not None:
+                return BookService.project_book(cached, fields), cached['version']
+            fields_to_load = BOOK_FIELDS
+        else:
+            fields_to_load = tuple(name for name in BOOK_FIELDS if name in fields or name == 'version')
+
+        statement = db.select(Book).where(Book.id == book_id).options(BookService.build_load_option(fields_to_load))
+        async with self.engine.connect() as connection:
+            book = (await connection.execute(statement)).first()
+        if not book:
+            raise ValidationError(f'Book with ID {book_id} not found')
+
+        result = book_serializer(fields_to_load)(book)
+        if fields_to_load == BOOK_FIELDS:
+            book_cache.set(book_id, result)
+        return BookService.project_book(result, fields), result['version']
+
+    async def count_books(self, connection, filters, mode='exact'):
+        """Async BookService.count_books, sharing its totals cache"""
+        if mode not in TOTAL_MODES:
+            raise ValidationError(f'Invalid include_total, expected one of: {", ".join(TOTAL_MODES)}')
+        if mode == 'none':
+            return None, False
+
+        conditions = BookService.build_filter_conditions(filters)
+        key = BookService.normalize_filters(filters)
+
+        total = totals_cache.get(key)
+        if total is not None:
+            return total, False
+
+        started = time.perf_counter()
+        try:
+            if mode == 'estimate':
+                threshold = current_app.config['BOOK_TOTAL_ESTIMATE_THRESHOLD']
+                total = (await connection.execute(BookService.build_count_statement(conditions, threshold + 1))).scalar()
+                if total > threshold:
+                    low, high = (await connection.execute(BookService.build_id_range_statement())).one()
+                    sample_ids = BookService.sample_book_ids(low, high, threshold)
+                    sample_matches = 0
+                    for statement in BookService.build_estimate_statements(conditions, sample_ids):
+                        sample_matches += (await connection.execute(statement)).scalar()
+                    return BookService.extrapolate_total(len(sample_ids), sample_matches, high - low + 1, threshold), True
+            else:
+                total = (await connection.execute(BookService.build_count_statement(conditions))).scalar()
+        finally:
+            BookService.record_count_latency(time.perf_counter() - started)
+
+        totals_cache.set(key, total)
+        return total, False
+
+
+async_book_service = AsyncBookService()
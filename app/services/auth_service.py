@@ -1,7 +1,13 @@
-from flask_jwt_extended import create_access_token
+import time
+import threading
+from collections import deque
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
 from app import db
 from app.models.user import User
 from app.schemas.user_schemas import UserRegistrationSchema, UserResponseSchema, UserLoginSchema
+from app.services.password_hasher import password_hasher
+from app.services.token_blocklist import token_blocklist
 
 
 class ValidationError(Exception):
@@ -9,6 +15,11 @@ class ValidationError(Exception):
     pass
 
 
+# Recent login durations for percentile reporting
+login_latencies = deque(maxlen=2048)
+login_latencies_lock = threading.Lock()
+
+
 class AuthService:
     @staticmethod
     def signup(data):
@@ -28,23 +39,62 @@ class AuthService:
     @staticmethod
     def login(data):
         """Authenticate user and return access token"""
-        schema = UserLoginSchema()
-        result = schema.load(data)
-        
-        # Find user
-        user = User.query.filter_by(email=result['email']).first()
-        
-        if not user or not user.check_password(result['password']):
-            raise ValidationError('Invalid credentials')
-        
-        # Create access token
-        access_token = create_access_token(identity=user.id)
+        started = time.perf_counter()
+        try:
+            schema = UserLoginSchema()
+            result = schema.load(data)
+            
+            # Find user
+            user = User.query.filter_by(email=result['email']).first()
+            
+            if not user or not user.check_password(result['password']):
+                raise ValidationError('Invalid credentials')
+            
+            # Upgrade hashes made with an older method or cost while we have the password
+            if user.password_needs_rehash():
+                user.set_password(result['password'])
+                db.session.commit()
+            
+            return {
+                **AuthService.issue_tokens(user.id),
+                'user': UserResponseSchema().dump(user)
+            }
+        finally:
+            with login_latencies_lock:
+                login_latencies.append(time.perf_counter() - started)
+    
+    @staticmethod
+    def issue_tokens(user_id):
+        """Access and refresh token pair for a new login session
         
+        Access tokens carry the refresh token's jti as 'session', so revoking
+        the refresh token also revokes every access token issued from it.
+        """
+        refresh_token = create_refresh_token(identity=str(user_id))
+        session = decode_token(refresh_token)['jti']
+        return {
+            'access_token': create_access_token(identity=str(user_id), additional_claims={'session': session}),
+            'refresh_token': refresh_token
+        }
+    
+    @staticmethod
+    def refresh(identity, jwt_payload):
+        """New access token for a valid refresh token, without a password check"""
         return {
-            'access_token': access_token,
-            'user': UserResponseSchema().dump(user)
+            'access_token': create_access_token(identity=identity, additional_claims={'session': jwt_payload['jti']})
         }
     
+    @staticmethod
+    def logout(jwt_payload):
+        """Revoke the presented token and, with it, the login session it belongs to"""
+        token_blocklist.revoke(jwt_payload)
+        session = jwt_payload.get('session')
+        if session:
+            # The refresh token's own expiry is not in the access token; it is
+            # at most one refresh lifetime from now
+            expires = time.time() + current_app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds()
+            token_blocklist.revoke({**jwt_payload, 'jti': session, 'type': 'refresh', 'exp': expires})
+    
     @staticmethod
     def get_user_by_id(user_id):
         """Get user by ID"""
@@ -52,3 +102,22 @@ class AuthService:
         if not user:
             raise ValidationError(f'User with ID {user_id} not found')
         return UserResponseSchema().dump(user)
+    
+    @staticmethod
+    def get_login_stats():
+        """Login latency percentiles over recent attempts and hasher queue state"""
+        with login_latencies_lock:
+            samples = sorted(login_latencies)
+        
+        def percentile(p):
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 3)
+        
+        return {
+            'logins': len(samples),
+            'p50_ms': percentile(0.50),
+            'p99_ms': percentile(0.99),
+            'hasher': password_hasher.stats(),
+            'blocklist': token_blocklist.stats()
+        }
@@ -1,7 +1,29 @@
-from datetime import datetime
+import re
+import json
+import math
+import time
+import base64
+import hashlib
+import atexit
+import os
+import random
+import threading
+from collections import Counter
+from datetime import date
+from flask import current_app
+from marshmallow import ValidationError as MarshmallowValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from app import db
-from app.models.book import Book
-from app.schemas.book_schemas import BookCreateSchema, BookResponseSchema, BookUpdateSchema
+from app.database import read_only
+from app.models.book import (Book, book_fts, BOOK_FTS_DDL, book_facet_count, BOOK_FACET_DDL,
+                             BOOK_FACET_EXPRESSIONS, PRICE_BUCKET_BOUNDS, PRICE_BUCKET_LABELS,
+                             book_change, BOOK_CHANGE_DDL)
+from app.schemas.book_schemas import (BookCreateSchema, BookUpdateSchema, BookBulkUpdateSchema, serialize_book,
+                                      book_serializer, BOOK_FIELDS, BOOK_LIST_FIELDS)
+from app.services.cache import LRUCache
+from app.services.catalog_snapshot import catalog_snapshot, np, sqlite_lower
+from app.services.change_feed import book_change_feed
+from app.services.response_cache import response_cache
 
 
 class ValidationError(Exception):
@@ -9,12 +31,135 @@ class ValidationError(Exception):
     pass
 
 
+class VersionConflictError(Exception):
+    """Raised when a conditional write finds the book at another version; callers answer 412"""
+
+    def __init__(self, message, version):
+        super().__init__(message)
+        self.version = version
+
+
+# Schemas are stateless, so one instance each is shared by every request
+book_create_schema = BookCreateSchema()
+book_update_schema = BookUpdateSchema()
+book_bulk_create_schema = BookCreateSchema(many=True)
+book_bulk_update_schema = BookBulkUpdateSchema(many=True)
+
+# Query arguments shared by the list, export, facet and stats endpoints
+FILTER_ARGS = ('q', 'author', 'category', 'min_price', 'max_price', 'release_year', 'release_from', 'release_to')
+
+SEARCH_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# bm25() weights for the book_fts columns: title, author, category, description
+SEARCH_COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# Orderings available to list endpoints. Each one is backed by an index whose
+# implicit trailing rowid (book.id) makes the (column, id) keyset seekable.
+SORT_COLUMNS = {
+    'id': Book.id,
+    'price': Book.price,
+    'release_date': Book.release_date,
+}
+
+MAX_CURSOR_LIMIT = 100
+
+TOTAL_MODES = ('exact', 'estimate', 'none')
+
+# Facets reported by get_facets, and the most values returned per facet
+FACETS = tuple(BOOK_FACET_EXPRESSIONS)
+MAX_FACET_LIMIT = 100
+
+# Price statistics reported by get_price_stats
+PRICE_PERCENTILES = (25, 50, 75, 90, 99)
+MAX_HISTOGRAM_BINS = 100
+
+# Totals per normalized filter set; any write can change any total, so writes clear it
+totals_cache = LRUCache()
+
+count_stats = {'queries': 0, 'seconds': 0.0, 'max_seconds': 0.0}
+count_stats_lock = threading.Lock()
+
+# Serialized books by id for get_book_by_id, plus sampled request counts used
+# to pick the IDs preloaded on the next startup; sampling stays off (rate 0)
+# unless a server entry point calls start_cache_warmup
+book_cache = LRUCache()
+book_requests = Counter()
+book_requests_lock = threading.Lock()
+book_requests_sampling = {'rate': 0.0}
+
+# SQLite's default bound-parameter limit is 999 on older builds
+IN_CLAUSE_CHUNK_SIZE = 500
+
+# One entity tag of an If-Match list, and the full-book tag "<id>-<version>",
+# optionally with the content-coding suffix ResponseCompressor appends
+ENTITY_TAG_PATTERN = re.compile(r'\s*(W/)?"([^"]*)"\s*')
+BOOK_ETAG_PATTERN = re.compile(r'(\d+)-(\d+)(?:-(?:gzip|br))?')
+
+
+def book_filters(args):
+    """Filter dict for BookService from request query arguments"""
+    return {name: args.get(name) for name in FILTER_ARGS}
+
+
 class BookService:
+    @staticmethod
+    def init_app(app):
+        """Size the service caches from the app config"""
+        totals_cache.configure(
+            maxsize=app.config['BOOK_TOTALS_CACHE_SIZE'],
+            ttl=app.config['BOOK_TOTALS_CACHE_TTL']
+        )
+        book_cache.configure(
+            maxsize=app.config['BOOK_CACHE_SIZE'] if app.config['BOOK_CACHE_ENABLED'] else 0,
+            ttl=app.config['BOOK_CACHE_TTL']
+        )
+        book_change_feed.add_listener(BookService.evict_changed_books)
+        with book_requests_lock:
+            book_requests.clear()
+        book_requests_sampling['rate'] = 0.0
+    
+    @staticmethod
+    def start_cache_warmup(app):
+        """Preload the hot IDs saved by the last run and sample lookups for the next
+        
+        Called by the server entry points (run.py, the ASGI lifespan) rather than
+        create_app, so tests and scripts neither query for nor write hot IDs.
+        """
+        if not book_cache.maxsize:
+            return 0
+        
+        warm_path = app.config['BOOK_CACHE_WARM_PATH'] or os.path.join(app.instance_path, 'hot_books.json')
+        book_requests_sampling['rate'] = app.config['BOOK_CACHE_WARM_SAMPLE_RATE']
+        with app.app_context():
+            # Take a feed position first, so writes racing the warm-up are evicted
+            book_change_feed.sync()
+            warmed = BookService.warm_book_cache_from_file(warm_path)
+        if not app.testing:
+            atexit.register(BookService.save_hot_book_ids, warm_path, app.config['BOOK_CACHE_WARM_COUNT'])
+        return warmed
+    
+    @staticmethod
+    def invalidate_caches(*book_ids):
+        """Drop cached data derived from the book table after a write"""
+        totals_cache.clear()
+        response_cache.bump_version()
+        catalog_snapshot.mark_stale()
+        for book_id in book_ids:
+            book_cache.delete(book_id)
+    
+    @staticmethod
+    def evict_changed_books(book_ids):
+        """book_change_feed listener: drop books written by other workers (None: all)"""
+        if book_ids is None:
+            book_cache.clear()
+            return
+        for book_id in book_ids:
+            book_cache.delete(book_id)
+    
     @staticmethod
     def create_book(data):
         """Create a new book with validation"""
-        schema = BookCreateSchema()
-        result = schema.load(data)
+        result = book_create_schema.load(data)
         
         # Create book
         book = Book(
@@ -28,105 +173,1077 @@ class BookService:
         
         db.session.add(book)
         db.session.commit()
+        BookService.invalidate_caches()
         
-        return BookResponseSchema().dump(book)
+        return serialize_book(book)
     
     @staticmethod
-    def get_books_with_filters(page=1, per_page=10, filters=None):
-        """Get books with pagination and filters"""
-        if filters is None:
-            filters = {}
+    def parse_filters(filters):
+        """Validate request filters into typed values, dropping empty ones
         
-        query = Book.query
+        release_year becomes the equivalent release_from/release_to range.
+        """
+        parsed = {}
         
-        # Apply filters
-        if filters.get('author'):
-            query = query.filter(Book.author.ilike(f"%{filters['author']}%"))
+        for key in ('q', 'author', 'category'):
+            if filters.get(key):
+                parsed[key] = filters[key]
         
-        if filters.get('category'):
-            query = query.filter(Book.category.ilike(f"%{filters['category']}%"))
-        
-        if filters.get('min_price'):
-            try:
-                min_price = float(filters['min_price'])
-                query = query.filter(Book.price >= min_price)
-            except (ValueError, TypeError):
-                raise ValidationError('Invalid min_price format')
-        
-        if filters.get('max_price'):
-            try:
-                max_price = float(filters['max_price'])
-                query = query.filter(Book.price <= max_price)
-            except (ValueError, TypeError):
-                raise ValidationError('Invalid max_price format')
+        for key in ('min_price', 'max_price'):
+            if filters.get(key):
+                try:
+                    parsed[key] = float(filters[key])
+                except (ValueError, TypeError):
+                    raise ValidationError(f'Invalid {key} format')
         
+        # Release year is a date range rather than extract('year', ...) so the
+        # release_date index stays usable
         if filters.get('release_year'):
             try:
                 year = int(filters['release_year'])
-                query = query.filter(db.extract('year', Book.release_date) == year)
-            except (ValueError, TypeError):
+                parsed['release_year'] = (date(year, 1, 1), date(year, 12, 31))
+            except (ValueError, TypeError, OverflowError):
                 raise ValidationError('Invalid release_year format')
         
-        # Paginate
+        for key in ('release_from', 'release_to'):
+            if filters.get(key):
+                try:
+                    parsed[key] = date.fromisoformat(filters[key])
+                except (ValueError, TypeError):
+                    raise ValidationError(f'Invalid {key} format')
+        
+        return parsed
+    
+    @staticmethod
+    def build_filter_conditions(filters):
+        """Translate request filters into index-friendly SQL conditions"""
+        parsed = BookService.parse_filters(filters)
+        conditions = []
+        
+        if 'q' in parsed:
+            conditions.append(BookService.build_search_condition(parsed['q']))
+        
+        # Equality on lower(column) matches the expression indexes on Book
+        if 'author' in parsed:
+            conditions.append(db.func.lower(Book.author) == db.func.lower(parsed['author']))
+        
+        if 'category' in parsed:
+            conditions.append(db.func.lower(Book.category) == db.func.lower(parsed['category']))
+        
+        if 'min_price' in parsed:
+            conditions.append(Book.price >= parsed['min_price'])
+        
+        if 'max_price' in parsed:
+            conditions.append(Book.price <= parsed['max_price'])
+        
+        if 'release_year' in parsed:
+            first_day, last_day = parsed['release_year']
+            conditions.append(Book.release_date >= first_day)
+            conditions.append(Book.release_date <= last_day)
+        
+        if 'release_from' in parsed:
+            conditions.append(Book.release_date >= parsed['release_from'])
+        
+        if 'release_to' in parsed:
+            conditions.append(Book.release_date <= parsed['release_to'])
+        
+        return conditions
+    
+    @staticmethod
+    @read_only()
+    def get_books_with_filters(page=1, per_page=10, filters=None, sort='id', include_total='exact',
+                               fields=BOOK_LIST_FIELDS):
+        """Get books with pagination and filters, loading only the response fields"""
+        if filters is None:
+            filters = {}
+        
+        if catalog_snapshot.available():
+            parsed = BookService.parse_filters(filters)
+            if 'q' not in parsed:
+                return BookService.get_books_from_snapshot(page, per_page, parsed, sort, include_total, fields)
+        
+        statement = BookService.build_list_statement(filters, sort, fields)
+        serialize = book_serializer(fields)
+        
+        # Paginate; the total comes from count_books so it can be cached or estimated
         try:
-            books = query.paginate(page=page, per_page=per_page, error_out=False)
+            books = db.paginate(statement, page=page, per_page=per_page, error_out=False, count=False)
         except Exception as e:
             raise ValidationError(f'Pagination error: {str(e)}')
         
+        total, estimated = BookService.count_books(filters, include_total)
+        
         return {
-            'books': BookResponseSchema(many=True).dump(books.items),
+            'books': [serialize(book) for book in books.items],
+            'total': total,
+            'total_estimated': estimated,
+            'pages': math.ceil(total / books.per_page) if total is not None else None,
+            'current_page': page
+        }
+    
+    @staticmethod
+    def get_books_from_snapshot(page, per_page, parsed, sort, include_total, fields=BOOK_LIST_FIELDS):
+        """get_books_with_filters answered by the in-memory catalog snapshot
+        
+        The snapshot picks the page ids and an exact total; only those rows are
+        read from the database. Full-text filters are not supported.
+        """
+        if include_total not in TOTAL_MODES:
+            raise ValidationError(f'Invalid include_total, expected one of: {", ".join(TOTAL_MODES)}')
+        BookService.build_ordering(sort)
+        
+        # Same page normalisation as db.paginate(error_out=False)
+        per_page = per_page if per_page >= 1 else 20
+        offset = (max(page, 1) - 1) * per_page
+        book_ids, total = catalog_snapshot.select_ids(parsed, sort, offset, per_page)
+        
+        statement = db.select(Book).where(Book.id.in_(book_ids)).options(BookService.build_load_option(fields))
+        books = {book.id: book for book in db.session.scalars(statement)}
+        total = total if include_total != 'none' else None
+        serialize = book_serializer(fields)
+        
+        return {
+            # A book deleted since the last snapshot poll is skipped
+            'books': [serialize(books[book_id]) for book_id in book_ids if book_id in books],
+            'total': total,
+            'total_estimated': False,
+            'pages': math.ceil(total / per_page) if total is not None else None,
+            'current_page': page
+        }
+    
+    @staticmethod
+    def build_list_statement(filters, sort='id', fields=BOOK_FIELDS):
+        """SELECT of filtered, ordered books for offset pagination"""
+        return (
+            db.select(Book)
+            .where(*BookService.build_filter_conditions(filters))
+            .order_by(*BookService.build_ordering(sort))
+            .options(BookService.build_load_option(fields, sort))
+        )
+    
+    @staticmethod
+    def parse_fields(value, default=BOOK_FIELDS):
+        """Response fields named in a comma-separated fields= value; id is always included
+        
+        A value naming no fields (empty, blank or only commas) means the default.
+        """
+        requested = {name.strip() for name in (value or '').split(',') if name.strip()}
+        if not requested:
+            return default
+        
+        unknown = requested.difference(BOOK_FIELDS)
+        if unknown:
+            raise ValidationError(f'Unknown fields: {", ".join(sorted(unknown))}; '
+                                  f'expected any of: {", ".join(BOOK_FIELDS)}')
+        
+        # Canonical order keeps responses stable and the serializer cache small
+        requested.add('id')
+        return tuple(name for name in BOOK_FIELDS if name in requested)
+    
+    @staticmethod
+    def build_field_columns(fields, sort='id'):
+        """Book columns needed to serialize fields and build cursors for sort"""
+        names = set(fields)
+        if sort in SORT_COLUMNS:
+            names.add(sort)
+        return [getattr(Book, name) for name in BOOK_FIELDS if name in names]
+    
+    @staticmethod
+    def build_load_option(fields, sort='id'):
+        """load_only() option so SQL reads just the columns behind fields"""
+        return db.load_only(*BookService.build_field_columns(fields, sort))
+    
+    @staticmethod
+    def normalize_filters(filters):
+        """Canonical, hashable form of a validated filter dict for cache keys"""
+        normalized = []
+        for key, value in sorted(filters.items()):
+            if not value:
+                continue
+            value = str(value).strip()
+            if key in ('min_price', 'max_price'):
+                value = float(value)
+            elif key == 'release_year':
+                value = int(value)
+            else:
+                # Values SQL compares as different must not share a cache key
+                value = sqlite_lower(value)
+            normalized.append((key, value))
+        return tuple(normalized)
+    
+    @staticmethod
+    def parse_total_mode(value, default='exact'):
+        """Map an include_total query value onto exact, estimate or none"""
+        if not value:
+            return default
+        
+        value = value.lower()
+        if value in ('1', 'true', 'yes'):
+            return 'exact'
+        if value in ('0', 'false', 'no'):
+            return 'none'
+        if value not in TOTAL_MODES:
+            raise ValidationError(f'Invalid include_total, expected one of: {", ".join(TOTAL_MODES)}')
+        return value
+    
+    @staticmethod
+    def count_books(filters, mode='exact'):
+        """Total matching books as (total, estimated), served from the totals cache when possible"""
+        if mode not in TOTAL_MODES:
+            raise ValidationError(f'Invalid include_total, expected one of: {", ".join(TOTAL_MODES)}')
+        if mode == 'none':
+            return None, False
+        
+        conditions = BookService.build_filter_conditions(filters)
+        key = BookService.normalize_filters(filters)
+        
+        # A cached exact total is free, so it also answers estimate requests
+        total = totals_cache.get(key)
+        if total is not None:
+            return total, False
+        
+        started = time.perf_counter()
+        try:
+            if mode == 'estimate':
+                # Count exactly while the set is small, stop early when it is not
+                threshold = current_app.config['BOOK_TOTAL_ESTIMATE_THRESHOLD']
+                total = db.session.execute(BookService.build_count_statement(conditions, threshold + 1)).scalar()
+                if total > threshold:
+                    return BookService.estimate_total(conditions, threshold), True
+            else:
+                total = db.session.execute(BookService.build_count_statement(conditions)).scalar()
+        finally:
+            BookService.record_count_latency(time.perf_counter() - started)
+        
+        totals_cache.set(key, total)
+        return total, False
+    
+    @staticmethod
+    def build_count_statement(conditions, limit=None):
+        """COUNT of matching books; with a limit, counting stops after limit rows"""
+        matching = db.select(Book.id).where(*conditions)
+        if limit is not None:
+            matching = matching.limit(limit)
+        return db.select(db.func.count()).select_from(matching.subquery())
+    
+    @staticmethod
+    def estimate_total(conditions, sample_size):
+        """Extrapolate a large total from the match rate over ids sampled across the table"""
+        low, high = db.session.execute(BookService.build_id_range_statement()).one()
+        sample_ids = BookService.sample_book_ids(low, high, sample_size)
+        sample_matches = sum(
+            db.session.execute(statement).scalar()
+            for statement in BookService.build_estimate_statements(conditions, sample_ids)
+        )
+        return BookService.extrapolate_total(len(sample_ids), sample_matches, high - low + 1, sample_size)
+    
+    @staticmethod
+    def build_id_range_statement():
+        """min(id) and max(id), both index lookups"""
+        return db.select(db.func.min(Book.id), db.func.max(Book.id))
+    
+    @staticmethod
+    def sample_book_ids(low, high, sample_size):
+        """Up to sample_size ids spread over [low, high]: one random id per equal stride
+        
+        Sampling the whole id range, rather than the first rows, keeps the
+        estimate honest when matches cluster by insertion order (a bulk
+        import, a seeded category).
+        """
+        span = high - low + 1
+        if span <= sample_size:
+            return list(range(low, high + 1))
+        stride = span / sample_size
+        return [low + int((index + random.random()) * stride) for index in range(sample_size)]
+    
+    @staticmethod
+    def build_estimate_statements(conditions, sample_ids):
+        """Count statements for the matches among sample_ids, per IN_CLAUSE_CHUNK_SIZE ids"""
+        return [
+            db.select(db.func.count()).select_from(Book)
+            .where(Book.id.in_(sample_ids[start:start + IN_CLAUSE_CHUNK_SIZE]), *conditions)
+            for start in range(0, len(sample_ids), IN_CLAUSE_CHUNK_SIZE)
+        ]
+    
+    @staticmethod
+    def extrapolate_total(sample_ids, sample_matches, id_span, sample_size):
+        # Probed ids that were deleted simply do not match, so gaps in the id
+        # range are accounted for without counting the table
+        estimate = round(id_span * sample_matches / sample_ids) if sample_ids else 0
+        
+        # The bounded count already proved there are more than sample_size matches
+        return max(estimate, sample_size + 1)
+    
+    @staticmethod
+    def record_count_latency(seconds):
+        with count_stats_lock:
+            count_stats['queries'] += 1
+            count_stats['seconds'] += seconds
+            count_stats['max_seconds'] = max(count_stats['max_seconds'], seconds)
+    
+    @staticmethod
+    def get_total_stats():
+        """Totals cache hit rate and COUNT latency since startup"""
+        with count_stats_lock:
+            queries = count_stats['queries']
+            return {
+                'cache': totals_cache.stats(),
+                'count_queries': queries,
+                'count_avg_ms': round(count_stats['seconds'] * 1000 / queries, 3) if queries else 0.0,
+                'count_max_ms': round(count_stats['max_seconds'] * 1000, 3)
+            }
+    
+    @staticmethod
+    def build_ordering(sort, descending=False):
+        """ORDER BY clauses for a sort field, always tie-broken by id"""
+        if sort not in SORT_COLUMNS:
+            raise ValidationError(f'Invalid sort field, expected one of: {", ".join(SORT_COLUMNS)}')
+        
+        columns = [SORT_COLUMNS[sort]] if sort == 'id' else [SORT_COLUMNS[sort], Book.id]
+        return [column.desc() if descending else column.asc() for column in columns]
+    
+    @staticmethod
+    def encode_cursor(book, sort, direction):
+        """Opaque cursor pointing just past book in the given direction"""
+        key = getattr(book, sort)
+        if isinstance(key, date):
+            key = key.isoformat()
+        payload = json.dumps({'sort': sort, 'key': key, 'id': book.id, 'dir': direction},
+                             separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        """Parse a cursor produced by encode_cursor"""
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            position = json.loads(payload)
+            sort = position['sort']
+            if sort not in SORT_COLUMNS or position['dir'] not in ('next', 'prev'):
+                raise ValueError(sort)
+            position['id'] = int(position['id'])
+            if sort == 'release_date':
+                position['key'] = date.fromisoformat(position['key'])
+            elif sort == 'price':
+                position['key'] = float(position['key'])
+        except (ValueError, TypeError, KeyError):
+            raise ValidationError('Invalid cursor')
+        
+        return position
+    
+    @staticmethod
+    def build_seek_condition(position):
+        """Row-value comparison that resumes the ordering after a cursor position"""
+        if position['sort'] == 'id':
+            seek_key, last_key = Book.id, position['id']
+        else:
+            seek_key = db.tuple_(SORT_COLUMNS[position['sort']], Book.id)
+            last_key = (position['key'], position['id'])
+        
+        return seek_key > last_key if position['dir'] == 'next' else seek_key < last_key
+    
+    @staticmethod
+    @read_only()
+    def get_books_by_cursor(cursor=None, limit=10, filters=None, sort='id', include_total='none',
+                            fields=BOOK_LIST_FIELDS):
+        """Get books with keyset pagination; cost is independent of page depth"""
+        if filters is None:
+            filters = {}
+        
+        statement, position = BookService.build_cursor_statement(cursor, limit, filters, sort, fields)
+        page = BookService.build_cursor_page(db.session.scalars(statement).all(), limit, position, sort, fields)
+        
+        page['total'], page['total_estimated'] = BookService.count_books(filters, include_total)
+        return page
+    
+    @staticmethod
+    def build_cursor_statement(cursor, limit, filters, sort='id', fields=BOOK_FIELDS):
+        """SELECT for one keyset page plus the decoded cursor position"""
+        if not 1 <= limit <= MAX_CURSOR_LIMIT:
+            raise ValidationError(f'limit must be between 1 and {MAX_CURSOR_LIMIT}')
+        
+        # A cursor carries its own sort so it cannot be replayed against another one
+        position = BookService.decode_cursor(cursor) if cursor else None
+        if position:
+            sort = position['sort']
+        direction = position['dir'] if position else 'next'
+        
+        statement = (
+            db.select(Book)
+            .where(*BookService.build_filter_conditions(filters))
+            .order_by(*BookService.build_ordering(sort, descending=direction == 'prev'))
+            .options(BookService.build_load_option(fields, sort))
+        )
+        if position:
+            statement = statement.where(BookService.build_seek_condition(position))
+        
+        # One extra row tells us whether another page exists without a COUNT
+        return statement.limit(limit + 1), position
+    
+    @staticmethod
+    def build_cursor_page(books, limit, position, sort='id', fields=BOOK_FIELDS):
+        """Serialized page and neighbour cursors from the rows of build_cursor_statement"""
+        if position:
+            sort = position['sort']
+        direction = position['dir'] if position else 'next'
+        
+        has_more = len(books) > limit
+        books = list(books[:limit])
+        if direction == 'prev':
+            books.reverse()
+        
+        if direction == 'next':
+            has_next, has_prev = has_more, position is not None
+        else:
+            has_next, has_prev = True, has_more
+        
+        next_cursor = prev_cursor = None
+        if books and has_next:
+            next_cursor = BookService.encode_cursor(books[-1], sort, 'next')
+        if books and has_prev:
+            prev_cursor = BookService.encode_cursor(books[0], sort, 'prev')
+        
+        serialize = book_serializer(fields)
+        return {
+            'books': [serialize(book) for book in books],
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+            'limit': limit
+        }
+    
+    @staticmethod
+    def build_search_expression(q):
+        """Turn free text into an FTS5 query of quoted prefix terms"""
+        tokens = SEARCH_TOKEN_PATTERN.findall(q or '')
+        if not tokens:
+            raise ValidationError('Search query must contain at least one word')
+        
+        # Quoting neutralises FTS5 operators typed by the user; the trailing *
+        # makes every term a prefix match ("tolk" finds "Tolkien")
+        return ' '.join(f'"{token}"*' for token in tokens)
+    
+    @staticmethod
+    def build_search_condition(q):
+        """SQL condition restricting books to full-text matches for q"""
+        expression = BookService.build_search_expression(q)
+        
+        if db.engine.dialect.name != 'sqlite':
+            # No FTS5 outside SQLite: fall back to substring matching
+            conditions = []
+            for token in SEARCH_TOKEN_PATTERN.findall(q):
+                pattern = f'%{token}%'
+                conditions.append(db.or_(
+                    Book.title.ilike(pattern),
+                    Book.author.ilike(pattern),
+                    Book.category.ilike(pattern),
+                    Book.description.ilike(pattern)
+                ))
+            return db.and_(*conditions)
+        
+        matches = db.select(book_fts.c.rowid).where(book_fts.c.book_fts.op('MATCH')(expression))
+        return Book.id.in_(matches)
+    
+    @staticmethod
+    @read_only()
+    def search_books(q, page=1, per_page=10):
+        """Full-text search over title, author, category and description ranked by BM25"""
+        if db.engine.dialect.name != 'sqlite':
+            return BookService.get_books_with_filters(page, per_page, {'q': q})
+        
+        statement = BookService.build_search_statement(q)
+        
+        try:
+            books = db.paginate(statement, page=page, per_page=per_page, error_out=False)
+        except Exception as e:
+            raise ValidationError(f'Pagination error: {str(e)}')
+        
+        return {
+            'books': [serialize_book(book) for book in books.items],
             'total': books.total,
             'pages': books.pages,
             'current_page': page
         }
     
     @staticmethod
-    def get_book_by_id(book_id):
+    def build_search_statement(q):
+        """SELECT of full-text matches for q ranked by BM25 (SQLite only)"""
+        expression = BookService.build_search_expression(q)
+        rank = db.func.bm25(book_fts.c.book_fts, *SEARCH_COLUMN_WEIGHTS)
+        return (
+            db.select(Book)
+            .join(book_fts, book_fts.c.rowid == Book.id)
+            .where(book_fts.c.book_fts.op('MATCH')(expression))
+            .order_by(rank, Book.id)
+        )
+    
+    @staticmethod
+    def build_facet_columns():
+        """Facet value expressions over book, matching the summary table triggers"""
+        return {
+            'category': Book.category,
+            'author': Book.author,
+            'release_year': db.cast(db.extract('year', Book.release_date), db.String),
+            'price': db.case(
+                *[(Book.price < bound, label) for bound, label in zip(PRICE_BUCKET_BOUNDS, PRICE_BUCKET_LABELS)],
+                else_=PRICE_BUCKET_LABELS[-1]
+            ),
+        }
+    
+    @staticmethod
+    def build_facet_statement(filters, limit):
+        """Top facet values with counts, plus a 'total' row, as (facet, value, count)
+        
+        Without filters on SQLite this reads book_facet_count. With filters the
+        matching rows are scanned once into a materialized CTE and grouped per
+        facet from there, so the cost is one pass whatever the facet count.
+        """
+        conditions = BookService.build_filter_conditions(filters)
+        
+        if not conditions and db.engine.dialect.name == 'sqlite':
+            grouped = db.union_all(
+                db.select(book_facet_count.c.facet, book_facet_count.c.value, book_facet_count.c.count),
+                db.select(db.literal('total'), db.null(), db.func.coalesce(db.func.sum(book_facet_count.c.count), 0))
+                .where(book_facet_count.c.facet == 'category')
+            ).subquery()
+        else:
+            columns = BookService.build_facet_columns()
+            matching = (
+                db.select(*[column.label(facet) for facet, column in columns.items()])
+                .where(*conditions)
+                .cte('matching')
+                .prefix_with('MATERIALIZED', dialect='sqlite')
+            )
+            grouped = db.union_all(
+                *[db.select(db.literal(facet), matching.c[facet], db.func.count()).group_by(matching.c[facet])
+                  for facet in FACETS],
+                db.select(db.literal('total'), db.null(), db.func.count()).select_from(matching)
+            ).subquery()
+        
+        facet, value, count = grouped.c
+        ranked = db.select(
+            facet.label('facet'),
+            value.label('value'),
+            count.label('count'),
+            db.func.row_number().over(partition_by=facet, order_by=(count.desc(), value)).label('rank')
+        ).subquery()
+        
+        return (
+            db.select(ranked.c.facet, ranked.c.value, ranked.c.count)
+            .where(ranked.c.rank <= limit)
+            .order_by(ranked.c.facet, ranked.c.rank)
+        )
+    
+    @staticmethod
+    def build_facets(rows):
+        """Response body from the rows of build_facet_statement"""
+        result = {'total': 0, 'facets': {facet: [] for facet in FACETS}}
+        for facet, value, count in rows:
+            if facet == 'total':
+                result['total'] = count
+                continue
+            if facet == 'release_year':
+                value = int(value)
+            result['facets'][facet].append({'value': value, 'count': count})
+        return result
+    
+    @staticmethod
+    @read_only()
+    def get_facets(filters=None, limit=10):
+        """Book counts per category, author, release year and price bucket"""
+        if not 1 <= limit <= MAX_FACET_LIMIT:
+            raise ValidationError(f'limit must be between 1 and {MAX_FACET_LIMIT}')
+        
+        statement = BookService.build_facet_statement(filters or {}, limit)
+        return BookService.build_facets(db.session.execute(statement))
+    
+    @staticmethod
+    @read_only()
+    def get_price_stats(filters=None, bins=10):
+        """Price count, min, max, mean, percentiles and histogram for matching books"""
+        if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+            raise ValidationError(f'bins must be between 1 and {MAX_HISTOGRAM_BINS}')
+        
+        filters = filters or {}
+        if catalog_snapshot.available():
+            parsed = BookService.parse_filters(filters)
+            if 'q' not in parsed:
+                return BookService.summarize_prices(catalog_snapshot.prices(parsed), bins)
+        
+        return BookService.get_price_stats_from_sql(filters, bins)
+    
+    @staticmethod
+    def summarize_prices(prices, bins):
+        """get_price_stats result from a NumPy array of prices"""
+        count = len(prices)
+        if not count:
+            return BookService.build_price_stats(0, None, None, None, {}, [])
+        
+        low, high = float(prices.min()), float(prices.max())
+        percentiles = np.percentile(prices, PRICE_PERCENTILES, method='lower')
+        if low == high:
+            counts = [count]
+        else:
+            counts = np.histogram(prices, bins=bins, range=(low, high))[0].tolist()
+        
+        return BookService.build_price_stats(
+            count, low, high, float(prices.mean()),
+            {p: float(value) for p, value in zip(PRICE_PERCENTILES, percentiles)},
+            counts
+        )
+    
+    @staticmethod
+    def get_price_stats_from_sql(filters, bins):
+        """get_price_stats computed with SQL aggregates (no snapshot, or a q filter)"""
+        conditions = BookService.build_filter_conditions(filters)
+        count, low, high, mean = db.session.execute(
+            db.select(db.func.count(), db.func.min(Book.price), db.func.max(Book.price), db.func.avg(Book.price))
+            .where(*conditions)
+        ).one()
+        if not count:
+            return BookService.build_price_stats(0, None, None, None, {}, [])
+        
+        # Lower nearest-rank percentiles, the same definition as the snapshot path
+        ordered = db.select(Book.price).where(*conditions).order_by(Book.price).limit(1)
+        percentiles = {
+            p: db.session.execute(ordered.offset((count - 1) * p // 100)).scalar()
+            for p in PRICE_PERCENTILES
+        }
+        
+        if low == high:
+            counts = [count]
+        else:
+            width = (high - low) / bins
+            bucket = db.case((Book.price >= high, bins - 1), else_=db.cast((Book.price - low) / width, db.Integer))
+            counts = [0] * bins
+            for index, bucket_count in db.session.execute(
+                db.select(bucket, db.func.count()).where(*conditions).group_by(bucket)
+            ):
+                # Rounding can put a price just below max one past the last bucket
+                counts[min(index, bins - 1)] += bucket_count
+        
+        return BookService.build_price_stats(count, low, high, mean, percentiles, counts)
+    
+    @staticmethod
+    def build_price_stats(count, low, high, mean, percentiles, counts):
+        width = (high - low) / len(counts) if counts else 0
+        return {
+            'count': count,
+            'min': low,
+            'max': high,
+            'mean': round(mean, 4) if mean is not None else None,
+            'percentiles': {f'p{p}': value for p, value in percentiles.items()},
+            'histogram': [
+                {'min': round(low + index * width, 4), 'max': round(low + (index + 1) * width, 4), 'count': bucket_count}
+                for index, bucket_count in enumerate(counts)
+            ]
+        }
+    
+    @staticmethod
+    def rebuild_facet_counts(commit=True):
+        """Recreate the facet summary table from the book table"""
+        if db.engine.dialect.name != 'sqlite':
+            return False
+        
+        for statement in BOOK_FACET_DDL:
+            db.session.execute(db.text(statement))
+        db.session.execute(db.delete(book_facet_count))
+        for facet, expression in BOOK_FACET_EXPRESSIONS.items():
+            db.session.execute(db.text(
+                f"INSERT INTO book_facet_count(facet, value, count) "
+                f"SELECT '{facet}', value, count(*) FROM "
+                f"(SELECT {expression.format(row='book')} AS value FROM book) GROUP BY value"
+            ))
+        if commit:
+            db.session.commit()
+        return True
+    
+    @staticmethod
+    def rebuild_change_feed(commit=True):
+        """Recreate the change feed triggers and make every snapshot reload in full"""
+        if db.engine.dialect.name != 'sqlite':
+            return False
+        
+        # Older update triggers only fired for the snapshot's columns
+        db.session.execute(db.text('DROP TRIGGER IF EXISTS book_change_update'))
+        for statement in BOOK_CHANGE_DDL:
+            db.session.execute(db.text(statement))
+        db.session.execute(db.insert(book_change).values(book_id=None))
+        if commit:
+            db.session.commit()
+        return True
+    
+    @staticmethod
+    def rebuild_search_index(commit=True):
+        """Recreate the full-text index from the book table"""
+        if db.engine.dialect.name != 'sqlite':
+            return False
+        
+        for statement in BOOK_FTS_DDL:
+            db.session.execute(db.text(statement))
+        db.session.execute(db.text("INSERT INTO book_fts(book_fts) VALUES ('rebuild')"))
+        if commit:
+            db.session.commit()
+        return True
+    
+    @staticmethod
+    def get_book_by_id(book_id, fields=BOOK_FIELDS):
         """Get a single book by ID"""
-        book = Book.query.get(book_id)
-        if not book:
-            raise ValidationError(f'Book with ID {book_id} not found')
-        return BookResponseSchema().dump(book)
+        return BookService.get_versioned_book(book_id, fields)[0]
     
     @staticmethod
-    def update_book(book_id, data):
-        """Update a book with validation"""
-        book = Book.query.get(book_id)
+    @read_only()
+    def get_versioned_book(book_id, fields=BOOK_FIELDS):
+        """A single book by ID and its version, which detail responses use as ETag
+        
+        The entity cache holds whole books; with the cache off, only the
+        columns behind fields (plus version) are read.
+        """
+        if book_cache.maxsize:
+            book_change_feed.sync()
+            BookService.count_book_request(book_id)
+            cached = book_cache.get(book_id)
+            if cached is not None:
+                return BookService.project_book(cached, fields), cached['version']
+            fields_to_load = BOOK_FIELDS
+        else:
+            fields_to_load = tuple(name for name in BOOK_FIELDS if name in fields or name == 'version')
+        
+        book = db.session.scalars(
+            db.select(Book).where(Book.id == book_id).options(BookService.build_load_option(fields_to_load))
+        ).first()
         if not book:
             raise ValidationError(f'Book with ID {book_id} not found')
         
-        schema = BookUpdateSchema()
-        result = schema.load(data)
+        result = book_serializer(fields_to_load)(book)
+        if fields_to_load == BOOK_FIELDS:
+            book_cache.set(book_id, result)
+        return BookService.project_book(result, fields), result['version']
+    
+    @staticmethod
+    def parse_book_ids(value):
+        """Book IDs from a comma-separated ids= value"""
+        try:
+            return [int(book_id) for book_id in (value or '').split(',') if book_id.strip()]
+        except ValueError:
+            raise ValidationError('ids must be a comma-separated list of integers')
+    
+    @staticmethod
+    @read_only()
+    def get_books_by_ids(book_ids, fields=BOOK_FIELDS):
+        """Books for a list of IDs in request order, plus the IDs that do not exist
         
-        # Update fields
-        if 'title' in result:
-            book.title = result['title']
+        Books in the entity cache are served from it; the rest are read with
+        one IN query (per IN_CLAUSE_CHUNK_SIZE IDs) and added to the cache.
+        A repeated ID is returned once, at its first position.
+        """
+        max_ids = current_app.config['BOOK_BATCH_MAX_IDS']
+        if (not isinstance(book_ids, list) or not book_ids
+                or any(type(book_id) is not int for book_id in book_ids)):
+            raise ValidationError('Expected a non-empty list of integer book IDs')
+        if len(book_ids) > max_ids:
+            raise ValidationError(f'At most {max_ids} IDs are allowed per request')
+        book_ids = list(dict.fromkeys(book_ids))
         
-        if 'author' in result:
-            book.author = result['author']
+        found = {}
+        if book_cache.maxsize:
+            book_change_feed.sync()
+            for book_id in book_ids:
+                BookService.count_book_request(book_id)
+                cached = book_cache.get(book_id)
+                if cached is not None:
+                    found[book_id] = cached
+            fields_to_load = BOOK_FIELDS
+        else:
+            fields_to_load = fields
         
-        if 'category' in result:
-            book.category = result['category']
+        misses = [book_id for book_id in book_ids if book_id not in found]
+        serialize = book_serializer(fields_to_load)
+        option = BookService.build_load_option(fields_to_load)
+        for start in range(0, len(misses), IN_CLAUSE_CHUNK_SIZE):
+            chunk = misses[start:start + IN_CLAUSE_CHUNK_SIZE]
+            for book in db.session.scalars(db.select(Book).where(Book.id.in_(chunk)).options(option)):
+                found[book.id] = result = serialize(book)
+                if fields_to_load == BOOK_FIELDS:
+                    book_cache.set(book.id, result)
         
-        if 'price' in result:
-            book.price = result['price']
+        return {
+            'books': [BookService.project_book(found[book_id], fields) for book_id in book_ids if book_id in found],
+            'missing': [book_id for book_id in book_ids if book_id not in found]
+        }
+    
+    @staticmethod
+    def project_book(book, fields):
+        """Copy of a serialized book with only fields"""
+        return {name: book[name] for name in fields}
+    
+    @staticmethod
+    def count_book_request(book_id):
+        """Record a sample of lookups of book_id for picking the hot IDs to warm
         
-        if 'description' in result:
-            book.description = result['description']
+        Only one lookup in 1/rate takes the lock, so detail reads on many
+        threads do not serialize on it; the hottest IDs still stand out.
+        """
+        rate = book_requests_sampling['rate']
+        if not rate or random.random() >= rate:
+            return
+        with book_requests_lock:
+            book_requests[book_id] += 1
+            # Keep the popularity counts bounded to the hottest IDs
+            if len(book_requests) > 2 * book_cache.maxsize:
+                hottest = book_requests.most_common(book_cache.maxsize)
+                book_requests.clear()
+                book_requests.update(dict(hottest))
+    
+    @staticmethod
+    def warm_book_cache(book_ids):
+        """Preload serialized books into the entity cache with batched IN queries"""
+        warmed = 0
+        book_ids = list(book_ids)
+        for start in range(0, len(book_ids), IN_CLAUSE_CHUNK_SIZE):
+            chunk = book_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+            for book in Book.query.filter(Book.id.in_(chunk)).all():
+                book_cache.set(book.id, serialize_book(book))
+                warmed += 1
+        return warmed
+    
+    @staticmethod
+    def warm_book_cache_from_file(path):
+        """Preload the IDs saved by save_hot_book_ids, if the file and tables exist"""
+        try:
+            with open(path) as f:
+                book_ids = [int(book_id) for book_id in json.load(f)]
+        except (OSError, ValueError, TypeError):
+            return 0
         
-        if 'release_date' in result:
-            book.release_date = result['release_date']
+        try:
+            return BookService.warm_book_cache(book_ids)
+        except SQLAlchemyError:
+            db.session.rollback()
+            return 0
+    
+    @staticmethod
+    def save_hot_book_ids(path, count):
+        """Persist the most-requested book IDs for the next startup's warm-up"""
+        with book_requests_lock:
+            hot_ids = [book_id for book_id, _ in book_requests.most_common(count)]
+        if not hot_ids:
+            return
         
-        db.session.commit()
-        return BookResponseSchema().dump(book)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(hot_ids, f)
     
     @staticmethod
-    def delete_book(book_id):
-        """Delete a book"""
-        book = Book.query.get(book_id)
-        if not book:
+    def get_book_cache_stats():
+        """Entity cache size and hit rate since startup"""
+        with book_requests_lock:
+            tracked_ids = len(book_requests)
+        return {**book_cache.stats(), 'tracked_ids': tracked_ids}
+    
+    @staticmethod
+    def book_etag(book_id, version, fields=BOOK_FIELDS):
+        """Strong ETag header value of one representation of a book
+        
+        "<id>-<version>" for the full book; a fields= projection adds a digest
+        of its fields, so every representation has its own tag.
+        """
+        tag = f'{book_id}-{version}'
+        if tuple(fields) != BOOK_FIELDS:
+            tag += '-' + hashlib.sha1(','.join(fields).encode()).hexdigest()[:8]
+        return f'"{tag}"'
+    
+    @staticmethod
+    def parse_if_match(value, book_id):
+        """Versions of book_id named in an If-Match header; None when absent or *
+        
+        Comparison is strong: weak tags, projection tags and tags of other
+        books match nothing, so a header listing only those yields [] and the
+        write fails with 412.
+        """
+        if value is None or value.strip() == '*':
+            return None
+        versions = []
+        for item in value.split(','):
+            tag = ENTITY_TAG_PATTERN.fullmatch(item)
+            if tag is None:
+                raise ValidationError(f'Invalid If-Match tag: {item.strip()}')
+            match = BOOK_ETAG_PATTERN.fullmatch(tag.group(2))
+            if not tag.group(1) and match and int(match.group(1)) == book_id:
+                versions.append(int(match.group(2)))
+        return versions
+    
+    @staticmethod
+    def raise_write_miss(book_id):
+        """Report why a conditional UPDATE/DELETE matched no row"""
+        version = db.session.scalar(db.select(Book.version).where(Book.id == book_id))
+        if version is None:
             raise ValidationError(f'Book with ID {book_id} not found')
+        raise VersionConflictError(f'Book with ID {book_id} was modified (now version {version})', version)
+    
+    @staticmethod
+    def update_book(book_id, data, versions=None):
+        """Update a book with one UPDATE ... RETURNING statement
+        
+        The book is not loaded first. With versions (from If-Match) the row
+        only changes if it is at one of them, otherwise VersionConflictError
+        is raised. Every update increments the version.
+        """
+        result = book_update_schema.load(data)
+        
+        statement = (
+            db.update(Book)
+            .where(Book.id == book_id)
+            .values(**result, version=Book.version + 1)
+            .returning(*BookService.build_field_columns(BOOK_FIELDS))
+        )
+        if versions is not None:
+            statement = statement.where(Book.version.in_(versions))
+        
+        book = db.session.execute(statement).first()
+        if book is None:
+            BookService.raise_write_miss(book_id)
         
-        db.session.delete(book)
         db.session.commit()
+        BookService.invalidate_caches(book_id)
+        return serialize_book(book)
+    
+    @staticmethod
+    def delete_book(book_id, versions=None):
+        """Delete a book with one DELETE statement, conditional on versions like update_book"""
+        statement = db.delete(Book).where(Book.id == book_id)
+        if versions is not None:
+            statement = statement.where(Book.version.in_(versions))
+        
+        if db.session.execute(statement).rowcount == 0:
+            BookService.raise_write_miss(book_id)
+        
+        db.session.commit()
+        BookService.invalidate_caches(book_id)
         return True
+    
+    @staticmethod
+    def check_bulk_items(items):
+        """Reject bulk payloads that are not a non-empty list within the size limit"""
+        max_items = current_app.config['BOOK_BULK_MAX_ITEMS']
+        if not isinstance(items, list) or not items:
+            raise ValidationError('Expected a non-empty JSON array')
+        if len(items) > max_items:
+            raise ValidationError(f'At most {max_items} items are allowed per request')
+    
+    @staticmethod
+    def find_existing_ids(book_ids):
+        """Subset of book_ids present in the database, looked up in chunks"""
+        existing = set()
+        book_ids = list(book_ids)
+        for start in range(0, len(book_ids), IN_CLAUSE_CHUNK_SIZE):
+            chunk = book_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+            existing.update(db.session.scalars(db.select(Book.id).where(Book.id.in_(chunk))))
+        return existing
+    
+    @staticmethod
+    def bulk_result(results):
+        return {
+            'results': results,
+            'succeeded': sum(1 for result in results if 'errors' not in result),
+            'failed': sum(1 for result in results if 'errors' in result)
+        }
+    
+    @staticmethod
+    def bulk_create_books(items):
+        """Validate and insert many books in one transaction; invalid items are reported, not fatal"""
+        BookService.check_bulk_items(items)
+        
+        try:
+            rows = book_bulk_create_schema.load(items)
+            errors = {}
+        except MarshmallowValidationError as e:
+            rows, errors = e.valid_data, e.messages
+        
+        valid = [(index, row) for index, row in enumerate(rows) if index not in errors]
+        for _, row in valid:
+            row.setdefault('description', '')
+        
+        created_ids = []
+        if valid:
+            # One executemany INSERT ... RETURNING with ids in parameter order
+            created_ids = db.session.scalars(
+                db.insert(Book).returning(Book.id, sort_by_parameter_order=True),
+                [row for _, row in valid]
+            ).all()
+            db.session.commit()
+            BookService.invalidate_caches()
+        
+        results = [{'index': index, 'errors': messages} for index, messages in errors.items()]
+        results += [{'index': index, 'id': book_id, 'status': 'created'}
+                    for (index, _), book_id in zip(valid, created_ids)]
+        return BookService.bulk_result(sorted(results, key=lambda result: result['index']))
+    
+    @staticmethod
+    def bulk_update_books(items):
+        """Apply many partial updates (each item carries its id) in one transaction"""
+        BookService.check_bulk_items(items)
+        
+        try:
+            rows = book_bulk_update_schema.load(items)
+            errors = {}
+        except MarshmallowValidationError as e:
+            rows, errors = e.valid_data, e.messages
+        
+        for index, row in enumerate(rows):
+            # An item with only its id would report an update that never happened
+            if index not in errors and len(row) == 1:
+                errors[index] = {'_schema': ['No fields to update']}
+        
+        valid = [(index, row) for index, row in enumerate(rows) if index not in errors]
+        existing = BookService.find_existing_ids(row['id'] for _, row in valid)
+        for index, row in valid:
+            if row['id'] not in existing:
+                errors[index] = {'id': [f'Book with ID {row["id"]} not found']}
+        
+        updates = [row for index, row in valid if index not in errors]
+        if updates:
+            # ORM bulk UPDATE by primary key: executemany grouped by column set
+            db.session.execute(db.update(Book), updates)
+            # Per-row values cannot be expressions, so versions move in one pass after
+            updated_ids = list({row['id'] for row in updates})
+            for start in range(0, len(updated_ids), IN_CLAUSE_CHUNK_SIZE):
+                chunk = updated_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+                db.session.execute(db.update(Book).where(Book.id.in_(chunk)).values(version=Book.version + 1))
+            db.session.commit()
+            BookService.invalidate_caches(*[row['id'] for row in updates])
+        
+        results = [
+            {'index': index, 'errors': errors[index]} if index in errors
+            else {'index': index, 'id': row['id'], 'status': 'updated'}
+            for index, row in enumerate(rows)
+        ]
+        return BookService.bulk_result(results)
+    
+    @staticmethod
+    def bulk_delete_books(book_ids):
+        """Delete many books by id in one transaction, reporting ids that do not exist"""
+        BookService.check_bulk_items(book_ids)
+        
+        valid_ids = {book_id for book_id in book_ids if type(book_id) is int}
+        existing = BookService.find_existing_ids(valid_ids)
+        if existing:
+            existing_ids = list(existing)
+            for start in range(0, len(existing_ids), IN_CLAUSE_CHUNK_SIZE):
+                chunk = existing_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+                db.session.execute(db.delete(Book).where(Book.id.in_(chunk)))
+            db.session.commit()
+            BookService.invalidate_caches(*existing_ids)
+        
+        results = []
+        first_index = {}
+        for index, book_id in enumerate(book_ids):
+            if type(book_id) is not int:
+                results.append({'index': index, 'errors': {'id': ['Not a valid integer.']}})
+            elif book_id in first_index:
+                results.append({'index': index, 'errors': {'id': [f'Duplicate of item {first_index[book_id]}']}})
+            elif book_id in existing:
+                first_index[book_id] = index
+                results.append({'index': index, 'id': book_id, 'status': 'deleted'})
+            else:
+                results.append({'index': index, 'errors': {'id': [f'Book with ID {book_id} not found']}})
+        return BookService.bulk_result(results)
@@ -0,0 +1,243 @@
+import time
+import string
+import threading
+from datetime import date
+from app import db
+from app.models.book import Book, book_change
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional: without NumPy the snapshot stays disabled and SQL serves everything
+    np = None
+
+
+EPOCH = date(1970, 1, 1)
+
+# Ids reloaded per SELECT when applying changes
+RELOAD_CHUNK_SIZE = 500
+
+# SQLite's lower() folds ASCII letters only ("Émile" stays "Émile")
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def sqlite_lower(value):
+    """value lowercased the way SQLite's lower() does, for matching its comparisons"""
+    return value.translate(ASCII_LOWER)
+
+
+class SnapshotColumns:
+    """One immutable version of the catalog columns, sorted by id
+
+    Refreshes build a new instance and swap it in, so readers never lock.
+    Text columns are stored as integer codes of their value lowercased like
+    SQLite's lower(), which is how the author and category filters compare them.
+    """
+
+    def __init__(self, ids, prices, days, categories, authors, category_codes, author_codes):
+        self.ids = ids
+        self.prices = prices
+        self.days = days
+        self.categories = categories
+        self.authors = authors
+        self.category_codes = category_codes
+        self.author_codes = author_codes
+
+    @classmethod
+    def from_rows(cls, rows, category_codes=None, author_codes=None):
+        category_codes = dict(category_codes or {})
+        author_codes = dict(author_codes or {})
+        ids, prices, days, categories, authors = [], [], [], [], []
+        for book_id, price, category, author, release_date in rows:
+            ids.append(book_id)
+            prices.append(price)
+            days.append((release_date - EPOCH).days)
+            categories.append(category_codes.setdefault(sqlite_lower(category), len(category_codes)))
+            authors.append(author_codes.setdefault(sqlite_lower(author), len(author_codes)))
+
+        return cls(
+            np.array(ids, dtype=np.int64),
+            np.array(prices, dtype=np.float64),
+            np.array(days, dtype=np.int32),
+            np.array(categories, dtype=np.int32),
+            np.array(authors, dtype=np.int32),
+            category_codes,
+            author_codes
+        )
+
+    def merge(self, changed_ids, rows):
+        """New columns with changed_ids replaced by rows (deleted books have none)"""
+        update = SnapshotColumns.from_rows(rows, self.category_codes, self.author_codes)
+        keep = ~np.isin(self.ids, np.fromiter(changed_ids, dtype=np.int64))
+        columns = [np.concatenate((getattr(self, name)[keep], getattr(update, name)))
+                   for name in ('ids', 'prices', 'days', 'categories', 'authors')]
+        order = np.argsort(columns[0], kind='stable')
+        return SnapshotColumns(*[column[order] for column in columns],
+                               update.category_codes, update.author_codes)
+
+    def mask(self, parsed):
+        """Boolean mask of books matching filters from BookService.parse_filters"""
+        mask = np.ones(len(self.ids), dtype=bool)
+
+        for key, codes, column in (('author', self.author_codes, self.authors),
+                                   ('category', self.category_codes, self.categories)):
+            if key in parsed:
+                mask &= column == codes.get(sqlite_lower(parsed[key]), -1)
+
+        if 'min_price' in parsed:
+            mask &= self.prices >= parsed['min_price']
+        if 'max_price' in parsed:
+            mask &= self.prices <= parsed['max_price']
+
+        first_days = [parsed[key] for key in ('release_from',) if key in parsed]
+        last_days = [parsed[key] for key in ('release_to',) if key in parsed]
+        if 'release_year' in parsed:
+            first_days.append(parsed['release_year'][0])
+            last_days.append(parsed['release_year'][1])
+        for first_day in first_days:
+            mask &= self.days >= (first_day - EPOCH).days
+        for last_day in last_days:
+            mask &= self.days <= (last_day - EPOCH).days
+
+        return mask
+
+
+class CatalogSnapshot:
+    """Opt-in NumPy copy of the columns the book list filters and sorts on
+
+    Filters become vectorized masks and only the requested page is read from
+    the database. The snapshot follows the book_change feed written by SQLite
+    triggers: local writes mark it stale through BookService.invalidate_caches,
+    and other workers' writes are picked up by polling at most once per
+    BOOK_SNAPSHOT_POLL_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.poll_interval = 1.0
+        self.columns = None
+        self.last_seq = 0
+        self.checked_at = None
+        self.stale = False
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self.last_load_ms = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config['BOOK_SNAPSHOT_ENABLED']
+        self.poll_interval = app.config['BOOK_SNAPSHOT_POLL_INTERVAL']
+        if self.enabled and np is None:
+            app.logger.warning('BOOK_SNAPSHOT_ENABLED is set but NumPy is not installed; snapshot disabled')
+            self.enabled = False
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.columns = None
+            self.last_seq = 0
+            self.checked_at = None
+            self.stale = False
+
+    def available(self):
+        """Whether queries can be answered from the snapshot (needs the SQLite change feed)"""
+        return self.enabled and db.engine.dialect.name == 'sqlite'
+
+    def mark_stale(self):
+        """Write hook: poll the change feed before the next query"""
+        self.stale = True
+
+    def due(self):
+        # checked_at is read once: reset() may clear it between two reads
+        checked_at = self.checked_at
+        return (self.columns is None or checked_at is None or self.stale
+                or time.monotonic() - checked_at >= self.poll_interval)
+
+    def current(self):
+        """Up-to-date columns, refreshing from the change feed when due"""
+        if self.due():
+            with self._lock:
+                # Threads that queued on the lock find the refresh already done
+                if self.due():
+                    self.refresh()
+        return self.columns
+
+    def refresh(self):
+        started = time.perf_counter()
+        self.stale = False
+
+        if self.columns is None:
+            self.load_all()
+        else:
+            first_seq, last_seq = db.session.execute(
+                db.select(db.func.min(book_change.c.seq), db.func.max(book_change.c.seq))
+            ).one()
+            if last_seq is not None and last_seq > self.last_seq:
+                if first_seq > self.last_seq + 1:
+                    # The feed was pruned past our position
+                    self.load_all()
+                else:
+                    changed = set(db.session.scalars(
+                        db.select(book_change.c.book_id)
+                        .where(book_change.c.seq > self.last_seq, book_change.c.seq <= last_seq)
+                    ))
+                    if None in changed:
+                        self.load_all()
+                    else:
+                        self.load_changes(changed, last_seq)
+
+        self.checked_at = time.monotonic()
+        self.last_load_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def load_all(self):
+        # Read the feed position first: changes racing the load are replayed next poll
+        last_seq = db.session.execute(db.select(db.func.max(book_change.c.seq))).scalar() or 0
+        rows = db.session.execute(
+            db.select(Book.id, Book.price, Book.category, Book.author, Book.release_date).order_by(Book.id)
+        )
+        self.columns = SnapshotColumns.from_rows(rows)
+        self.last_seq = last_seq
+        self.full_loads += 1
+
+    def load_changes(self, changed, last_seq):
+        changed = list(changed)
+        rows = []
+        for start in range(0, len(changed), RELOAD_CHUNK_SIZE):
+            rows.extend(db.session.execute(
+                db.select(Book.id, Book.price, Book.category, Book.author, Book.release_date)
+                .where(Book.id.in_(changed[start:start + RELOAD_CHUNK_SIZE]))
+            ))
+        self.columns = self.columns.merge(changed, rows)
+        self.last_seq = last_seq
+        self.incremental_loads += 1
+
+    def select_ids(self, parsed, sort, offset, limit):
+        """(page of matching ids in sort order, total matches)"""
+        columns = self.current()
+        matches = np.flatnonzero(columns.mask(parsed))
+
+        if sort != 'id':
+            keys = columns.prices if sort == 'price' else columns.days
+            # lexsort sorts by the last key first; matches are already in id order
+            matches = matches[np.lexsort((columns.ids[matches], keys[matches]))]
+
+        return columns.ids[matches[offset:offset + limit]].tolist(), len(matches)
+
+    def prices(self, parsed):
+        """Prices of the matching books"""
+        columns = self.current()
+        return columns.prices[columns.mask(parsed)]
+
+    def stats(self):
+        columns = self.columns
+        return {
+            'enabled': self.enabled,
+            'rows': len(columns.ids) if columns is not None else 0,
+            'change_seq': self.last_seq,
+            'full_loads': self.full_loads,
+            'incremental_loads': self.incremental_loads,
+            'last_load_ms': self.last_load_ms
+        }
+
+
+catalog_snapshot = CatalogSnapshot()
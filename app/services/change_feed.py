@@ -0,0 +1,89 @@
+import time
+import threading
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.book import book_change
+
+
+class BookChangeFeed:
+    """This worker's position in the book_change feed, for its per-worker caches
+
+    A write evicts the caches of the worker that made it directly
+    (BookService.invalidate_caches); other workers only learn about it from
+    the feed. Readers call sync() before using a cache: at most once per
+    BOOK_CHANGE_SYNC_INTERVAL seconds it reads the ids changed since the last
+    sync and hands them to every listener, or None when they must drop
+    everything (the feed was pruned past our position, or a bulk load wrote a
+    full-reload marker).
+    """
+
+    def __init__(self):
+        self.interval = 1.0
+        self.last_seq = None
+        self.synced_at = None
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.interval = app.config['BOOK_CHANGE_SYNC_INTERVAL']
+        with self._lock:
+            self.last_seq = None
+            self.synced_at = None
+
+    def add_listener(self, listener):
+        """Call listener(changed_ids or None) whenever a sync finds changes"""
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def sync(self):
+        """Apply other workers' writes to the listeners when the interval is up"""
+        synced_at = self.synced_at
+        if synced_at is not None and time.monotonic() - synced_at < self.interval:
+            return
+
+        with self._lock:
+            # Threads that queued on the lock find the sync already done
+            if self.synced_at is not synced_at:
+                return
+            changed = self.read_changes()
+            self.synced_at = time.monotonic()
+
+        if changed is None or changed:
+            for listener in self.listeners:
+                listener(changed)
+
+    def read_changes(self):
+        if db.engine.dialect.name != 'sqlite':
+            return set()
+
+        try:
+            first_seq, last_seq = db.session.execute(
+                db.select(db.func.min(book_change.c.seq), db.func.max(book_change.c.seq))
+            ).one()
+            last_seq = last_seq or 0
+            # The first sync only takes a position: nothing was cached before it
+            if self.last_seq is None or last_seq <= self.last_seq:
+                self.last_seq = last_seq
+                return set()
+
+            if first_seq > self.last_seq + 1:
+                changed = None
+            else:
+                changed = set(db.session.scalars(
+                    db.select(book_change.c.book_id)
+                    .where(book_change.c.seq > self.last_seq, book_change.c.seq <= last_seq)
+                ))
+                if None in changed:
+                    changed = None
+        except SQLAlchemyError:
+            # A database scripts/migrate_db.py has not given the feed yet
+            db.session.rollback()
+            current_app.logger.warning('book_change feed unavailable; cached books are not synced across workers')
+            return set()
+
+        self.last_seq = last_seq
+        return changed
+
+
+book_change_feed = BookChangeFeed()
@@ -0,0 +1,110 @@
+import zlib
+import hashlib
+import threading
+from flask import request
+from app.services.cache import LRUCache
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without Brotli only gzip is offered
+    brotli = None
+
+
+class ResponseCompressor:
+    """gzip/Brotli response compression negotiated from Accept-Encoding
+
+    Runs as an after_request hook. Streamed and file responses, responses
+    that already carry a Content-Encoding (the export endpoint gzips its own
+    stream), small bodies and non-text mimetypes are left alone. Bodies with
+    a strong ETag, i.e. those served by the response cache, keep their
+    compressed form in an LRU keyed by a digest of the body, so cache hits
+    are not recompressed. A strong ETag gets the encoding appended
+    ("abc" -> "abc-gzip"): the compressed bytes are a different
+    representation, and a strong tag keeps working for If-Match.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.min_size = 500
+        self.gzip_level = 6
+        self.brotli_quality = 4
+        self.mimetypes = frozenset()
+        self.encodings = ('gzip',)
+        self.compressed = LRUCache(0)
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config['COMPRESSION_ENABLED']
+        self.min_size = app.config['COMPRESSION_MIN_SIZE']
+        self.gzip_level = app.config['COMPRESSION_GZIP_LEVEL']
+        self.brotli_quality = app.config['COMPRESSION_BROTLI_QUALITY']
+        self.mimetypes = frozenset(app.config['COMPRESSION_MIMETYPES'])
+        # Preferred first when the client weighs them equally
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self.compressed.configure(maxsize=app.config['COMPRESSION_CACHE_SIZE'])
+        app.after_request(self.compress_response)
+
+    def negotiate(self, accept_encodings, size):
+        """Encoding to use for a body of size bytes, or None to send it as is"""
+        if not self.enabled or size < self.min_size:
+            return None
+        return accept_encodings.best_match(self.encodings)
+
+    def compress(self, body, encoding, cache=False):
+        """body encoded with encoding; with cache, the result is kept for the same body"""
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding) if cache else None
+        data = self.compressed.get(key) if key else None
+        if data is None:
+            if encoding == 'br':
+                data = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+                data = compressor.compress(body) + compressor.flush()
+            if key:
+                self.compressed.set(key, data)
+
+        with self._lock:
+            self.responses += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(data)
+        return data
+
+    def compress_response(self, response):
+        if (not self.enabled or response.direct_passthrough or response.is_streamed
+                or response.content_encoding or response.mimetype not in self.mimetypes
+                or response.status_code < 200 or response.status_code in (204, 304)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        encoding = self.negotiate(request.accept_encodings, len(body))
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        response.set_data(self.compress(body, encoding, cache=bool(etag) and not weak))
+        response.content_encoding = encoding
+        if etag and not weak:
+            response.set_etag(f'{etag}-{encoding}')
+            # The view compared If-None-Match with the uncompressed tag
+            response.make_conditional(request)
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'encodings': list(self.encodings),
+                'responses': self.responses,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+                'cache': self.compressed.stats()
+            }
+
+
+response_compressor = ResponseCompressor()
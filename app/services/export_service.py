@@ -0,0 +1,95 @@
+import io
+import csv
+import json
+import zlib
+from app import db
+from app.models.book import Book
+from app.schemas.book_schemas import BookResponseSchema, serialize_book
+from app.services.book_service import BookService, ValidationError
+
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+EXPORT_FIELDS = list(BookResponseSchema().dump_fields)
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_YIELD_PER = 1000
+
+# Encoded bytes buffered before a chunk is handed to the WSGI server
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class ExportService:
+    @staticmethod
+    def export_books(filters, fmt='ndjson', compress=False):
+        """Validate an export request and return (chunk generator, mimetype)"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValidationError(f'Invalid format, expected one of: {", ".join(EXPORT_FORMATS)}')
+
+        # Filters are validated here, before the first byte is streamed
+        conditions = BookService.build_filter_conditions(filters or {})
+        books = ExportService.iter_books(conditions)
+        lines = ExportService.iter_csv(books) if fmt == 'csv' else ExportService.iter_ndjson(books)
+        chunks = ExportService.iter_chunks(lines)
+
+        if compress:
+            chunks = ExportService.gzip_chunks(chunks)
+        return chunks, EXPORT_FORMATS[fmt]
+
+    @staticmethod
+    def iter_books(conditions):
+        """Serialized books read through a streaming cursor in id order"""
+        # Core rows skip the identity map, so memory stays flat however many rows stream
+        statement = (
+            db.select(*Book.__table__.columns)
+            .where(*conditions)
+            .order_by(Book.id)
+            .execution_options(stream_results=True, yield_per=EXPORT_YIELD_PER)
+        )
+        for row in db.session.execute(statement):
+            yield serialize_book(row)
+
+    @staticmethod
+    def iter_ndjson(books):
+        for book in books:
+            yield json.dumps(book, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+    @staticmethod
+    def iter_csv(books):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for book in books:
+            writer.writerow(book)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    @staticmethod
+    def iter_chunks(lines, size=EXPORT_CHUNK_SIZE):
+        """Group small text lines into encoded chunks of roughly size bytes"""
+        parts = []
+        buffered = 0
+        for line in lines:
+            parts.append(line)
+            buffered += len(line)
+            if buffered >= size:
+                yield ''.join(parts).encode('utf-8')
+                parts = []
+                buffered = 0
+        if parts:
+            yield ''.join(parts).encode('utf-8')
+
+    @staticmethod
+    def gzip_chunks(chunks, level=6):
+        """Gzip-encode a chunk stream incrementally"""
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
@@ -0,0 +1,127 @@
+import io
+import csv
+import json
+import time
+import heapq
+from flask import current_app
+from app.schemas.book_schemas import BookCreateSchema
+from app.services.book_service import BookService, ValidationError
+
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Columns a feed may carry that BookCreateSchema accepts; others (id,
+# created_at from an export, publisher extras) are ignored
+IMPORT_FIELDS = set(BookCreateSchema().fields)
+
+# Rejected rows echoed back by the upload endpoint; the CLI writes all of them
+MAX_REPORTED_ERRORS = 100
+
+
+class ReportedErrors:
+    """on_error callback keeping the lowest-numbered rejected rows, in row order
+
+    Unparseable rows are reported as they are read but invalid ones only when
+    their batch is flushed, so rows arrive out of order.
+    """
+
+    def __init__(self, limit=MAX_REPORTED_ERRORS):
+        self.limit = limit
+        # Max-heap on row number, so the highest kept row is the one replaced
+        self.heap = []
+
+    def __call__(self, row_number, errors, record):
+        if len(self.heap) < self.limit:
+            heapq.heappush(self.heap, (-row_number, errors))
+        elif self.heap and row_number < -self.heap[0][0]:
+            heapq.heapreplace(self.heap, (-row_number, errors))
+
+    def rows(self):
+        return [{'row': -row_number, 'errors': errors} for row_number, errors in sorted(self.heap, reverse=True)]
+
+
+class ImportService:
+    @staticmethod
+    def detect_format(filename, fmt=None):
+        """Explicit format if given, else inferred from the file extension"""
+        if not fmt and filename:
+            fmt = filename.rsplit('.', 1)[-1].lower()
+            fmt = 'ndjson' if fmt in ('jsonl', 'json') else fmt
+        if fmt not in IMPORT_FORMATS:
+            raise ValidationError(f'Invalid format, expected one of: {", ".join(IMPORT_FORMATS)}')
+        return fmt
+
+    @staticmethod
+    def iter_records(stream, fmt):
+        """Parse a binary stream incrementally into (row_number, record, error) tuples"""
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+        if fmt == 'csv':
+            for row_number, record in enumerate(csv.DictReader(text), start=1):
+                yield row_number, record, None
+            return
+
+        row_number = 0
+        for line in text:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, {'_schema': [f'Invalid JSON: {e}']}
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, {'_schema': ['Invalid input type.']}
+                continue
+            yield row_number, record, None
+
+    @staticmethod
+    def import_books(stream, fmt, batch_size=None, start_row=0, on_error=None, on_batch=None):
+        """Validate and insert books from a CSV/NDJSON stream in chunked transactions
+
+        Rows up to start_row are skipped so an interrupted import can resume.
+        Bad rows are passed to on_error(row_number, errors, record) and never
+        abort the import; on_batch(rows_done) runs after each committed batch.
+        """
+        batch_size = min(batch_size or current_app.config['BOOK_IMPORT_BATCH_SIZE'],
+                         current_app.config['BOOK_BULK_MAX_ITEMS'])
+        summary = {'rows': start_row, 'imported': 0, 'failed': 0}
+        started = time.perf_counter()
+        batch = []
+
+        def report(row_number, errors, record):
+            summary['failed'] += 1
+            if on_error:
+                on_error(row_number, errors, record)
+
+        def flush():
+            result = BookService.bulk_create_books([record for _, record in batch])
+            for item in result['results']:
+                if 'errors' in item:
+                    row_number, record = batch[item['index']]
+                    report(row_number, item['errors'], record)
+            summary['imported'] += result['succeeded']
+            batch.clear()
+            if on_batch:
+                on_batch(summary['rows'])
+
+        for row_number, record, error in ImportService.iter_records(stream, fmt):
+            if row_number <= start_row:
+                continue
+            summary['rows'] = row_number
+            if error:
+                report(row_number, error, record)
+                continue
+            batch.append((row_number, {key: value for key, value in record.items() if key in IMPORT_FIELDS}))
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+        elapsed = time.perf_counter() - started
+        processed = summary['imported'] + summary['failed']
+        summary['seconds'] = round(elapsed, 3)
+        summary['rows_per_sec'] = round(processed / elapsed, 1) if elapsed else 0.0
+        return summary
@@ -0,0 +1,231 @@
+import re
+import time
+import logging
+import threading
+from collections import deque
+from contextvars import ContextVar
+from flask import request, has_request_context
+from sqlalchemy import event
+
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Longest statement text kept per slow query
+SLOW_QUERY_MAX_LENGTH = 2000
+
+METRIC_PREFIX = 'library'
+
+slow_query_logger = logging.getLogger('app.slow_queries')
+
+# Counters of the request being handled; None outside a request
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """What one request spent, filled in while it runs"""
+
+    __slots__ = ('started', 'queries', 'sql_seconds', 'serialization_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+
+
+class EndpointMetrics:
+    """Totals and the latency histogram for one (method, route) pair"""
+
+    __slots__ = ('responses', 'buckets', 'seconds', 'queries', 'sql_seconds',
+                 'serialization_seconds', 'response_bytes')
+
+    def __init__(self):
+        self.responses = {}
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.seconds = 0.0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.response_bytes = 0
+
+    def observe(self, status, seconds, stats, size):
+        self.responses[status] = self.responses.get(status, 0) + 1
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+        self.seconds += seconds
+        self.queries += stats.queries
+        self.sql_seconds += stats.sql_seconds
+        self.serialization_seconds += stats.serialization_seconds
+        self.response_bytes += size
+
+
+def record_serialization(seconds):
+    """Add JSON encoding time to the current request, if any"""
+    stats = _current.get()
+    if stats is not None:
+        stats.serialization_seconds += seconds
+
+
+def format_labels(labels):
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def flatten_stats(prefix, value):
+    """(metric name, number) pairs for the numeric leaves of a nested stats dict"""
+    if isinstance(value, bool):
+        yield prefix, int(value)
+    elif isinstance(value, (int, float)):
+        yield prefix, value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten_stats(f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', str(key))}", item)
+
+
+class RequestMetrics:
+    """Per-endpoint request instrumentation rendered in Prometheus text format
+
+    before/after_request hooks time each request; SQLAlchemy cursor events
+    count its queries and their time, and the JSON provider reports encoding
+    time. Everything is aggregated per (method, route rule), so label
+    cardinality is bounded by the URL map. Statements slower than
+    SLOW_QUERY_THRESHOLD_MS are logged to the app.slow_queries logger and kept
+    in a short ring buffer. Counters are per worker process.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_query_threshold = 0.1
+        self.slow_queries = deque(maxlen=100)
+        self.slow_query_count = 0
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config['METRICS_ENABLED']
+        self.slow_query_threshold = app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000
+        self.slow_queries = deque(maxlen=app.config['SLOW_QUERY_LOG_SIZE'])
+        if not self.enabled:
+            return
+
+        app.before_request(self.start_request)
+        # Registered before the compressor so it runs after it and sees the final size
+        app.after_request(self.finish_request)
+        with app.app_context():
+            for engine in app.extensions['sqlalchemy'].engines.values():
+                event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    def start_request(self):
+        _current.set(RequestStats())
+
+    def finish_request(self, response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        _current.set(None)
+
+        seconds = time.perf_counter() - stats.started
+        # The rule, not the path, so /books/1 and /books/2 share one series
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        # Streamed responses have no length up front
+        size = response.content_length or 0
+
+        with self._lock:
+            metrics = self.endpoints.get((request.method, route))
+            if metrics is None:
+                metrics = self.endpoints[(request.method, route)] = EndpointMetrics()
+            metrics.observe(str(response.status_code), seconds, stats, size)
+        return response
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._metrics_started
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += seconds
+        if seconds >= self.slow_query_threshold:
+            self.record_slow_query(statement, seconds)
+
+    def record_slow_query(self, statement, seconds):
+        endpoint = request.endpoint if has_request_context() else None
+        slow_query_logger.warning('Slow query (%.1f ms, %s): %s', seconds * 1000, endpoint, statement)
+        with self._lock:
+            self.slow_query_count += 1
+            self.slow_queries.append({
+                'ms': round(seconds * 1000, 3),
+                'endpoint': endpoint,
+                'statement': statement[:SLOW_QUERY_MAX_LENGTH],
+                'at': time.time()
+            })
+
+    def slow_query_stats(self):
+        with self._lock:
+            return {
+                'threshold_ms': self.slow_query_threshold * 1000,
+                'count': self.slow_query_count,
+                'recent': list(self.slow_queries)
+            }
+
+    def render(self, stats=None):
+        """Prometheus text exposition of the request metrics plus service stats as gauges"""
+        with self._lock:
+            endpoints = [(method, route, metrics.responses.copy(), list(metrics.buckets), metrics.seconds,
+                          metrics.queries, metrics.sql_seconds, metrics.serialization_seconds,
+                          metrics.response_bytes)
+                         for (method, route), metrics in sorted(self.endpoints.items())]
+            slow_query_count = self.slow_query_count
+
+        lines = []
+
+        def family(name, kind, description):
+            lines.append(f'# HELP {METRIC_PREFIX}_{name} {description}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{name} {kind}')
+
+        def sample(name, labels, value):
+            lines.append(f'{METRIC_PREFIX}_{name}{format_labels(labels) if labels else ""} {value}')
+
+        family('http_requests_total', 'counter', 'Requests by method, route and status')
+        for method, route, responses, *_ in endpoints:
+            for status, count in sorted(responses.items()):
+                sample('http_requests_total', {'method': method, 'route': route, 'status': status}, count)
+
+        family('http_request_duration_seconds', 'histogram', 'Request latency')
+        for method, route, responses, buckets, seconds, *_ in endpoints:
+            labels = {'method': method, 'route': route}
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                cumulative += count
+                sample('http_request_duration_seconds_bucket', {**labels, 'le': str(bound)}, cumulative)
+            total = sum(responses.values())
+            sample('http_request_duration_seconds_bucket', {**labels, 'le': '+Inf'}, total)
+            sample('http_request_duration_seconds_sum', labels, seconds)
+            sample('http_request_duration_seconds_count', labels, total)
+
+        for index, name, description in ((5, 'http_request_sql_queries_total', 'SQL statements run by requests'),
+                                         (6, 'http_request_sql_seconds_total', 'Time requests spent in SQL'),
+                                         (7, 'http_request_serialization_seconds_total',
+                                          'Time requests spent encoding JSON'),
+                                         (8, 'http_response_bytes_total', 'Response bytes sent, after compression')):
+            family(name, 'counter', description)
+            for endpoint in endpoints:
+                sample(name, {'method': endpoint[0], 'route': endpoint[1]}, endpoint[index])
+
+        family('sql_slow_queries_total', 'counter', 'Statements slower than SLOW_QUERY_THRESHOLD_MS')
+        sample('sql_slow_queries_total', None, slow_query_count)
+
+        for section, values in (stats or {}).items():
+            for name, value in flatten_stats(section, values):
+                family(name, 'gauge', f'{section} stats from /health/stats')
+                sample(name, None, value)
+
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+# Seconds clients are told to wait (Retry-After) when the hasher is saturated
+RETRY_AFTER = 1
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full; callers should answer 503"""
+    pass
+
+
+class PasswordHasher:
+    """Runs password hashing on a bounded worker pool with a queue limit
+
+    hashlib's pbkdf2 and scrypt release the GIL, so a thread pool gives real
+    parallelism while capping how many CPU-heavy hashes run at once. Requests
+    beyond workers + queue size fail fast instead of stalling the server.
+    """
+
+    def __init__(self):
+        self.method = 'scrypt'
+        self.full_method = None
+        self.timeout = None
+        self.executor = None
+        self.slots = None
+        self.workers = 0
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.slots = threading.BoundedSemaphore(self.workers + app.config['PASSWORD_HASH_QUEUE_SIZE'])
+
+        # werkzeug fills in default parameters ('scrypt' -> 'scrypt:32768:8:1');
+        # the stored prefix is compared against this to detect outdated hashes
+        self.full_method = generate_password_hash('', method=self.method).split('$', 1)[0]
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hasher')
+
+        from app.models.user import User
+        User.password_hasher = self
+
+    def _run(self, func, *args):
+        if self.executor is None:
+            return func(*args)
+
+        if not self.slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusyError('Too many concurrent password operations, retry shortly')
+
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self._finish(None)
+            raise
+        # The slot is held until the job itself is done, not until the caller
+        # gives up waiting, so timed-out jobs still count against the queue
+        future.add_done_callback(self._finish)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise HasherBusyError('Password operation timed out, retry shortly')
+
+    def _finish(self, future):
+        with self._lock:
+            self.pending -= 1
+        self.slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with a different method or cost"""
+        return self.full_method is not None and password_hash.split('$', 1)[0] != self.full_method
+
+    def stats(self):
+        with self._lock:
+            return {
+                'method': self.full_method,
+                'workers': self.workers,
+                'in_flight': min(self.pending, self.workers),
+                'queue_depth': max(0, self.pending - self.workers),
+                'rejected': self.rejected
+            }
+
+
+password_hasher = PasswordHasher()
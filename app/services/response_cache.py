@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, request
+from app.services.cache import LRUCache
+from app.services.change_feed import book_change_feed
+
+
+# Headers the cache derives itself on every reply; the rest of a view's headers are stored
+DERIVED_HEADERS = frozenset({'Content-Type', 'Content-Length', 'ETag', 'Cache-Control', 'Set-Cookie'})
+
+
+class MemoryBackend:
+    """Per-process LRU backend; the catalog version is local to the worker
+
+    Other workers' writes bump it through the book_change feed.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.entries = LRUCache(maxsize, ttl)
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, entry):
+        self.entries.set(key, entry)
+
+    def get_version(self):
+        return self.version
+
+    def bump_version(self):
+        with self._lock:
+            self.version += 1
+            return self.version
+
+
+class SQLiteBackend:
+    """Host-wide backend in a local SQLite file shared by every worker process"""
+
+    def __init__(self, path, maxsize, ttl):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        # Entries from before headers were stored are just dropped; it is a cache
+        columns = {row[1] for row in connection.execute('PRAGMA table_info(entries)')}
+        if columns and 'headers' not in columns:
+            connection.execute('DROP TABLE entries')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, body BLOB, mimetype TEXT, etag TEXT, headers TEXT, expires_at REAL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS ix_entries_expires_at ON entries (expires_at)')
+        connection.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)')
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT body, mimetype, etag, headers FROM entries WHERE key = ? AND expires_at > ?',
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        body, mimetype, etag, headers = row
+        return body, mimetype, etag, [tuple(header) for header in json.loads(headers)]
+
+    def set(self, key, entry):
+        body, mimetype, etag, headers = entry
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO entries (key, body, mimetype, etag, headers, expires_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (key, body, mimetype, etag, json.dumps(headers), time.time() + self.ttl)
+        )
+        # Entries are immutable per version, so evicting the soonest-expiring is oldest-first
+        connection.execute(
+            'DELETE FROM entries WHERE expires_at <= ? OR key IN ('
+            'SELECT key FROM entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (time.time(), self.maxsize)
+        )
+
+    def get_version(self):
+        row = self._connection().execute(
+            "SELECT value FROM meta WHERE name = 'catalog_version'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump_version(self):
+        connection = self._connection()
+        connection.execute(
+            "INSERT INTO meta (name, value) VALUES ('catalog_version', 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+        )
+        return self.get_version()
+
+
+class ResponseCache:
+    """Versioned cache of rendered GET responses with strong ETags"""
+
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        backend = app.config['RESPONSE_CACHE_BACKEND']
+        maxsize = app.config['RESPONSE_CACHE_SIZE']
+        ttl = app.config['RESPONSE_CACHE_TTL']
+
+        if backend == 'memory':
+            self.backend = MemoryBackend(maxsize, ttl)
+        elif backend == 'sqlite':
+            path = app.config['RESPONSE_CACHE_PATH'] or os.path.join(app.instance_path, 'response_cache.db')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.backend = SQLiteBackend(path, maxsize, ttl)
+        elif backend == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f'Unknown RESPONSE_CACHE_BACKEND: {backend}')
+        book_change_feed.add_listener(self.on_books_changed)
+
+    def make_key(self, version):
+        """Cache key from the catalog version, path and sorted query string"""
+        query = urlencode(sorted(request.args.items(multi=True)))
+        return f'{version}:{request.path}?{query}'
+
+    def bump_version(self):
+        """Invalidate every cached response after a catalog write"""
+        if self.backend is not None:
+            self.backend.bump_version()
+
+    def on_books_changed(self, book_ids):
+        """book_change_feed listener: a per-worker version also follows other workers' writes"""
+        if isinstance(self.backend, MemoryBackend):
+            self.backend.bump_version()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        """Hit/miss counters for this worker and the current catalog version"""
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'catalog_version': self.backend.get_version() if self.backend else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(func):
+    """Serve a GET view from the response cache and answer If-None-Match with 304
+
+    The body, mimetype, ETag and the view's own headers (Link, Vary, ...) are
+    stored, so a hit replies exactly like the miss that filled the entry.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        backend = response_cache.backend
+        if backend:
+            book_change_feed.sync()
+        key = response_cache.make_key(backend.get_version()) if backend else None
+        entry = backend.get(key) if backend else None
+
+        if entry is None:
+            response = current_app.make_response(func(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+
+            body = response.get_data()
+            # Views may set their own ETag (a book's version); else hash the body
+            etag = response.get_etag()[0] or hashlib.sha256(body).hexdigest()[:32]
+            headers = [(name, value) for name, value in response.headers.items() if name not in DERIVED_HEADERS]
+            entry = (body, response.mimetype, etag, headers)
+            if backend:
+                response_cache._count('misses')
+                backend.set(key, entry)
+        else:
+            response_cache._count('hits')
+
+        body, mimetype, etag, headers = entry
+        response = current_app.response_class(body, mimetype=mimetype, headers=headers)
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+        if response.status_code == 304:
+            response_cache._count('not_modified')
+        return response
+
+    return wrapper
@@ -0,0 +1,85 @@
+import time
+import threading
+from datetime import datetime
+from app import db
+from app.models.revoked_token import RevokedToken
+
+
+class TokenBlocklist:
+    """In-memory set of revoked token IDs, synced incrementally from the database
+
+    The JWT blocklist check runs on every authenticated request, so it only
+    reads the local set. Revocations made by other workers are picked up by
+    fetching rows newer than the last seen id, at most once per sync interval;
+    ids are AUTOINCREMENT, so they keep growing after expired rows are pruned.
+    Revoked tokens are short-lived and pruned at expiry, so a plain set stays
+    small and, unlike a Bloom filter, has no false positives.
+    """
+
+    def __init__(self):
+        self.interval = 5
+        self.revoked = {}
+        self.last_id = 0
+        self.synced_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        from app import jwt
+        self.interval = app.config['TOKEN_BLOCKLIST_SYNC_INTERVAL']
+        with self._lock:
+            self.revoked = {}
+            self.last_id = 0
+            self.synced_at = None
+        jwt.token_in_blocklist_loader(self.check_token)
+
+    def check_token(self, jwt_header, jwt_payload):
+        """token_in_blocklist_loader: revoked if the token or its session was revoked"""
+        if self.synced_at is None or time.monotonic() - self.synced_at >= self.interval:
+            self.sync()
+        return jwt_payload['jti'] in self.revoked or jwt_payload.get('session') in self.revoked
+
+    def sync(self):
+        """Load revocations recorded since the last sync and drop expired ones"""
+        now = datetime.utcnow()
+        rows = db.session.execute(
+            db.select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+            .where(RevokedToken.id > self.last_id, RevokedToken.expires_at > now)
+            .order_by(RevokedToken.id)
+        ).all()
+
+        with self._lock:
+            for row in rows:
+                self.revoked[row.jti] = row.expires_at
+            if rows:
+                self.last_id = max(self.last_id, rows[-1].id)
+            self.revoked = {jti: expires_at for jti, expires_at in self.revoked.items() if expires_at > now}
+            self.synced_at = time.monotonic()
+
+    def revoke(self, jwt_payload):
+        """Persist a token revocation and apply it to this worker immediately"""
+        jti = jwt_payload['jti']
+        expires_at = datetime.utcfromtimestamp(jwt_payload['exp'])
+
+        if not db.session.execute(db.select(RevokedToken.id).filter_by(jti=jti)).first():
+            db.session.add(RevokedToken(
+                jti=jti,
+                token_type=jwt_payload['type'],
+                user_id=int(jwt_payload['sub']) if str(jwt_payload['sub']).isdigit() else None,
+                expires_at=expires_at
+            ))
+            # Expired rows can never match again
+            db.session.execute(db.delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+            db.session.commit()
+
+        with self._lock:
+            self.revoked[jti] = expires_at
+
+    def stats(self):
+        with self._lock:
+            return {
+                'revoked': len(self.revoked),
+                'sync_interval': self.interval
+            }
+
+
+token_blocklist = TokenBlocklist()
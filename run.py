@@ -1,8 +1,10 @@
 from app import create_app, db
+from app.services.book_service import BookService
 
 app = create_app()
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+    BookService.start_cache_warmup(app)
     app.run(debug=True, host='0.0.0.0', port=5000)
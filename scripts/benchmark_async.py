@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import asyncio
+from urllib.parse import urlsplit
+import click
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, body, keep_alive)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        body = b''
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if not size:
+                break
+            body += chunk[:-2]
+    else:
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+    return status, body, headers.get('connection', '').lower() != 'close'
+
+async def run_client(url, requests, latencies, errors):
+    """One keep-alive client issuing requests GETs back to back"""
+    parts = urlsplit(url)
+    target = f"{parts.path or '/'}{'?' + parts.query if parts.query else ''}"
+    request = (f'GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n'
+               f'Accept: application/json\r\n\r\n').encode()
+    reader = writer = None
+
+    for _ in range(requests):
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+            writer.write(request)
+            status, _, keep_alive = await read_response(reader)
+            if status != 200:
+                errors.append(status)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - started)
+
+    if writer is not None:
+        writer.close()
+
+async def run_level(url, concurrency, requests):
+    """Throughput and latency percentiles for concurrency simultaneous clients"""
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(url, requests, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99)
+    }
+
+@click.command()
+@click.option('--sync-url', default='http://127.0.0.1:5000', help='Base URL of the WSGI app (run.py / gunicorn)')
+@click.option('--async-url', default='http://127.0.0.1:8000', help='Base URL of the ASGI app (uvicorn asgi:app)')
+@click.option('--path', default='/books?per_page=10&author=frank%20herbert', help='Request path and query')
+@click.option('--concurrency', default='100,500,1000', help='Comma-separated client counts')
+@click.option('--requests', default=10, help='Requests per client at each level')
+def benchmark_async(sync_url, async_url, path, concurrency, requests):
+    """Compare concurrent-request throughput of the sync and async book read paths
+
+    Start both servers against the same database first, with
+    RESPONSE_CACHE_BACKEND=none so every request reaches the database.
+    """
+    levels = [int(level) for level in concurrency.split(',')]
+    targets = [('sync', sync_url), ('async', async_url)]
+
+    print(f"{'clients':>8} {'stack':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for level in levels:
+        results = {}
+        for name, base_url in targets:
+            results[name] = result = asyncio.run(run_level(base_url.rstrip('/') + path, level, requests))
+            print(f"{level:>8} {name:>6} {result['rps']:9.1f} {result['p50_ms']:9.1f} "
+                  f"{result['p99_ms']:9.1f} {result['errors']:7}")
+        if results['sync']['rps']:
+            print(f"{'':>8} ⚡ async/sync throughput: {results['async']['rps'] / results['sync']['rps']:.2f}x")
+
+if __name__ == '__main__':
+    benchmark_async()
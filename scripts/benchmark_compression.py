@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import timeit
+from datetime import date
+from app import create_app, db
+from app.config import Config
+from app.models.book import Book
+from app.services.compression import response_compressor, brotli
+from scripts.mock_generators import MockDataGenerator
+import click
+
+class BenchmarkConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    RESPONSE_CACHE_BACKEND = 'none'
+    BOOK_CACHE_ENABLED = False
+
+def seed_books(count):
+    """Books with generated ~500-character descriptions, like the seeder"""
+    for book in MockDataGenerator.generate_book_data(count, seed=0):
+        book['release_date'] = date.fromisoformat(book['release_date'])
+        db.session.add(Book(**book))
+    db.session.commit()
+
+def measure(func, repeat):
+    """Best per-call time in milliseconds"""
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1000
+
+@click.command()
+@click.option('--items', default=100, help='Books per page')
+@click.option('--repeat', default=100, help='Calls per measurement')
+def benchmark_compression(items, repeat):
+    """Encode time and bytes on the wire for GET /books?per_page=N, before and after
+
+    "before" is the previous stack: stdlib json with default separators and no
+    compression. "after" is orjson (when installed) plus gzip or Brotli.
+    """
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+        seed_books(items)
+        client = app.test_client()
+
+        for label, query in (('default fields', ''),
+                             ('with description', '&fields=title,author,category,price,release_date,description')):
+            path = f'/books?per_page={items}{query}'
+            data = client.get(path).get_json()
+            print(f'\nGET {path}')
+
+            before = json.dumps(data).encode()
+            print(f"{'stdlib json.dumps':>26}: {measure(lambda: json.dumps(data), repeat):7.3f} ms  {len(before):>8,} B")
+            body = app.json.encode(data)
+            encoder = 'orjson' if app.json.use_orjson else 'stdlib compact'
+            print(f"{encoder:>26}: {measure(lambda: app.json.encode(data), repeat):7.3f} ms  {len(body):>8,} B")
+
+            encodings = ['gzip'] + (['br'] if brotli is not None else [])
+            for encoding in encodings:
+                compressed = response_compressor.compress(body, encoding)
+                seconds = measure(lambda: response_compressor.compress(body, encoding), repeat)
+                print(f"{'+ ' + encoding:>26}: {seconds:7.3f} ms  {len(compressed):>8,} B"
+                      f"  ({len(before) / len(compressed):.1f}x smaller)")
+
+            for name, headers in (('identity', {}), ('negotiated', {'Accept-Encoding': ', '.join(encodings)})):
+                response = client.get(path, headers=headers)
+                seconds = measure(lambda: client.get(path, headers=headers), max(1, repeat // 10))
+                print(f"{'request, ' + name:>26}: {seconds:7.3f} ms  {len(response.data):>8,} B"
+                      f"  {response.headers.get('Content-Encoding', '')}")
+
+if __name__ == '__main__':
+    benchmark_compression()
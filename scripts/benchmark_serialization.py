@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import timeit
+from datetime import date, datetime
+from flask_restx import marshal
+from app.models.book import Book
+from app.schemas.book_schemas import BookResponseSchema, serialize_book
+from app.api.books import book_list_response
+import click
+
+def build_books(count):
+    """Transient Book rows shaped like a real list page"""
+    return [
+        Book(
+            id=book_id,
+            title=f'Book {book_id}',
+            author='Ursula K. Le Guin',
+            category='Science Fiction',
+            price=19.99,
+            release_date=date(1969, 3, 1),
+            description='A long description. ' * 40,
+            created_at=datetime(2024, 1, 1, 12, 0, 0)
+        )
+        for book_id in range(1, count + 1)
+    ]
+
+def dump_twice(books):
+    """Previous path: fresh schema dump in the service, then RESTX marshal"""
+    result = {'books': BookResponseSchema(many=True).dump(books), 'total': len(books),
+              'pages': 1, 'current_page': 1}
+    return marshal(result, book_list_response)
+
+def dump_once(books):
+    """Current path: precompiled serializer, returned as-is"""
+    return {'books': [serialize_book(book) for book in books], 'total': len(books),
+            'pages': 1, 'current_page': 1}
+
+@click.command()
+@click.option('--items', default=100, help='Books per simulated page')
+@click.option('--repeat', default=200, help='Pages serialized per measurement')
+def benchmark_serialization(items, repeat):
+    """Compare per-item serialization cost of the old and new response paths"""
+    books = build_books(items)
+    assert dump_once(books)['books'] == BookResponseSchema(many=True).dump(books)
+
+    results = {}
+    for name, func in (('schema + marshal', dump_twice), ('compiled serializer', dump_once)):
+        seconds = min(timeit.repeat(lambda: func(books), number=repeat, repeat=5))
+        results[name] = seconds / (repeat * items) * 1e6
+        print(f"{name:>20}: {results[name]:8.2f} µs/item")
+
+    speedup = results['schema + marshal'] / results['compiled serializer']
+    print(f"\n⚡ Speedup: {speedup:.1f}x per item ({items} items/page)")
+
+if __name__ == '__main__':
+    benchmark_serialization()
@@ -0,0 +1,240 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import random
+import sqlite3
+import platform
+import statistics
+from datetime import datetime, timezone
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.config import Config
+from app.models.book import Book
+from app.models.user import User
+from app.services.book_service import BookService
+from scripts.seed_data import fast_seed_books, finish_fast_seed
+import click
+
+SEED = 0
+
+BENCHMARK_EMAIL = 'benchmark@example.com'
+BENCHMARK_PASSWORD = 'Benchmark123'
+
+# GET paths timed as-is, one benchmark each
+READ_CASES = {
+    'list_unfiltered': '/books?per_page=20',
+    'list_author': '/books?author=stephen%20king&per_page=20',
+    'list_category': '/books?category=fantasy&per_page=20',
+    'list_category_price': '/books?category=fantasy&min_price=20&max_price=40&per_page=20',
+    'list_release_year': '/books?release_year=1999&per_page=20',
+    'list_release_range': '/books?release_from=1990-01-01&release_to=1999-12-31&per_page=20',
+    'list_author_year': '/books?author=stephen%20king&release_year=1999&per_page=20',
+    'list_sort_price': '/books?sort=price&per_page=20',
+    'list_estimate_total': '/books?min_price=10&include_total=estimate&per_page=20',
+    'list_fields': '/books?fields=title,price&per_page=100',
+    'list_q': '/books?q=system&per_page=20',
+    'search': '/books/search?q=system',
+    'facets': '/books/facets',
+    'stats': '/books/stats',
+}
+
+# Offset pagination depths (pages of PAGE_SIZE); depths past the catalog are skipped
+PAGE_DEPTHS = (1, 10, 100, 1000)
+PAGE_SIZE = 20
+
+# Update and delete work on the books create made, so they always run together
+WRITE_CASES = ('create', 'update', 'delete')
+
+def suite_config(path):
+    """Config for one catalog file; every cache that would hide the database is off"""
+    class SuiteConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.abspath(path)}'
+        RESPONSE_CACHE_BACKEND = 'none'
+        BOOK_CACHE_ENABLED = False
+        BOOK_TOTALS_CACHE_SIZE = 0
+        COMPRESSION_ENABLED = False
+
+    return SuiteConfig
+
+def prepare_catalog(size, workers):
+    """Seed size books plus the benchmark user unless the file already holds them"""
+    db.create_all()
+    count = db.session.execute(db.select(db.func.count()).select_from(Book)).scalar()
+    if count >= size and User.query.filter_by(email=BENCHMARK_EMAIL).first() is not None:
+        return False
+
+    db.session.execute(db.delete(Book))
+    db.session.execute(db.delete(User))
+    fast_seed_books(size, include_specific=True, seed=SEED, workers=workers)
+    user = User(email=BENCHMARK_EMAIL)
+    user.set_password(BENCHMARK_PASSWORD)
+    db.session.add(user)
+    finish_fast_seed()
+    return True
+
+def measure(func, iterations, warmup):
+    """Milliseconds per call of func over iterations calls, after warmup calls"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 4),
+        'min_ms': round(timings[0], 4),
+        'iterations': iterations
+    }
+
+def expect(response, *statuses):
+    if response.status_code not in statuses:
+        raise click.ClickException(f'{response.request.method} {response.request.path} returned '
+                                   f'{response.status_code}: {response.get_data(as_text=True)[:200]}')
+    return response
+
+def build_cases(client, headers):
+    """(name, callable) pairs for every benchmark; state is shared so writes chain"""
+    rng = random.Random(SEED)
+    book_ids = db.session.scalars(db.select(Book.id).order_by(Book.id)).all()
+    detail_ids = iter(rng.choice(book_ids) for _ in range(10 ** 6))
+    cases = []
+
+    for name, path in READ_CASES.items():
+        cases.append((name, lambda path=path: expect(client.get(path), 200)))
+
+    # An empty page past the end would time nothing but the offset scan
+    depths = [depth for depth in PAGE_DEPTHS if (depth - 1) * PAGE_SIZE < len(book_ids)]
+    for depth in depths:
+        path = f'/books?per_page={PAGE_SIZE}&page={depth}'
+        cases.append((f'page_{depth}', lambda path=path: expect(client.get(path), 200)))
+
+    # A cursor after the last row of the page before the deepest offset page,
+    # so both read the same rows
+    if depths[-1] > 1:
+        anchor = db.session.get(Book, book_ids[(depths[-1] - 1) * PAGE_SIZE - 1])
+        cursor = BookService.encode_cursor(anchor, 'id', 'next')
+        cases.append((f'cursor_page_{depths[-1]}',
+                      lambda: expect(client.get(f'/books?limit={PAGE_SIZE}&cursor={cursor}'), 200)))
+
+    cases.append(('detail', lambda: expect(client.get(f'/books/{next(detail_ids)}'), 200)))
+    batch = ','.join(str(rng.choice(book_ids)) for _ in range(50))
+    cases.append(('batch_50', lambda: expect(client.get(f'/books/batch?ids={batch}'), 200)))
+
+    created = []
+    payload = {'title': 'Benchmark Book', 'author': 'Benchmark Author', 'category': 'Fiction',
+               'price': 9.99, 'release_date': '2020-01-01', 'description': 'Created by the benchmark suite'}
+
+    def create():
+        created.append(expect(client.post('/books', json=payload, headers=headers), 201).get_json()['id'])
+
+    updated = iter(created)
+    deleted = iter(created)
+    cases.append(('create', create))
+    cases.append(('update', lambda: expect(
+        client.patch(f'/books/{next(updated)}', json={'price': 19.99}, headers=headers), 200)))
+    cases.append(('delete', lambda: expect(client.delete(f'/books/{next(deleted)}', headers=headers), 200, 204)))
+
+    credentials = {'email': BENCHMARK_EMAIL, 'password': BENCHMARK_PASSWORD}
+    cases.append(('login', lambda: expect(client.post('/users/login', json=credentials), 200)))
+    return cases
+
+def run_size(size, db_dir, iterations, warmup, only, workers):
+    """Benchmark results for one catalog size, keyed '<size>/<name>'"""
+    app = create_app(suite_config(os.path.join(db_dir, f'benchmark_{size}.db')))
+    results = {}
+
+    with app.app_context():
+        seeded = prepare_catalog(size, workers)
+        print(f'\n📚 {size:,} books ({"seeded" if seeded else "reused"})')
+
+        client = app.test_client()
+        user = User.query.filter_by(email=BENCHMARK_EMAIL).first()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+        def wanted(name):
+            return not only or any(pattern in name for pattern in only)
+        run_writes = any(wanted(name) for name in WRITE_CASES)
+
+        for name, func in build_cases(client, headers):
+            if not (wanted(name) or (name in WRITE_CASES and run_writes)):
+                continue
+            # Writes run exactly once per created book, so they get no warmup
+            result = measure(func, iterations, 0 if name in WRITE_CASES else warmup)
+            results[f'{size}/{name}'] = result
+            print(f"{name:>24}: {result['median_ms']:9.3f} ms median {result['p95_ms']:9.3f} ms p95")
+
+    return results
+
+def compare_results(results, baseline, threshold, min_delta_ms):
+    """Names of benchmarks whose median regressed past threshold against baseline"""
+    regressions = []
+    print(f"\n{'benchmark':>32} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        before, after = previous['median_ms'], result['median_ms']
+        change = (after - before) / before if before else 0.0
+        regressed = change > threshold and after - before > min_delta_ms
+        if regressed:
+            regressions.append(key)
+        print(f"{key:>32} {before:10.3f} {after:10.3f} {change:+8.1%}{'  ❌' if regressed else ''}")
+    return regressions
+
+@click.command()
+@click.option('--sizes', default='10000', help='Comma-separated catalog sizes, e.g. 10000,100000,1000000')
+@click.option('--iterations', default=30, help='Timed calls per benchmark')
+@click.option('--warmup', default=3, help='Untimed calls before each read benchmark')
+@click.option('--only', default='', help='Comma-separated substrings; run only matching benchmarks')
+@click.option('--db-dir', default='instance/benchmarks', help='Where seeded catalogs are kept for reuse')
+@click.option('--workers', default=None, type=int, help='Generator processes for seeding')
+@click.option('--output', default='benchmark-results.json', help='File the results are written to')
+@click.option('--compare', 'baseline_path', default=None, help='Baseline results file to compare against')
+@click.option('--threshold', default=0.2, help='Allowed median slowdown against the baseline (0.2 = 20%)')
+@click.option('--min-delta-ms', default=0.5, help='Ignore slowdowns smaller than this many milliseconds')
+def benchmark_suite(sizes, iterations, warmup, only, db_dir, workers, output, baseline_path,
+                    threshold, min_delta_ms):
+    """Time the book endpoints, writes and login on deterministic catalogs
+
+    Catalogs are seeded once with MockDataGenerator (fixed seed) and reused on
+    later runs. Results go to --output as JSON; with --compare the run exits
+    non-zero when a benchmark's median regressed past --threshold.
+    """
+    os.makedirs(db_dir, exist_ok=True)
+    only = [pattern for pattern in only.split(',') if pattern]
+
+    results = {}
+    for size in (int(size) for size in sizes.split(',')):
+        results.update(run_size(size, db_dir, iterations, warmup, only, workers))
+
+    report = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'iterations': iterations
+        },
+        'results': results
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\n💾 Results written to {output}')
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)['results']
+        regressions = compare_results(results, baseline, threshold, min_delta_ms)
+        if regressions:
+            raise click.ClickException(f'{len(regressions)} benchmark(s) regressed: {", ".join(regressions)}')
+        print('\n✅ No regressions')
+
+if __name__ == '__main__':
+    benchmark_suite()
@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from app import create_app, db
+from app.services.import_service import ImportService
+import click
+
+def load_checkpoint(path, source):
+    """Rows already committed by a previous run of the same file, or 0"""
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    return checkpoint.get('rows_done', 0) if checkpoint.get('source') == source else 0
+
+def save_checkpoint(path, source, rows_done):
+    # Write-then-rename so a crash never leaves a truncated checkpoint
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'source': source, 'rows_done': rows_done}, f)
+    os.replace(tmp_path, path)
+
+@click.command()
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='File format (default: from extension)')
+@click.option('--batch-size', default=None, type=int, help='Rows per transaction')
+@click.option('--errors', 'errors_path', default=None, help='Where to write rejected rows (default: PATH.errors.ndjson)')
+@click.option('--checkpoint', 'checkpoint_path', default=None, help='Checkpoint file (default: PATH.checkpoint.json)')
+@click.option('--restart', is_flag=True, help='Ignore any checkpoint and import from the first row')
+def import_books(path, fmt, batch_size, errors_path, checkpoint_path, restart):
+    """Import books from a CSV or NDJSON file"""
+    app = create_app()
+    source = os.path.abspath(path)
+    errors_path = errors_path or path + '.errors.ndjson'
+    checkpoint_path = checkpoint_path or path + '.checkpoint.json'
+
+    with app.app_context():
+        # Create tables if they don't exist
+        db.create_all()
+
+        fmt = ImportService.detect_format(path, fmt)
+        start_row = 0 if restart else load_checkpoint(checkpoint_path, source)
+        if start_row:
+            print(f"↩️  Resuming after row {start_row}")
+
+        with open(path, 'rb') as stream, open(errors_path, 'a' if start_row else 'w') as errors_file:
+            def on_error(row_number, errors, record):
+                errors_file.write(json.dumps({'row': row_number, 'errors': errors, 'record': record}) + '\n')
+
+            def on_batch(rows_done):
+                errors_file.flush()
+                save_checkpoint(checkpoint_path, source, rows_done)
+                print(f"   ... {rows_done} rows processed")
+
+            summary = ImportService.import_books(
+                stream, fmt, batch_size=batch_size, start_row=start_row,
+                on_error=on_error, on_batch=on_batch
+            )
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        print(f"\n✅ Import completed!")
+        print(f"📊 Summary:")
+        print(f"   - Rows read: {summary['rows']}")
+        print(f"   - Books imported: {summary['imported']}")
+        print(f"   - Rows rejected: {summary['failed']} (see {errors_path})")
+        print(f"   - Throughput: {summary['rows_per_sec']} rows/sec ({summary['seconds']}s)")
+
+if __name__ == '__main__':
+    import_books()
@@ -0,0 +1,322 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import random
+import asyncio
+import subprocess
+import urllib.request
+from urllib.parse import urlsplit, urlencode, quote
+from scripts.benchmark_async import read_response
+from scripts.mock_generators import MockDataGenerator
+import click
+
+# Default mix: mostly catalog reads, some logins and writes
+DEFAULT_MIX = {
+    'list': 40,
+    'detail': 30,
+    'search': 10,
+    'batch': 5,
+    'facets': 3,
+    'login': 2,
+    'create': 4,
+    'update': 4,
+    'delete': 2,
+}
+
+SEARCH_TERMS = ('system', 'love', 'history', 'war', 'dream', 'future', 'night', 'world')
+
+# Book IDs sampled from the catalog for detail and batch requests
+ID_POOL_SIZE = 1000
+
+class Client:
+    """One keep-alive HTTP/1.1 connection issuing requests back to back"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port, self.netloc = parts.hostname, parts.port or 80, parts.netloc
+        self.reader = self.writer = None
+
+    async def request(self, method, target, body=None, token=None):
+        """(status, body) for one request; reconnects when the server closed the connection"""
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = [f'{method} {target} HTTP/1.1', f'Host: {self.netloc}', 'Accept: application/json',
+                f'Content-Length: {len(payload)}']
+        if body is not None:
+            head.append('Content-Type: application/json')
+        if token:
+            head.append(f'Authorization: Bearer {token}')
+
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            self.writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + payload)
+            status, data, keep_alive = await read_response(self.reader)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            self.close()
+            raise
+        if not keep_alive:
+            self.close()
+        return status, data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+def load_mix(profile):
+    """Operation name -> spec from a profile file, or the default mix
+
+    Profile entries are either a built-in operation name with a weight, or a
+    named request to replay: {"weight": 10, "method": "GET", "path": "/books?..."}
+    with an optional "json" body and "auth": true.
+    """
+    if profile is None:
+        mix = DEFAULT_MIX
+    else:
+        with open(profile) as f:
+            mix = json.load(f)['mix']
+
+    operations = {}
+    for name, spec in mix.items():
+        spec = spec if isinstance(spec, dict) else {'weight': spec}
+        if 'path' not in spec and name not in DEFAULT_MIX:
+            raise click.ClickException(f'Unknown operation {name!r}; give it a method and path')
+        operations[name] = spec
+    return operations
+
+class Workload:
+    """Builds requests for the built-in operations from shared state"""
+
+    def __init__(self, book_ids, credentials, token):
+        self.book_ids = book_ids
+        self.credentials = credentials
+        self.token = token
+        # Books created by this run and not in use by another request; updates
+        # and deletes only touch these, claiming an id until the reply arrives
+        self.created = []
+        self.claimed = set()
+
+    def list_query(self, rng):
+        params = {'per_page': rng.choice((10, 20, 50)), 'page': rng.randint(1, 5)}
+        for name, value in (('author', lambda: rng.choice(MockDataGenerator.FAMOUS_AUTHORS)),
+                            ('category', lambda: rng.choice(MockDataGenerator.BOOK_CATEGORIES)),
+                            ('min_price', lambda: rng.choice((10, 20, 30))),
+                            ('release_year', lambda: rng.randint(1950, 2024)),
+                            ('sort', lambda: rng.choice(('price', 'release_date')))):
+            if rng.random() < 0.3:
+                params[name] = value()
+        return '/books?' + urlencode(params)
+
+    def book_payload(self, rng):
+        return {'title': f'Load test {rng.randrange(10 ** 9)}', 'author': rng.choice(MockDataGenerator.FAMOUS_AUTHORS),
+                'category': rng.choice(MockDataGenerator.BOOK_CATEGORIES), 'price': round(rng.uniform(5, 50), 2),
+                'release_date': '2020-01-01', 'description': 'Created by scripts/loadtest.py'}
+
+    def build(self, name, spec, rng):
+        """(method, target, body, token) for one request of operation name"""
+        if 'path' in spec:
+            return (spec.get('method', 'GET'), spec['path'], spec.get('json'),
+                    self.token if spec.get('auth') else None)
+
+        if name in ('update', 'delete') and not self.created:
+            name = 'create'
+        if name == 'list':
+            return 'GET', self.list_query(rng), None, None
+        if name == 'detail':
+            return 'GET', f'/books/{rng.choice(self.book_ids)}', None, None
+        if name == 'search':
+            return 'GET', '/books/search?' + urlencode({'q': rng.choice(SEARCH_TERMS)}), None, None
+        if name == 'batch':
+            ids = ','.join(str(book_id) for book_id in rng.sample(self.book_ids, min(20, len(self.book_ids))))
+            return 'GET', f'/books/batch?ids={ids}', None, None
+        if name == 'facets':
+            category = rng.choice(MockDataGenerator.BOOK_CATEGORIES)
+            return 'GET', '/books/facets?' + urlencode({'category': category}), None, None
+        if name == 'login':
+            return 'POST', '/users/login', self.credentials, None
+        if name == 'create':
+            return 'POST', '/books', self.book_payload(rng), self.token
+        book_id = self.created.pop(rng.randrange(len(self.created)))
+        self.claimed.add(book_id)
+        if name == 'update':
+            return 'PATCH', f'/books/{book_id}', {'price': round(rng.uniform(5, 50), 2)}, self.token
+        return 'DELETE', f'/books/{book_id}', None, self.token
+
+    def record(self, method, target, status, data):
+        if method == 'POST' and target == '/books' and status == 201:
+            self.created.append(json.loads(data)['id'])
+        elif method in ('PATCH', 'DELETE'):
+            book_id = self.claimed_id(target)
+            if book_id is not None:
+                self.claimed.discard(book_id)
+                # The update is done; the book may be updated or deleted again
+                if method == 'PATCH' and status != 404:
+                    self.created.append(book_id)
+
+    def release(self, method, target):
+        """Hand back the id claimed by a request that got no reply
+
+        Its outcome is unknown; if it was deleted after all, the next request
+        for it gets a 404 and drops it.
+        """
+        book_id = self.claimed_id(target) if method in ('PATCH', 'DELETE') else None
+        if book_id is not None:
+            self.claimed.discard(book_id)
+            self.created.append(book_id)
+
+    def claimed_id(self, target):
+        book_id = int(target[7:]) if target.startswith('/books/') and target[7:].isdigit() else None
+        return book_id if book_id in self.claimed else None
+
+async def run_worker(base_url, workload, operations, rng, start_at, stop_at, samples):
+    """One simulated client: waits for its ramp-up slot, then loops until stop_at"""
+    await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+    client = Client(base_url)
+    names = list(operations)
+    weights = [operations[name]['weight'] for name in names]
+
+    while time.monotonic() < stop_at:
+        name = rng.choices(names, weights)[0]
+        method, target, body, token = workload.build(name, operations[name], rng)
+        started = time.monotonic()
+        try:
+            status, data = await client.request(method, target, body, token)
+            workload.record(method, target, status, data)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            status = type(e).__name__
+            workload.release(method, target)
+        samples.append((name, started, time.monotonic() - started, status))
+
+    client.close()
+
+async def prepare(base_url, credentials):
+    """Sample book IDs and log in (signing up first if needed) for write tokens"""
+    client = Client(base_url)
+    book_ids, cursor = [], None
+    while len(book_ids) < ID_POOL_SIZE:
+        target = '/books?limit=100&fields=id' + (f'&cursor={quote(cursor)}' if cursor else '')
+        status, data = await client.request('GET', target)
+        if status != 200:
+            raise click.ClickException(f'GET {target} returned {status}')
+        page = json.loads(data)
+        book_ids.extend(book['id'] for book in page['books'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    if not book_ids:
+        raise click.ClickException('The catalog is empty; seed it first (scripts/seed_data.py)')
+
+    status, data = await client.request('POST', '/users/login', credentials)
+    if status == 401:
+        await client.request('POST', '/users/signup', credentials)
+        status, data = await client.request('POST', '/users/login', credentials)
+    if status != 200:
+        raise click.ClickException(f'Login failed with {status}: {data[:200]!r}')
+
+    client.close()
+    return book_ids, json.loads(data)['access_token']
+
+def percentile(latencies, p):
+    return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+def summarize(samples, window):
+    """Per-operation and overall throughput, latency percentiles and error rate"""
+    by_name = {}
+    for name, _, seconds, status in sorted(samples):
+        by_name.setdefault(name, []).append((seconds, status))
+    by_name['all'] = [(seconds, status) for _, _, seconds, status in samples]
+
+    report = {}
+    for name, rows in by_name.items():
+        latencies = sorted(seconds for seconds, _ in rows)
+        errors = [status for _, status in rows if not isinstance(status, int) or status >= 400]
+        report[name] = {
+            'requests': len(rows),
+            'rps': round(len(rows) / window, 2) if window else 0.0,
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p90_ms': round(percentile(latencies, 0.90), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            'error_rate': round(len(errors) / len(rows), 4) if rows else 0.0,
+            'errors': {str(status): errors.count(status) for status in set(errors)}
+        }
+    return report
+
+async def run_load(base_url, operations, concurrency, ramp_up, duration, seed, credentials):
+    book_ids, token = await prepare(base_url, credentials)
+    workload = Workload(book_ids, credentials, token)
+
+    started = time.monotonic()
+    steady_at = started + ramp_up
+    stop_at = steady_at + duration
+    samples = []
+    await asyncio.gather(*(
+        run_worker(base_url, workload, operations, random.Random(seed + index),
+                   started + ramp_up * index / concurrency, stop_at, samples)
+        for index in range(concurrency)
+    ))
+
+    # Only the steady state counts; ramp-up requests run at lower concurrency
+    steady = [sample for sample in samples if sample[1] >= steady_at]
+    return summarize(steady, duration)
+
+def start_server(port):
+    """Run the Flask app with threads on loopback and wait until /health answers"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'run:app', 'run', '--port', str(port), '--with-threads'],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise click.ClickException('The server did not start within 30 seconds')
+
+@click.command()
+@click.option('--url', default='http://127.0.0.1:5000', help='Base URL of a running server')
+@click.option('--serve', is_flag=True, help='Start the app on loopback (flask run --with-threads) for the test')
+@click.option('--port', default=5050, help='Port for --serve')
+@click.option('--profile', default=None, type=click.Path(exists=True), help='JSON workload profile ({"mix": {...}})')
+@click.option('--concurrency', default=50, help='Simulated clients')
+@click.option('--ramp-up', default=5.0, help='Seconds over which clients are started')
+@click.option('--duration', default=30.0, help='Seconds of steady-state load measured after ramp-up')
+@click.option('--seed', default=0, help='Random seed for the request mix')
+@click.option('--email', default='loadtest@example.com', help='Account used for logins and writes')
+@click.option('--password', default='LoadTest123', help='Password of --email (signed up if missing)')
+@click.option('--output', default=None, help='Also write the report as JSON here')
+def loadtest(url, serve, port, profile, concurrency, ramp_up, duration, seed, email, password, output):
+    """Drive a weighted mix of reads, logins and writes and report latency per operation"""
+    operations = load_mix(profile)
+    server = start_server(port) if serve else None
+    base_url = f'http://127.0.0.1:{port}' if serve else url
+
+    try:
+        report = asyncio.run(run_load(base_url, operations, concurrency, ramp_up, duration, seed,
+                                      {'email': email, 'password': password}))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"{'operation':>16} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+    for name, row in report.items():
+        print(f"{name:>16} {row['requests']:>9} {row['rps']:8.1f} {row['p50_ms']:8.1f} {row['p90_ms']:8.1f} "
+              f"{row['p99_ms']:8.1f} {row['max_ms']:8.1f} {row['error_rate']:7.1%}")
+        if row['errors']:
+            print(f"{'':>16} errors: {row['errors']}")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'concurrency': concurrency, 'duration': duration, 'operations': report}, f, indent=2)
+
+if __name__ == '__main__':
+    loadtest()
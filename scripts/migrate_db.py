@@ -0,0 +1,142 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.book import Book
+from app.models.revoked_token import RevokedToken
+from app.services.book_service import BookService
+from sqlalchemy.schema import CreateIndex
+import click
+
+def add_book_version_column():
+    """Add the optimistic-concurrency version column to an existing book table"""
+    columns = {column['name'] for column in db.inspect(db.engine).get_columns('book')}
+    if 'version' in columns:
+        print("Book version column already present")
+        return
+
+    # A constant default fills existing rows without rewriting them on SQLite,
+    # and touches no column the search, facet or change-feed triggers watch
+    with db.engine.begin() as connection:
+        connection.execute(db.text("ALTER TABLE book ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+    print("Book version column added")
+
+def rebuild_revoked_token_table():
+    """Recreate revoked_token with AUTOINCREMENT ids, keeping its rows"""
+    if db.engine.dialect.name != 'sqlite':
+        print("Skipping revoked token ids (only SQLite reuses them)")
+        return
+
+    sql = db.session.execute(
+        db.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'revoked_token'")
+    ).scalar()
+    if 'AUTOINCREMENT' in sql.upper():
+        print("Revoked token ids already monotonic")
+        return
+
+    # SQLite cannot add AUTOINCREMENT in place; renamed tables keep their
+    # index names, so those are dropped before the new table creates them
+    table = RevokedToken.__table__
+    columns = ', '.join(column.name for column in table.columns)
+    with db.engine.begin() as connection:
+        connection.execute(db.text("ALTER TABLE revoked_token RENAME TO revoked_token_old"))
+        for index in table.indexes:
+            connection.execute(db.text(f"DROP INDEX IF EXISTS {index.name}"))
+        table.create(connection)
+        connection.execute(db.text(
+            f"INSERT INTO revoked_token ({columns}) SELECT {columns} FROM revoked_token_old"
+        ))
+        connection.execute(db.text("DROP TABLE revoked_token_old"))
+    print("Revoked token table rebuilt with AUTOINCREMENT ids")
+
+def create_book_indexes():
+    """Create the Book filter indexes on an existing database"""
+    print("Creating book indexes...")
+
+    # IF NOT EXISTS keeps the migration idempotent; expression indexes are not
+    # reflected by every dialect, so checkfirst cannot be relied on
+    with db.engine.begin() as connection:
+        for index in Book.__table__.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
+    # Refresh planner statistics so the new indexes are picked up
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(db.text("ANALYZE book"))
+        db.session.commit()
+
+    print(f"Book indexes ready ({len(Book.__table__.indexes)} total)")
+
+def create_book_search_index(rebuild=False):
+    """Create the full-text search table and triggers, filling it if new"""
+    if db.engine.dialect.name != 'sqlite':
+        print("Skipping book search index (requires SQLite FTS5)")
+        return
+
+    exists = db.session.execute(
+        db.text("SELECT 1 FROM sqlite_master WHERE name = 'book_fts'")
+    ).first()
+
+    if exists and not rebuild:
+        print("Book search index already present")
+        return
+
+    print("Building book search index...")
+    BookService.rebuild_search_index()
+    print("Book search index rebuilt")
+
+def create_book_facet_counts():
+    """Create the facet summary table and triggers, filling it if new"""
+    if db.engine.dialect.name != 'sqlite':
+        print("Skipping book facet counts (facets are computed from book)")
+        return
+
+    exists = db.session.execute(
+        db.text("SELECT 1 FROM sqlite_master WHERE name = 'book_facet_count'")
+    ).first()
+
+    if exists:
+        print("Book facet counts already present")
+        return
+
+    print("Building book facet counts...")
+    BookService.rebuild_facet_counts()
+    print("Book facet counts built")
+
+def create_book_change_feed():
+    """Create the change feed the worker caches and catalog snapshot follow"""
+    if not BookService.rebuild_change_feed():
+        print("Skipping book change feed (requires SQLite)")
+        return
+    print("Book change feed ready")
+
+MIGRATIONS = [
+    add_book_version_column,
+    rebuild_revoked_token_table,
+    create_book_indexes,
+    create_book_search_index,
+    create_book_facet_counts,
+    create_book_change_feed,
+]
+
+@click.command()
+@click.option('--rebuild-search', is_flag=True, help='Only rebuild the full-text search index')
+def migrate_database(rebuild_search):
+    """Bring an existing database up to the current schema"""
+    app = create_app()
+
+    with app.app_context():
+        # Create tables if they don't exist
+        db.create_all()
+
+        if rebuild_search:
+            create_book_search_index(rebuild=True)
+            return
+
+        for migration in MIGRATIONS:
+            migration()
+
+        print(f"\n✅ Database migration completed!")
+
+if __name__ == '__main__':
+    migrate_database()
@@ -23,9 +23,10 @@ class MockDataGenerator:
     ]
     
     @staticmethod
-    def generate_book_data(count=50):
-        """Generate mock book data"""
+    def generate_book_data(count=50, seed=None):
+        """Generate mock book data (reproducible when a seed is given)"""
         books = []
+        rng, faker = MockDataGenerator.seeded(seed)
         
         for _ in range(count):
             # Generate release date between 1950 and 2024
@@ -33,21 +34,31 @@ class MockDataGenerator:
             end_date = date(2024, 12, 31)
             time_between = end_date - start_date
             days_between = time_between.days
-            random_days = random.randrange(days_between)
+            random_days = rng.randrange(days_between)
             release_date = start_date + timedelta(days=random_days)
             
             book = {
-                'title': fake.catch_phrase() + ': ' + fake.bs().title(),
-                'author': random.choice(MockDataGenerator.FAMOUS_AUTHORS),
-                'category': random.choice(MockDataGenerator.BOOK_CATEGORIES),
-                'price': round(random.uniform(9.99, 99.99), 2),
+                'title': faker.catch_phrase() + ': ' + faker.bs().title(),
+                'author': rng.choice(MockDataGenerator.FAMOUS_AUTHORS),
+                'category': rng.choice(MockDataGenerator.BOOK_CATEGORIES),
+                'price': round(rng.uniform(9.99, 99.99), 2),
                 'release_date': release_date.strftime('%Y-%m-%d'),
-                'description': fake.text(max_nb_chars=500)
+                'description': faker.text(max_nb_chars=500)
             }
             books.append(book)
         
         return books
     
+    @staticmethod
+    def seeded(seed=None):
+        """Random and Faker instances; private and seeded when seed is given"""
+        if seed is None:
+            return random, fake
+        
+        faker = Faker()
+        faker.seed_instance(seed)
+        return random.Random(seed), faker
+    
     @staticmethod
     def generate_user_data(count=20):
         """Generate mock user data"""
@@ -0,0 +1,70 @@
+import pytest
+from datetime import date
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.config import Config
+from app.models.book import Book
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+# The catalog most book tests run against, in id order
+CATALOG = [
+    {'title': 'The Great Gatsby', 'author': 'F. Scott Fitzgerald', 'category': 'Fiction',
+     'price': 12.99, 'release_date': date(1925, 4, 10), 'description': 'Jazz Age novel'},
+    {'title': 'Dune', 'author': 'Frank Herbert', 'category': 'Science Fiction',
+     'price': 18.50, 'release_date': date(1965, 8, 1), 'description': 'Desert planet'},
+    {'title': 'Sapiens', 'author': 'Yuval Noah Harari', 'category': 'History',
+     'price': 18.99, 'release_date': date(2011, 1, 1), 'description': 'Human history'},
+    {'title': 'Homo Deus', 'author': 'Yuval Noah Harari', 'category': 'History',
+     'price': 21.00, 'release_date': date(2015, 9, 1), 'description': 'Human future'},
+]
+
+
+def make_config(**overrides):
+    """TestConfig with overrides as class attributes"""
+    return type('TestConfig', (TestConfig,), overrides)
+
+
+def seed_books(rows):
+    """Insert books from dicts of Book columns and return them"""
+    books = [Book(**row) for row in rows]
+    db.session.add_all(books)
+    db.session.commit()
+    return books
+
+
+@pytest.fixture
+def config_overrides():
+    """Config attributes the app fixture sets; override per module or parametrize"""
+    return {}
+
+
+@pytest.fixture
+def app(config_overrides):
+    app = create_app(make_config(**config_overrides))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def books(app):
+    return seed_books(CATALOG)
+
+
+@pytest.fixture
+def auth_headers(app):
+    return {'Authorization': f"Bearer {create_access_token(identity='1')}"}
@@ -0,0 +1,101 @@
+import time
+import threading
+import pytest
+from app.services.admission import admission_control, classify_request, ConcurrencyLimiter
+
+
+ADMISSION_CONFIG = {
+    'RESPONSE_CACHE_BACKEND': 'none',
+    'ADMISSION_LIMITS': 'read=4,expensive=1,auth=2,write=2',
+    'ADMISSION_QUEUE_SIZE': 0,
+}
+
+RATE_LIMIT_CONFIG = {**ADMISSION_CONFIG, 'RATE_LIMIT_ENABLED': True, 'RATE_LIMITS': 'expensive=1/2'}
+
+
+@pytest.fixture
+def config_overrides():
+    return ADMISSION_CONFIG
+
+
+def test_requests_are_classified(app):
+    with app.test_request_context('/books'):
+        assert classify_request('/books', 'GET') == 'expensive'
+        assert classify_request('/books/search', 'GET') == 'expensive'
+        assert classify_request('/books/<int:book_id>', 'GET') == 'read'
+        assert classify_request('/books/batch', 'POST') == 'read'
+        assert classify_request('/books', 'POST') == 'write'
+        assert classify_request('/books/<int:book_id>', 'PATCH') == 'write'
+        assert classify_request('/users/login', 'POST') == 'auth'
+        assert classify_request('/health', 'GET') is None
+        assert classify_request('/metrics', 'GET') is None
+
+
+def test_full_class_is_shed_with_503(client, books):
+    limiter = admission_control.limiters['expensive']
+    assert limiter.acquire(0)
+    try:
+        response = client.get('/books')
+        # Other classes keep their own budget
+        assert client.get('/books/1').status_code == 200
+    finally:
+        limiter.release(0)
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert limiter.stats()['rejected'] == 1
+    assert client.get('/books').status_code == 200
+
+
+def test_slots_are_released_after_errors(client):
+    assert client.get('/books/999').status_code == 404
+    assert client.get('/books?fields=nope').status_code == 400
+    assert all(limiter.in_flight == 0 for limiter in admission_control.limiters.values())
+
+
+def test_queued_request_is_admitted_when_a_slot_frees():
+    limiter = ConcurrencyLimiter('read', 1, queue_size=1, target_latency=0)
+    assert limiter.acquire(0)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(limiter.acquire(5)))
+    waiter.start()
+    while limiter.stats()['waiting'] == 0:
+        time.sleep(0.01)
+
+    # The queue holds one request; the next is rejected at once
+    assert not limiter.acquire(5)
+    limiter.release(0)
+    waiter.join()
+    assert results == [True]
+    assert limiter.stats()['in_flight'] == 1
+
+
+def test_limit_adapts_to_latency():
+    limiter = ConcurrencyLimiter('expensive', 8, queue_size=0, target_latency=0.1)
+    for _ in range(50):
+        limiter.acquire(0)
+        limiter.release(0.5)
+    assert limiter.stats()['limit'] == 2
+
+    for _ in range(200):
+        for _ in range(int(limiter.limit)):
+            limiter.acquire(0)
+        for _ in range(int(limiter.limit)):
+            limiter.release(0.01)
+    assert limiter.stats()['limit'] == 8
+
+
+@pytest.mark.parametrize('config_overrides', [RATE_LIMIT_CONFIG])
+def test_rate_limit_per_client(client, books, auth_headers):
+    assert [client.get('/books').status_code for _ in range(3)] == [200, 200, 429]
+    response = client.get('/books')
+    assert response.headers['Retry-After'] == '1'
+    # Cheap reads are not rate limited
+    assert client.get('/books/1').status_code == 200
+
+    # An authenticated client has its own bucket
+    assert client.get('/books', headers=auth_headers).status_code == 200
+
+    stats = client.get('/health/stats').get_json()['admission']
+    assert stats['rate_limits']['expensive']['limited'] == 2
+    assert stats['rate_limits']['expensive']['clients'] == 2
@@ -0,0 +1,122 @@
+import gzip
+import json
+import asyncio
+import pytest
+from flask_jwt_extended import create_access_token
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('asgiref')
+pytest.importorskip('greenlet')
+
+from app import db
+from app.asgi import create_asgi_app
+from app.services.async_book_service import async_book_service
+from app.services.compression import response_compressor
+from conftest import CATALOG, make_config, seed_books
+
+
+@pytest.fixture
+def asgi_app(tmp_path):
+    app = create_asgi_app(make_config(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'library.db'}",
+                                      RESPONSE_CACHE_BACKEND='none'))
+    with app.flask_app.app_context():
+        db.create_all()
+        seed_books(CATALOG)
+    yield app
+    asyncio.run(async_book_service.dispose())
+    with app.flask_app.app_context():
+        db.drop_all()
+        db.engine.dispose()
+
+
+def request(app, method, path, query='', headers=(), body=b''):
+    """Run one request through the ASGI app and return (status, headers, raw body)"""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    headers = list(headers) + ([(b'content-length', str(len(body)).encode())] if body else [])
+    scope = {'type': 'http', 'method': method, 'path': path, 'raw_path': path.encode(),
+             'query_string': query.encode(), 'headers': headers, 'scheme': 'http',
+             'server': ('testserver', 80), 'root_path': '', 'http_version': '1.1'}
+    asyncio.run(app(scope, receive, send))
+
+    content = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return messages[0]['status'], dict(messages[0]['headers']), content
+
+
+def call(app, path, query='', headers=()):
+    """Run one GET through the ASGI app and return (status, JSON body)"""
+    status, response_headers, body = request(app, 'GET', path, query, headers)
+    if response_headers.get(b'content-encoding') == b'gzip':
+        body = gzip.decompress(body)
+    return status, json.loads(body)
+
+
+@pytest.mark.parametrize('path,query', [
+    ('/books', 'author=frank%20herbert&sort=price'),
+    ('/books', 'per_page=2&page=2'),
+    ('/books', 'include_total=estimate&category=fiction'),
+    ('/books', 'limit=1&sort=release_date'),
+    ('/books/search', 'q=dune'),
+    ('/books/2', ''),
+    ('/books', 'fields=title,description&limit=2&sort=price'),
+    ('/books/2', 'fields=price'),
+])
+def test_async_reads_match_sync_app(asgi_app, path, query):
+    status, data = call(asgi_app, path, query)
+    expected = asgi_app.flask_app.test_client().get(f'{path}?{query}')
+    assert status == expected.status_code == 200
+    assert data == expected.get_json()
+
+
+def test_async_cursor_follows_next_page(asgi_app):
+    _, first = call(asgi_app, '/books', 'limit=2')
+    _, second = call(asgi_app, '/books', f"cursor={first['next_cursor']}")
+    assert [book['id'] for book in first['books'] + second['books']] == [1, 2, 3, 4]
+    assert second['next_cursor'] is None
+
+
+def test_async_errors(asgi_app):
+    assert call(asgi_app, '/books', 'sort=title')[0] == 400
+    assert call(asgi_app, '/books/999')[0] == 404
+    assert call(asgi_app, '/books/2', 'fields=isbn')[0] == 400
+
+
+def test_async_detail_etag_drives_conditional_requests(asgi_app):
+    status, headers, _ = request(asgi_app, 'GET', '/books/1')
+    etag = headers[b'etag']
+    expected = asgi_app.flask_app.test_client().get('/books/1')
+    assert status == 200 and etag.decode() == expected.headers['ETag'] == '"1-1"'
+
+    status, _, body = request(asgi_app, 'GET', '/books/1', headers=[(b'if-none-match', etag)])
+    assert status == 304 and body == b''
+
+    with asgi_app.flask_app.app_context():
+        token = create_access_token(identity='1')
+    status, headers, body = request(
+        asgi_app, 'PATCH', '/books/1', body=json.dumps({'price': 9.99}).encode(),
+        headers=[(b'if-match', etag), (b'content-type', b'application/json'),
+                 (b'authorization', f'Bearer {token}'.encode())])
+    assert status == 200 and json.loads(body)['version'] == 2
+
+    status, headers, _ = request(asgi_app, 'GET', '/books/1', headers=[(b'if-none-match', etag)])
+    assert status == 200 and headers[b'etag'] == b'"1-2"'
+
+
+def test_async_responses_are_compressed(asgi_app, monkeypatch):
+    monkeypatch.setattr(response_compressor, 'min_size', 0)
+    before = response_compressor.stats()['responses']
+    status, data = call(asgi_app, '/books', 'per_page=2', headers=[(b'accept-encoding', b'gzip')])
+    assert status == 200 and len(data['books']) == 2
+    assert response_compressor.stats()['responses'] - before == 1
+
+
+def test_other_routes_fall_through_to_flask(asgi_app):
+    status, data = call(asgi_app, '/health')
+    assert status == 200
+    assert data['status'] == 'healthy'
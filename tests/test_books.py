@@ -0,0 +1,537 @@
+import io
+import csv
+import gzip
+import json
+import re
+import pytest
+from datetime import date
+from app import db
+from app.models.book import Book
+from app.schemas.book_schemas import BookResponseSchema, serialize_book
+from app.services.book_service import BookService, ValidationError
+from app.services.import_service import ImportService, ReportedErrors
+from conftest import CATALOG, seed_books
+
+
+def query_plan(query):
+    """Return the EXPLAIN QUERY PLAN details for a book query"""
+    compiled = query.statement.compile(db.engine)
+    params = [compiled.params[name] for name in compiled.positiontup]
+    params = [p.isoformat() if isinstance(p, date) else p for p in params]
+    rows = db.session.connection().exec_driver_sql(
+        'EXPLAIN QUERY PLAN ' + str(compiled), tuple(params)
+    ).all()
+    return ' | '.join(row[-1] for row in rows)
+
+@pytest.mark.parametrize('filters, index_name', [
+    ({'author': 'Frank Herbert'}, 'ix_book_author_release_date'),
+    ({'author': 'Frank Herbert', 'release_year': '1965'}, 'ix_book_author_release_date'),
+    # Either composite index serves an equality on category alone
+    ({'category': 'History'}, 'ix_book_category_price|ix_book_category_release_date'),
+    ({'category': 'History', 'min_price': '10', 'max_price': '20'}, 'ix_book_category_price'),
+    ({'category': 'History', 'release_from': '2010-01-01'}, 'ix_book_category_release_date'),
+    ({'min_price': '10', 'max_price': '20'}, 'ix_book_price'),
+    ({'release_year': '2011'}, 'ix_book_release_date'),
+    ({'release_from': '2000-01-01', 'release_to': '2012-12-31'}, 'ix_book_release_date'),
+])
+def test_filter_query_uses_index(app, filters, index_name):
+    plan = query_plan(Book.query.filter(*BookService.build_filter_conditions(filters)))
+    # Whole names only: ix_book_category must not match ix_book_category_price
+    assert re.search(rf'USING (COVERING )?INDEX ({index_name})\b', plan), plan
+    assert 'SCAN book' not in plan
+
+def test_filter_by_author_is_case_insensitive(client, books):
+    response = client.get('/books?author=yuval noah harari')
+    assert response.status_code == 200
+    assert response.get_json()['total'] == 2
+
+def test_filter_by_category_and_price(client, books):
+    response = client.get('/books?category=history&max_price=19')
+    data = response.get_json()
+    assert [book['title'] for book in data['books']] == ['Sapiens']
+
+def test_filter_by_release_year_and_range(client, books):
+    response = client.get('/books?release_year=1965')
+    assert [book['title'] for book in response.get_json()['books']] == ['Dune']
+
+    response = client.get('/books?release_from=1960-01-01&release_to=2011-01-01')
+    assert {book['title'] for book in response.get_json()['books']} == {'Dune', 'Sapiens'}
+
+def test_invalid_release_from(app):
+    with pytest.raises(ValidationError):
+        BookService.get_books_with_filters(filters={'release_from': '2011-13-01'})
+
+def test_search_ranks_by_relevance(client, books):
+    response = client.get('/books/search?q=history')
+    data = response.get_json()
+    assert response.status_code == 200
+    assert [book['title'] for book in data['books']] == ['Sapiens', 'Homo Deus']
+
+    response = client.get('/books/search?q=sapiens human')
+    assert [book['title'] for book in response.get_json()['books']] == ['Sapiens']
+
+def test_search_matches_prefixes_and_ignores_operators(client, books):
+    response = client.get('/books/search?q=fitzg')
+    assert [book['title'] for book in response.get_json()['books']] == ['The Great Gatsby']
+
+    response = client.get('/books/search?q=dune OR "NEAR(')
+    assert [book['title'] for book in response.get_json()['books']] == []
+
+def test_search_index_follows_updates_and_deletes(app, books):
+    BookService.update_book(books[1].id, {'title': 'Children of Dune'})
+    assert BookService.search_books('children')['total'] == 1
+
+    BookService.delete_book(books[1].id)
+    assert BookService.search_books('dune')['total'] == 0
+
+def test_list_filter_combines_q_with_filters(client, books):
+    response = client.get('/books?q=human&max_price=20')
+    assert [book['title'] for book in response.get_json()['books']] == ['Sapiens']
+
+def test_rebuild_search_index(app, books):
+    db.session.execute(db.text("INSERT INTO book_fts(book_fts) VALUES ('delete-all')"))
+    db.session.commit()
+    assert BookService.search_books('gatsby')['total'] == 0
+
+    BookService.rebuild_search_index()
+    assert BookService.search_books('gatsby')['total'] == 1
+
+def test_search_requires_words(client, books):
+    response = client.get('/books/search?q=%20*')
+    assert response.status_code == 400
+
+def walk_cursor_pages(client, url):
+    """Follow next_cursor links, returning the titles of every page"""
+    pages = []
+    response = client.get(url).get_json()
+    while True:
+        pages.append([book['title'] for book in response['books']])
+        if not response['next_cursor']:
+            return pages, response
+        response = client.get(f"{url}&cursor={response['next_cursor']}").get_json()
+
+def test_cursor_pagination_walks_forward_and_back(client, books):
+    pages, last = walk_cursor_pages(client, '/books?limit=3')
+    assert pages == [['The Great Gatsby', 'Dune', 'Sapiens'], ['Homo Deus']]
+    assert last['total'] is None
+
+    response = client.get(f"/books?cursor={last['prev_cursor']}").get_json()
+    assert [book['title'] for book in response['books']] == ['The Great Gatsby', 'Dune', 'Sapiens']
+    assert response['prev_cursor'] is None
+    assert response['next_cursor']
+
+def test_cursor_pagination_by_price_with_filters(client, books):
+    pages, _ = walk_cursor_pages(client, '/books?limit=1&sort=price&min_price=15')
+    assert pages == [['Dune'], ['Sapiens'], ['Homo Deus']]
+
+def test_cursor_pagination_total_on_request(client, books):
+    response = client.get('/books?limit=2&category=History&include_total=true').get_json()
+    assert response['total'] == 2
+    assert response['next_cursor'] is None
+
+def test_cursor_seek_uses_index(app, books):
+    position = BookService.decode_cursor(BookService.encode_cursor(books[1], 'release_date', 'next'))
+    query = Book.query.filter(BookService.build_seek_condition(position)).order_by(*BookService.build_ordering('release_date')).limit(11)
+    plan = query_plan(query)
+    assert 'SEARCH book USING INDEX ix_book_release_date' in plan
+    assert 'TEMP B-TREE' not in plan
+
+def test_invalid_cursor(client, books):
+    response = client.get('/books?cursor=not-a-cursor')
+    assert response.status_code == 400
+
+def test_totals_are_cached_until_a_write(client, books):
+    before = client.get('/health/stats').get_json()['totals']
+    assert client.get('/books?category=history').get_json()['total'] == 2
+    client.get('/books?category=HISTORY&page=2')
+
+    after = client.get('/health/stats').get_json()['totals']
+    assert after['count_queries'] - before['count_queries'] == 1
+    assert after['cache']['hits'] - before['cache']['hits'] == 1
+
+    BookService.delete_book(books[2].id)
+    assert client.get('/books?category=history').get_json()['total'] == 1
+
+def test_include_total_modes(app, client, books):
+    response = client.get('/books?include_total=none').get_json()
+    assert response['total'] is None and response['pages'] is None
+    assert len(response['books']) == 4
+
+    # Three of four books match; one id from each half of the id range is
+    # probed, so the estimate is 3 or 4 but never below the proven minimum
+    app.config['BOOK_TOTAL_ESTIMATE_THRESHOLD'] = 2
+    response = client.get('/books?include_total=estimate&max_price=20').get_json()
+    assert response['total'] in (3, 4) and response['total_estimated'] is True
+    assert response['pages'] == 1
+
+    response = client.get('/books?include_total=estimate&category=history').get_json()
+    assert response['total'] == 2 and response['total_estimated'] is False
+
+    assert client.get('/books?include_total=sometimes').status_code == 400
+
+def test_estimate_samples_the_whole_id_range(app, books):
+    sample_ids = BookService.sample_book_ids(1, 10000, 100)
+    assert len(set(sample_ids)) == 100 and 1 <= min(sample_ids) <= 100 and 9901 <= max(sample_ids) <= 10000
+    assert BookService.sample_book_ids(5, 7, 100) == [5, 6, 7]
+
+    # Matches clustered in the first ids no longer look like the whole table
+    seed_books([{**CATALOG[3], 'title': f'Late {number}', 'price': 90.0} for number in range(96)])
+    # The first four rows hold three matches, which used to extrapolate to 75
+    total = BookService.estimate_total(BookService.build_filter_conditions({'max_price': '20'}), 4)
+    assert total <= 25
+
+def test_book_detail_cache_hits_and_invalidation(app, books):
+    before = BookService.get_book_cache_stats()
+    assert BookService.get_book_by_id(books[0].id)['price'] == 12.99
+    assert BookService.get_book_by_id(books[0].id)['price'] == 12.99
+    after = BookService.get_book_cache_stats()
+    assert after['hits'] - before['hits'] == 1
+
+    BookService.update_book(books[0].id, {'price': 10.0})
+    assert BookService.get_book_by_id(books[0].id)['price'] == 10.0
+
+    BookService.delete_book(books[0].id)
+    with pytest.raises(ValidationError):
+        BookService.get_book_by_id(books[0].id)
+
+def test_book_cache_evicts_other_workers_writes(app, books):
+    from app.services.change_feed import book_change_feed
+
+    assert BookService.get_book_by_id(books[0].id)['title'] == 'The Great Gatsby'
+    assert BookService.get_book_by_id(books[1].id)['title'] == 'Dune'
+
+    # Writes from another worker skip this one's invalidate_caches
+    db.session.execute(db.update(Book).where(Book.id == books[0].id).values(title='Trimalchio'))
+    db.session.commit()
+    assert BookService.get_book_by_id(books[0].id)['title'] == 'The Great Gatsby'
+
+    book_change_feed.interval = 0
+    before = BookService.get_book_cache_stats()
+    assert BookService.get_book_by_id(books[0].id)['title'] == 'Trimalchio'
+    assert BookService.get_book_by_id(books[1].id)['title'] == 'Dune'
+    assert BookService.get_book_cache_stats()['hits'] - before['hits'] == 1
+
+def test_conditional_update_with_if_match(client, books, auth_headers):
+    url = f'/books/{books[0].id}'
+    response = client.get(url)
+    assert response.headers['ETag'] == f'"{books[0].id}-1"' and response.get_json()['version'] == 1
+
+    headers = {**auth_headers, 'If-Match': response.headers['ETag']}
+    response = client.patch(url, json={'price': 10.0}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{books[0].id}-2"' and response.get_json()['version'] == 2
+
+    # A second editor still holding version 1 is refused and told the current one
+    response = client.patch(url, json={'price': 99.0}, headers=headers)
+    assert response.status_code == 412
+    assert response.headers['ETag'] == f'"{books[0].id}-2"'
+    assert client.get(url).get_json()['price'] == 10.0
+
+    # Comparison is strong: weak, projection and other books' tags never match
+    projection_etag = client.get(f'{url}?fields=title').headers['ETag']
+    for tag in (f'W/"{books[0].id}-2"', projection_etag, f'"{books[1].id}-2"'):
+        response = client.patch(url, json={'price': 99.0}, headers={**auth_headers, 'If-Match': tag})
+        assert response.status_code == 412
+
+    # Tags of compressed responses stay strong; no If-Match means unconditional
+    etag = client.get(url, headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = client.patch(url, json={'price': 11.0}, headers={**auth_headers, 'If-Match': etag})
+    assert response.headers['ETag'] == f'"{books[0].id}-3"'
+    response = client.patch(url, json={'price': 12.0}, headers=auth_headers)
+    assert response.headers['ETag'] == f'"{books[0].id}-4"'
+    assert client.get(url, headers={'If-None-Match': f'"{books[0].id}-4"'}).status_code == 304
+
+def test_conditional_delete_with_if_match(client, books, auth_headers):
+    url = f'/books/{books[1].id}'
+    assert client.delete(url, headers={**auth_headers, 'If-Match': 'v1'}).status_code == 400
+    assert client.delete(url, headers={**auth_headers, 'If-Match': f'"{books[1].id}-7"'}).status_code == 412
+    assert client.delete(url, headers={**auth_headers, 'If-Match': f'"{books[1].id}-1"'}).status_code == 200
+    assert client.delete(url, headers={**auth_headers, 'If-Match': f'"{books[1].id}-1"'}).status_code == 404
+    assert client.patch(url, json={'price': 1.0}, headers=auth_headers).status_code == 400
+
+def test_update_and_delete_are_single_statements(app, books):
+    from sqlalchemy import event
+
+    book_ids = [book.id for book in books]
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        book = BookService.update_book(book_ids[0], {'title': 'Gatsby', 'price': 10.0}, versions=[1])
+        BookService.delete_book(book_ids[1], versions=[1])
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert (book['title'], book['price'], book['version']) == ('Gatsby', 10.0, 2)
+    assert [sql.split()[0].upper() for sql in statements] == ['UPDATE', 'DELETE']
+    assert BookService.search_books('gatsby')['total'] == 1
+
+def test_book_cache_warms_from_saved_hot_ids(app, books, tmp_path):
+    path = str(tmp_path / 'hot_books.json')
+    app.config.update(BOOK_CACHE_WARM_PATH=path, BOOK_CACHE_WARM_SAMPLE_RATE=1.0)
+    # Lookups are only counted once a server entry point starts the warm-up
+    BookService.get_book_by_id(books[1].id)
+    assert BookService.get_book_cache_stats()['tracked_ids'] == 0
+
+    assert BookService.start_cache_warmup(app) == 0
+    for _ in range(3):
+        BookService.get_book_by_id(books[2].id)
+    BookService.get_book_by_id(books[1].id)
+    BookService.save_hot_book_ids(path, 1)
+
+    BookService.init_app(app)
+    assert BookService.start_cache_warmup(app) == 1
+    before = BookService.get_book_cache_stats()
+    BookService.get_book_by_id(books[2].id)
+    assert BookService.get_book_cache_stats()['hits'] - before['hits'] == 1
+
+def test_batch_fetch_keeps_order_and_reports_missing(app, client, books):
+    ids = [books[2].id, 999, books[0].id, books[2].id]
+    response = client.get(f"/books/batch?ids={','.join(map(str, ids))}&fields=title").get_json()
+    assert response == {
+        'books': [{'id': books[2].id, 'title': 'Sapiens'}, {'id': books[0].id, 'title': 'The Great Gatsby'}],
+        'missing': [999]
+    }
+
+    response = client.post('/books/batch', json=[books[1].id, books[3].id]).get_json()
+    assert [book['title'] for book in response['books']] == ['Dune', 'Homo Deus']
+    assert response['books'][0] == BookService.get_book_by_id(books[1].id)
+
+def test_batch_fetch_uses_detail_cache_and_one_query(app, books):
+    from sqlalchemy import event
+
+    book_ids = [book.id for book in books]
+    BookService.get_book_by_id(book_ids[0])
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        before = BookService.get_book_cache_stats()['hits']
+        result = BookService.get_books_by_ids(book_ids)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert [book['id'] for book in result['books']] == book_ids
+    assert BookService.get_book_cache_stats()['hits'] - before == 1
+    assert len([sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]) == 1
+
+def test_batch_fetch_rejects_bad_requests(app, client, books):
+    assert client.get('/books/batch?ids=1,two').status_code == 400
+    assert client.get('/books/batch').status_code == 400
+    assert client.post('/books/batch', json=[1, True]).status_code == 400
+
+    app.config['BOOK_BATCH_MAX_IDS'] = 2
+    assert client.post('/books/batch', json=[1, 2, 3]).status_code == 400
+
+def test_serialize_book_matches_response_schema(app, books):
+    for book in books:
+        assert serialize_book(book) == BookResponseSchema().dump(book)
+
+def test_list_leaves_out_description_unless_requested(client, books):
+    book = client.get('/books?per_page=1').get_json()['books'][0]
+    assert 'description' not in book and book['title'] == 'The Great Gatsby'
+
+    book = client.get('/books?per_page=1&fields=title,description').get_json()['books'][0]
+    assert book == {'id': books[0].id, 'title': 'The Great Gatsby', 'description': 'Jazz Age novel'}
+
+def test_sparse_fieldsets_project_columns_in_sql(app, books):
+    statement = BookService.build_list_statement({}, 'price', BookService.parse_fields('title'))
+    columns = str(statement.compile(db.engine)).split('FROM')[0]
+    assert 'book.title' in columns and 'book.price' in columns
+    assert 'book.description' not in columns and 'book.author' not in columns
+
+    serialized = BookResponseSchema(only=('id', 'price')).dump(books[1])
+    assert BookService.get_book_by_id(books[1].id, ('id', 'price')) == serialized
+
+def test_sparse_fieldsets_in_cursor_mode_and_detail(client, books):
+    pages, _ = walk_cursor_pages(client, '/books?limit=2&sort=price&fields=title')
+    assert pages == [['The Great Gatsby', 'Dune'], ['Sapiens', 'Homo Deus']]
+
+    response = client.get(f'/books/{books[1].id}?fields=author').get_json()
+    assert response == {'id': books[1].id, 'author': 'Frank Herbert'}
+    assert 'description' in client.get(f'/books/{books[1].id}').get_json()
+
+    assert client.get('/books?fields=title,isbn').status_code == 400
+    assert client.get(f'/books/{books[1].id}?fields=isbn').status_code == 400
+
+@pytest.mark.parametrize('value', ['', ',', '%20', '%20,%20'])
+def test_sparse_fieldsets_naming_no_fields_use_the_default(client, books, value):
+    assert client.get(f'/books/{books[1].id}?fields={value}').get_json() == client.get(f'/books/{books[1].id}').get_json()
+    assert client.get(f'/books?fields={value}').get_json() == client.get('/books').get_json()
+
+def test_bulk_create_reports_partial_failures(client, books, auth_headers):
+    payload = [
+        {'title': 'Emma', 'author': 'Jane Austen', 'category': 'Romance',
+         'price': 9.5, 'release_date': '1815-12-23'},
+        {'title': '', 'author': 'Nobody'},
+        {'title': 'Persuasion', 'author': 'Jane Austen', 'category': 'Romance',
+         'price': 8.0, 'release_date': '1817-12-20', 'description': 'Second chances'},
+    ]
+    response = client.post('/books/bulk', json=payload, headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 207
+    assert (data['succeeded'], data['failed']) == (2, 1)
+    assert [result['index'] for result in data['results']] == [0, 1, 2]
+    assert 'title' in data['results'][1]['errors']
+    assert client.get(f"/books/{data['results'][2]['id']}").get_json()['title'] == 'Persuasion'
+    assert BookService.search_books('persuasion')['total'] == 1
+
+def test_bulk_update_and_delete(client, books, auth_headers):
+    client.get('/books/1')
+    response = client.patch('/books/bulk', headers=auth_headers, json=[
+        {'id': 1, 'price': 5.0},
+        {'id': 2, 'title': 'Dune Messiah', 'price': 6.0},
+        {'id': 99, 'price': 1.0},
+        {'id': 3},
+    ])
+    data = response.get_json()
+    assert response.status_code == 207
+    assert [result.get('status') for result in data['results']] == ['updated', 'updated', None, None]
+    assert data['results'][3]['errors'] == {'_schema': ['No fields to update']}
+    assert client.get('/books/3').get_json()['version'] == 1
+    book = client.get('/books/1').get_json()
+    assert (book['price'], book['version']) == (5.0, 2)
+    assert BookService.search_books('messiah')['total'] == 1
+
+    response = client.delete('/books/bulk', headers=auth_headers, json=[1, 2, 1])
+    data = response.get_json()
+    assert response.status_code == 207
+    assert (data['succeeded'], data['failed']) == (2, 1)
+    assert data['results'][2]['errors'] == {'id': ['Duplicate of item 0']}
+    assert client.get('/books/1').status_code == 404
+
+def test_bulk_rejects_oversized_payloads(app, client, auth_headers):
+    app.config['BOOK_BULK_MAX_ITEMS'] = 2
+    response = client.delete('/books/bulk', headers=auth_headers, json=[1, 2, 3])
+    assert response.status_code == 400
+    assert client.post('/books/bulk', headers=auth_headers, json={'title': 'x'}).status_code == 400
+
+def test_export_streams_ndjson_with_filters(client, books):
+    response = client.get('/books/export?category=history')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [row['title'] for row in rows] == ['Sapiens', 'Homo Deus']
+    assert rows[0] == client.get(f"/books/{rows[0]['id']}").get_json()
+
+def test_export_streams_gzipped_csv(client, books):
+    response = client.get('/books/export?format=csv', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode())))
+    assert len(rows) == 4
+    assert rows[1]['title'] == 'Dune' and rows[1]['release_date'] == '1965-08-01'
+    assert 'Accept-Encoding' in response.vary
+
+    # q=0 refuses gzip
+    response = client.get('/books/export', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+    assert len(response.data.decode().splitlines()) == 4
+
+def test_export_rejects_bad_requests(client, books):
+    assert client.get('/books/export?format=xml').status_code == 400
+    assert client.get('/books/export?min_price=cheap').status_code == 400
+
+def test_import_upload_reports_bad_rows(client, auth_headers):
+    feed = (
+        'title,author,category,price,release_date,isbn\n'
+        'Emma,Jane Austen,Romance,9.50,1815-12-23,111\n'
+        'Broken,Jane Austen,Romance,free,1815-12-23,222\n'
+        'Persuasion,Jane Austen,Romance,8.00,1817-12-20,333\n'
+    )
+    response = client.post('/books/import', headers=auth_headers, data={
+        'file': (io.BytesIO(feed.encode()), 'feed.csv')
+    })
+    data = response.get_json()
+    assert response.status_code == 200
+    assert (data['rows'], data['imported'], data['failed']) == (3, 2, 1)
+    assert data['errors'][0]['row'] == 2 and 'price' in data['errors'][0]['errors']
+    assert client.get('/books?author=jane austen').get_json()['total'] == 2
+
+def test_import_upload_reports_errors_in_row_order(client, auth_headers):
+    # Row 1 fails validation when its batch is flushed, after row 2 fails to parse
+    feed = '\n'.join([
+        json.dumps({'title': 'Broken', 'author': 'A', 'category': 'C', 'price': 'free', 'release_date': '2001-01-01'}),
+        '{not json',
+        json.dumps({'title': 'Fine', 'author': 'A', 'category': 'C', 'price': 5, 'release_date': '2001-01-01'}),
+    ])
+    response = client.post('/books/import', headers=auth_headers, data={
+        'file': (io.BytesIO(feed.encode()), 'feed.ndjson')
+    })
+    assert [error['row'] for error in response.get_json()['errors']] == [1, 2]
+
+def test_reported_errors_keep_the_first_rows():
+    errors = ReportedErrors(limit=2)
+    for row_number in (5, 2, 9, 1):
+        errors(row_number, {'_schema': ['bad']}, None)
+    assert [error['row'] for error in errors.rows()] == [1, 2]
+
+def test_import_resumes_after_checkpoint(app):
+    lines = [json.dumps({'title': f'Book {n}', 'author': 'A', 'category': 'C',
+                         'price': n, 'release_date': '2001-01-01'}) for n in range(1, 6)]
+    feed = '\n'.join(lines[:2] + ['{not json'] + lines[2:]).encode()
+
+    checkpoints, errors = [], []
+    summary = ImportService.import_books(
+        io.BytesIO(feed), 'ndjson', batch_size=2, start_row=3,
+        on_error=lambda row, row_errors, record: errors.append(row),
+        on_batch=checkpoints.append
+    )
+    assert (summary['imported'], summary['failed']) == (3, 0)
+    assert checkpoints == [5, 6]
+    assert [book.title for book in Book.query.order_by(Book.id)] == ['Book 3', 'Book 4', 'Book 5']
+
+def test_facets_without_filters_read_summary_table(client, books):
+    data = client.get('/books/facets').get_json()
+    assert data['total'] == 4
+    assert data['facets']['category'] == [{'value': 'History', 'count': 2},
+                                          {'value': 'Fiction', 'count': 1},
+                                          {'value': 'Science Fiction', 'count': 1}]
+    assert {'value': 1965, 'count': 1} in data['facets']['release_year']
+    assert {'value': '10-20', 'count': 3} in data['facets']['price']
+
+    statement = str(BookService.build_facet_statement({}, 10).compile(db.engine))
+    assert 'book_facet_count' in statement and 'FROM book ' not in statement
+
+def test_facets_with_filters_match_summary_counts(app, client, books):
+    filtered = client.get('/books/facets?author=yuval%20noah%20harari&limit=1').get_json()
+    assert filtered['total'] == 2
+    assert filtered['facets']['category'] == [{'value': 'History', 'count': 2}]
+    assert len(filtered['facets']['price']) == 1
+
+    # A filter matching everything goes through the scan path; it must agree
+    assert BookService.get_facets({'min_price': '0'}) == BookService.get_facets()
+
+def test_facet_counts_follow_writes(app, books):
+    BookService.create_book({'title': 'Emma', 'author': 'Jane Austen', 'category': 'Fiction',
+                             'price': 9.5, 'release_date': '1815-12-23'})
+    BookService.update_book(books[1].id, {'category': 'Fiction', 'price': 120})
+    BookService.delete_book(books[2].id)
+    BookService.bulk_create_books([{'title': 'Persuasion', 'author': 'Jane Austen', 'category': 'Fiction',
+                                    'price': 8.0, 'release_date': '1817-12-20'}])
+
+    facets = BookService.get_facets()
+    assert facets == BookService.get_facets({'min_price': '0'})
+    assert facets['facets']['category'] == [{'value': 'Fiction', 'count': 4}, {'value': 'History', 'count': 1}]
+    assert {'value': 'Frank Herbert', 'count': 1} in facets['facets']['author']
+    assert {'value': 'Yuval Noah Harari', 'count': 1} in facets['facets']['author']
+
+    assert BookService.rebuild_facet_counts()
+    assert BookService.get_facets() == facets
+
+def test_facets_reject_bad_limit(client, books):
+    assert client.get('/books/facets?limit=0').status_code == 400
+    assert client.get('/books/facets?limit=101').status_code == 400
+
+def test_price_stats(client, books):
+    data = client.get('/books/stats?category=history&bins=2').get_json()
+    assert data['count'] == 2
+    assert data['min'] == 18.99 and data['max'] == 21.0
+    assert data['mean'] == 19.995
+    assert data['percentiles']['p50'] == 18.99
+    assert [bucket['count'] for bucket in data['histogram']] == [1, 1]
+
+    assert client.get('/books/stats?author=nobody').get_json()['histogram'] == []
+    assert client.get('/books/stats?bins=0').status_code == 400
@@ -0,0 +1,119 @@
+import pytest
+from datetime import date
+
+pytest.importorskip('numpy')
+
+from app import db
+from app.models.book import Book
+from app.services.book_service import BookService
+from app.services.catalog_snapshot import catalog_snapshot
+from conftest import seed_books
+
+
+@pytest.fixture
+def config_overrides():
+    return {'BOOK_SNAPSHOT_ENABLED': True, 'BOOK_SNAPSHOT_POLL_INTERVAL': 3600}
+
+
+@pytest.fixture(autouse=True)
+def catalog(books):
+    # A second book at Dune's price makes the price sort break ties by id
+    return books + seed_books([{'title': 'Children of Dune', 'author': 'Frank Herbert', 'category': 'Science Fiction',
+                                'price': 18.50, 'release_date': date(1976, 4, 1)}])
+
+
+def from_sql(func, *args, **kwargs):
+    catalog_snapshot.enabled = False
+    try:
+        return func(*args, **kwargs)
+    finally:
+        catalog_snapshot.enabled = True
+
+
+@pytest.mark.parametrize('filters, sort, page, per_page', [
+    ({}, 'id', 1, 10),
+    ({'author': 'frank herbert'}, 'price', 1, 10),
+    ({'category': 'HISTORY', 'min_price': '19'}, 'id', 1, 10),
+    ({'min_price': '13', 'max_price': '19'}, 'price', 2, 2),
+    ({'release_year': '1965'}, 'release_date', 1, 10),
+    ({'release_from': '1970-01-01', 'release_to': '2012-12-31'}, 'release_date', 1, 1),
+    ({'author': 'nobody'}, 'id', 1, 10),
+])
+def test_snapshot_lists_match_sql(app, filters, sort, page, per_page):
+    result = BookService.get_books_with_filters(page, per_page, filters, sort)
+    assert catalog_snapshot.stats()['rows'] == 5
+    assert result == from_sql(BookService.get_books_with_filters, page, per_page, filters, sort)
+
+@pytest.mark.parametrize('author', ['Émile Zola', 'émile zola', 'éMILE ZOLA', 'ÉMILE ZOLA'])
+def test_snapshot_folds_case_like_sqlite(app, author):
+    # SQLite's lower() leaves non-ASCII letters alone, so É and é differ
+    seed_books([{'title': 'Germinal', 'author': 'Émile Zola', 'category': 'Fiction',
+                 'price': 11.0, 'release_date': date(1885, 3, 2)}])
+    result = BookService.get_books_with_filters(filters={'author': author})
+    assert result == from_sql(BookService.get_books_with_filters, filters={'author': author})
+    assert result['total'] == (1 if author[0] == 'É' else 0)
+
+def test_snapshot_follows_local_writes_incrementally(app):
+    BookService.get_books_with_filters()
+    loads = catalog_snapshot.stats()['full_loads']
+
+    BookService.create_book({'title': 'Emma', 'author': 'Jane Austen', 'category': 'Fiction',
+                             'price': 9.5, 'release_date': '1815-12-23'})
+    BookService.update_book(2, {'price': 5})
+    BookService.delete_book(4)
+
+    result = BookService.get_books_with_filters(sort='price')
+    assert [book['title'] for book in result['books']][:2] == ['Dune', 'Emma']
+    assert result['total'] == 5
+    assert catalog_snapshot.stats()['full_loads'] == loads
+    assert catalog_snapshot.stats()['incremental_loads'] >= 1
+
+def test_snapshot_polls_for_other_writers(app):
+    BookService.get_books_with_filters()
+
+    # A write from another worker only reaches this one through the change feed
+    db.session.execute(db.delete(Book).where(Book.id == 1))
+    db.session.commit()
+    assert BookService.get_books_with_filters()['total'] == 5
+
+    catalog_snapshot.poll_interval = 0
+    assert BookService.get_books_with_filters()['total'] == 4
+
+def test_snapshot_refreshes_once_per_poll(app):
+    BookService.get_books_with_filters()
+    loads = catalog_snapshot.stats()['incremental_loads']
+
+    # Columns present but never checked (a reset racing a reader) is simply due
+    catalog_snapshot.checked_at = None
+    assert BookService.get_books_with_filters()['total'] == 5
+    BookService.get_books_with_filters()
+    assert catalog_snapshot.stats()['incremental_loads'] == loads
+
+def test_change_feed_marker_forces_full_reload(app):
+    BookService.get_books_with_filters()
+    loads = catalog_snapshot.stats()['full_loads']
+    assert BookService.rebuild_change_feed()
+    catalog_snapshot.mark_stale()
+    BookService.get_books_with_filters()
+    assert catalog_snapshot.stats()['full_loads'] == loads + 1
+
+def test_search_filter_falls_back_to_sql(app):
+    result = BookService.get_books_with_filters(filters={'q': 'dune'})
+    assert [book['title'] for book in result['books']] == ['Dune', 'Children of Dune']
+
+@pytest.mark.parametrize('filters, bins', [
+    ({}, 10),
+    ({'author': 'frank herbert'}, 3),
+    ({'min_price': '18', 'max_price': '19'}, 4),
+    ({'category': 'nothing'}, 10),
+])
+def test_snapshot_price_stats_match_sql(app, filters, bins):
+    stats = BookService.get_price_stats(filters, bins)
+    assert stats == from_sql(BookService.get_price_stats, filters, bins)
+
+def test_price_stats_endpoint(app):
+    data = app.test_client().get('/books/stats?bins=2').get_json()
+    assert data['count'] == 5
+    assert data['min'] == 12.99 and data['max'] == 21.0
+    assert data['percentiles']['p50'] == 18.5
+    assert [bucket['count'] for bucket in data['histogram']] == [1, 4]
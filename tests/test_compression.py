@@ -0,0 +1,88 @@
+import gzip
+import json
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from app import create_app
+from app.json_provider import FastJSONProvider
+from app.services.compression import response_compressor
+from conftest import make_config, seed_books
+
+
+@pytest.fixture
+def catalog(app):
+    return seed_books([
+        {'title': f'Book {number}', 'author': 'Ursula K. Le Guin', 'category': 'Science Fiction',
+         'price': 19.99, 'release_date': date(1969, 3, 1), 'description': 'A long description. ' * 20}
+        for number in range(20)
+    ])
+
+def test_gzip_is_negotiated_for_large_responses(client, catalog):
+    plain = client.get('/books?per_page=20&fields=title,description')
+    compressed = client.get('/books?per_page=20&fields=title,description', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert int(compressed.headers['Content-Length']) < len(plain.data) / 5
+    assert gzip.decompress(compressed.data) == plain.data
+
+def test_brotli_is_preferred_when_available(client, catalog):
+    brotli = pytest.importorskip('brotli')
+    response = client.get('/books?per_page=20', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(response.data))['total'] == 20
+
+    response = client.get('/books?per_page=20', headers={'Accept-Encoding': 'gzip, br;q=0'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+def test_small_and_streamed_responses_are_left_alone(client, catalog):
+    response = client.get('/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+    # The export stream gzips itself; it must not be compressed twice
+    response = client.get('/books/export', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(gzip.decompress(response.data).splitlines()) == 20
+
+def test_compressed_cache_hits_keep_conditional_requests(client, catalog):
+    headers = {'Accept-Encoding': 'gzip'}
+    first = client.get('/books?per_page=20', headers=headers)
+    before = response_compressor.stats()['cache']['hits']
+    second = client.get('/books?per_page=20', headers=headers)
+
+    assert second.data == first.data
+    assert response_compressor.stats()['cache']['hits'] - before == 1
+    assert first.headers['ETag'].endswith('-gzip"')
+
+    response = client.get('/books?per_page=20', headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 304
+
+def test_compressed_details_keep_their_own_body_and_etag(client, catalog):
+    headers = {'Accept-Encoding': 'gzip'}
+    first = client.get('/books/1', headers=headers)
+    second = client.get('/books/2', headers=headers)
+    projection = client.get('/books/1?fields=title,description,author,category', headers=headers)
+
+    assert json.loads(gzip.decompress(first.data))['title'] == 'Book 0'
+    assert json.loads(gzip.decompress(second.data))['title'] == 'Book 1'
+    assert set(json.loads(gzip.decompress(projection.data))) == {'id', 'title', 'description', 'author', 'category'}
+    assert len({first.headers['ETag'], second.headers['ETag'], projection.headers['ETag']}) == 3
+    assert first.headers['ETag'] == '"1-1-gzip"'
+
+    response = client.get('/books/1', headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 304
+
+@pytest.mark.parametrize('encoder', ['orjson', 'stdlib'])
+def test_json_encoders_agree(encoder):
+    if encoder == 'orjson':
+        pytest.importorskip('orjson')
+
+    provider = FastJSONProvider(create_app(make_config(JSON_ENCODER=encoder)))
+    assert provider.use_orjson == (encoder == 'orjson')
+
+    data = {'price': Decimal('1.50'), 'released': date(1965, 8, 1), 'at': datetime(2024, 1, 1, 12),
+            'counts': {1: 2}, 'title': 'Dune'}
+    expected = json.loads(json.dumps(data, default=provider.default))
+    assert provider.loads(provider.encode(data)) == expected
+    assert b' ' not in provider.encode({'a': [1, 2]})
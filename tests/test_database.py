@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from app.database import READ_BIND
+from app.services.book_service import BookService
+
+
+@pytest.fixture
+def config_overrides(tmp_path):
+    path = tmp_path / 'library.db'
+    return {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'SQLALCHEMY_READ_DATABASE_URI': f'sqlite:///{path}',
+            'BOOK_CACHE_ENABLED': False}
+
+
+def capture(engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+
+def new_book():
+    return {'title': 'Dune', 'author': 'Frank Herbert', 'category': 'Science Fiction',
+            'price': 18.5, 'release_date': '1965-08-01'}
+
+
+def test_engines_use_separate_pools(app):
+    assert set(db.engines) == {None, READ_BIND}
+    assert db.engines[None].pool is not db.engines[READ_BIND].pool
+    assert db.engines[READ_BIND].pool.size() == app.config['DB_READ_POOL_SIZE']
+
+
+def test_sqlite_pragmas_applied(app):
+    for engine in db.engines.values():
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+            assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 1
+            assert connection.exec_driver_sql('PRAGMA mmap_size').scalar() == app.config['SQLITE_MMAP_SIZE']
+
+
+def test_reads_use_read_bind_and_writes_use_primary(app):
+    primary = capture(db.engines[None])
+    replica = capture(db.engines[READ_BIND])
+
+    book = BookService.create_book(new_book())
+    db.session.commit()
+    assert any(statement.startswith('INSERT') for statement in primary)
+    assert not replica
+
+    primary.clear()
+    db.session.expunge_all()
+    assert BookService.get_book_by_id(book['id'])['title'] == 'Dune'
+    assert BookService.get_books_with_filters(filters={'author': 'frank herbert'})['total'] == 1
+    assert replica and not primary
+
+
+def test_writes_after_read_go_to_primary(app):
+    book = BookService.create_book(new_book())
+    db.session.expunge_all()
+    BookService.get_book_by_id(book['id'])
+
+    primary = capture(db.engines[None])
+    replica = capture(db.engines[READ_BIND])
+    BookService.update_book(book['id'], {'price': 9.99})
+    assert any(statement.startswith('UPDATE') for statement in primary)
+    assert not any(statement.startswith('UPDATE') for statement in replica)
@@ -0,0 +1,68 @@
+import re
+import logging
+import pytest
+from app.services.metrics import request_metrics
+
+
+@pytest.fixture
+def config_overrides():
+    return {'RESPONSE_CACHE_BACKEND': 'none'}
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    request_metrics.endpoints.clear()
+
+
+def scrape(client):
+    """Samples from /metrics as {name{labels}: value}"""
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+    samples = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if line.startswith('#'):
+            assert re.fullmatch(r'# (HELP|TYPE) library_\w+ .+', line)
+            continue
+        name, value = line.rsplit(' ', 1)
+        samples[name] = float(value)
+    return samples
+
+def test_requests_are_recorded_per_route(client, books):
+    client.get('/books/1')
+    client.get('/books/1')
+    client.get('/books/999')
+    samples = scrape(client)
+
+    route = 'method="GET",route="/books/<int:book_id>"'
+    assert samples[f'library_http_requests_total{{{route},status="200"}}'] == 2
+    assert samples[f'library_http_requests_total{{{route},status="404"}}'] == 1
+    assert samples[f'library_http_request_duration_seconds_count{{{route}}}'] == 3
+    assert samples[f'library_http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == 3
+    assert samples[f'library_http_request_sql_queries_total{{{route}}}'] >= 2
+    assert samples[f'library_http_request_sql_seconds_total{{{route}}}'] > 0
+    assert samples[f'library_http_request_serialization_seconds_total{{{route}}}'] > 0
+    assert samples[f'library_http_response_bytes_total{{{route}}}'] > 0
+
+def test_service_stats_are_exported_as_gauges(client, books):
+    client.get('/books/1')
+    samples = scrape(client)
+    assert samples['library_books_misses'] >= 1
+    assert samples['library_compression_enabled'] == 1
+    assert 'library_sql_slow_queries_total' in samples
+
+def test_slow_queries_are_logged(client, books, caplog, monkeypatch):
+    monkeypatch.setattr(request_metrics, 'slow_query_threshold', 0)
+    with caplog.at_level(logging.WARNING, logger='app.slow_queries'):
+        client.get('/books?author=frank herbert')
+
+    assert any('FROM book' in record.getMessage() for record in caplog.records)
+    slow = client.get('/health/stats').get_json()['slow_queries']
+    assert slow['count'] >= 1
+    assert slow['recent'][-1]['endpoint'] is not None
+
+@pytest.mark.parametrize('config_overrides', [{'RESPONSE_CACHE_BACKEND': 'none', 'METRICS_ENABLED': False}])
+def test_metrics_can_be_disabled(client, books):
+    client.get('/books')
+    assert request_metrics.endpoints == {}
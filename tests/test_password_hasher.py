@@ -0,0 +1,72 @@
+import time
+import pytest
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models.user import User
+from app.services.password_hasher import password_hasher, HasherBusyError
+
+
+@pytest.fixture
+def config_overrides():
+    return {'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:2000', 'PASSWORD_HASH_WORKERS': 1, 'PASSWORD_HASH_QUEUE_SIZE': 0}
+
+
+def test_hash_uses_configured_method(app):
+    user = User(email='reader@example.com')
+    user.set_password('Password123')
+    assert user.password_hash.startswith('pbkdf2:sha256:2000$')
+    assert user.check_password('Password123')
+    assert not user.check_password('Password124')
+    assert not user.password_needs_rehash()
+
+
+def test_login_upgrades_outdated_hash(app, client):
+    user = User(email='reader@example.com',
+                password_hash=generate_password_hash('Password123', method='pbkdf2:sha256:1000'))
+    db.session.add(user)
+    db.session.commit()
+    assert user.password_needs_rehash()
+
+    client.post('/users/login', json={'email': 'reader@example.com', 'password': 'Password123'})
+
+    db.session.expire_all()
+    user = db.session.get(User, user.id)
+    assert user.password_hash.startswith('pbkdf2:sha256:2000$')
+    assert user.check_password('Password123')
+
+
+def test_saturated_hasher_returns_503(client):
+    # Take the only slot so the next hash cannot be queued
+    password_hasher.slots.acquire()
+    try:
+        response = client.post('/users/signup', json={'email': 'reader@example.com', 'password': 'Password123'})
+    finally:
+        password_hasher.slots.release()
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert password_hasher.stats()['rejected'] >= 1
+
+
+def test_timed_out_job_keeps_its_slot(app):
+    password_hasher.timeout = 0.05
+    with pytest.raises(HasherBusyError):
+        password_hasher._run(time.sleep, 0.5)
+
+    # The sleep still occupies the only worker, so nothing more may queue behind it
+    with pytest.raises(HasherBusyError, match='Too many'):
+        password_hasher._run(time.sleep, 0)
+    assert password_hasher.stats()['in_flight'] == 1
+
+    time.sleep(0.6)
+    assert password_hasher.stats()['in_flight'] == 0
+    assert password_hasher._run(lambda: 'done') == 'done'
+
+
+def test_login_stats_reported(client):
+    client.post('/users/login', json={'email': 'nobody@example.com', 'password': 'Password123'})
+    stats = client.get('/health/stats').get_json()['auth']
+    assert stats['logins'] >= 1
+    assert stats['p99_ms'] >= stats['p50_ms']
+    assert stats['hasher']['method'] == 'pbkdf2:sha256:2000'
+    assert stats['hasher']['workers'] == 1
@@ -0,0 +1,81 @@
+import pytest
+from app import db
+from app.models.book import Book
+from app.services.book_service import BookService
+from app.services.response_cache import response_cache, cached_response
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def config_overrides(request, tmp_path):
+    return {'RESPONSE_CACHE_BACKEND': request.param, 'RESPONSE_CACHE_PATH': str(tmp_path / 'response_cache.db')}
+
+
+@pytest.fixture(autouse=True)
+def catalog(books):
+    return books
+
+def test_repeated_reads_are_served_from_cache(client):
+    before = response_cache.stats()
+    first = client.get('/books?per_page=5&page=1')
+    second = client.get('/books?page=1&per_page=5')
+    after = response_cache.stats()
+
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == 1
+
+def test_if_none_match_returns_304(client):
+    etag = client.get('/books/1').headers['ETag']
+
+    response = client.get('/books/1', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+def test_writes_change_the_etag(client):
+    etag = client.get('/books/1').headers['ETag']
+
+    BookService.update_book(1, {'price': 9.99})
+
+    response = client.get('/books/1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['price'] == 9.99
+    assert response.headers['ETag'] != etag
+
+@pytest.mark.parametrize('config_overrides', [{'RESPONSE_CACHE_BACKEND': 'memory'}])
+def test_memory_backend_follows_other_workers_writes(client):
+    from app.services.change_feed import book_change_feed
+
+    etag = client.get('/books/1').headers['ETag']
+
+    # Writes from another worker only reach this worker's version through the feed
+    db.session.execute(db.update(Book).where(Book.id == 1).values(price=9.99, version=Book.version + 1))
+    db.session.commit()
+    assert client.get('/books/1', headers={'If-None-Match': etag}).status_code == 304
+
+    book_change_feed.interval = 0
+    response = client.get('/books/1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['price'] == 9.99
+
+def test_errors_are_not_cached(client):
+    assert client.get('/books/99').status_code == 404
+    assert client.get('/books/99').status_code == 404
+    assert 'ETag' not in client.get('/books/99').headers
+
+def test_view_headers_are_replayed_on_hits(app, client):
+    @app.route('/cached-with-headers')
+    @cached_response
+    def view():
+        return {'books': []}, 200, {'Link': '</books?page=2>; rel="next"', 'Vary': 'Accept-Language'}
+
+    first = client.get('/cached-with-headers')
+    before = response_cache.stats()
+    second = client.get('/cached-with-headers')
+
+    assert response_cache.stats()['hits'] - before['hits'] == 1
+    for response in (first, second):
+        assert response.headers['Link'] == '</books?page=2>; rel="next"'
+        assert 'Accept-Language' in response.vary
+        assert response.headers['Content-Type'] == 'application/json'
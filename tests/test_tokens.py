@@ -0,0 +1,102 @@
+import pytest
+from datetime import datetime, timedelta
+from flask_jwt_extended import decode_token
+from sqlalchemy import event
+from app import db
+from app.models.revoked_token import RevokedToken
+from app.services.token_blocklist import token_blocklist, TokenBlocklist
+
+
+@pytest.fixture
+def config_overrides():
+    return {'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000', 'TOKEN_BLOCKLIST_SYNC_INTERVAL': 3600}
+
+
+@pytest.fixture
+def tokens(client):
+    credentials = {'email': 'reader@example.com', 'password': 'Password123'}
+    client.post('/users/signup', json=credentials)
+    return client.post('/users/login', json=credentials).get_json()
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def authorized(client, token):
+    # Any JWT-protected route will do; a missing book is 404 once authenticated
+    return client.delete('/books/999', headers=bearer(token)).status_code != 401
+
+
+def test_login_returns_token_pair(tokens):
+    assert decode_token(tokens['access_token'])['sub'] == str(tokens['user']['id'])
+    refresh = decode_token(tokens['refresh_token'])
+    assert refresh['type'] == 'refresh'
+    assert decode_token(tokens['access_token'])['session'] == refresh['jti']
+
+
+def test_refresh_issues_access_token(client, tokens):
+    response = client.post('/users/refresh', headers=bearer(tokens['refresh_token']))
+    assert response.status_code == 200
+    access_token = response.get_json()['access_token']
+    assert authorized(client, access_token)
+
+
+def test_access_token_cannot_refresh(client, tokens):
+    response = client.post('/users/refresh', headers=bearer(tokens['access_token']))
+    assert response.status_code == 422
+
+
+def test_logout_revokes_session(client, tokens):
+    refreshed = client.post('/users/refresh', headers=bearer(tokens['refresh_token'])).get_json()['access_token']
+    assert authorized(client, tokens['access_token'])
+
+    response = client.post('/users/logout', headers=bearer(tokens['access_token']))
+    assert response.status_code == 204
+
+    assert not authorized(client, tokens['access_token'])
+    assert not authorized(client, refreshed)
+    assert client.post('/users/refresh', headers=bearer(tokens['refresh_token'])).status_code == 401
+    assert db.session.query(RevokedToken).count() == 2
+
+
+def test_revocations_from_other_workers_are_synced(client, tokens):
+    assert authorized(client, tokens['access_token'])
+
+    # Another worker revokes the session; this one only sees it after a sync
+    db.session.add(RevokedToken(jti=decode_token(tokens['refresh_token'])['jti'], token_type='refresh',
+                                expires_at=datetime.utcnow() + timedelta(days=1)))
+    db.session.commit()
+    assert authorized(client, tokens['access_token'])
+
+    token_blocklist.sync()
+    assert not authorized(client, tokens['access_token'])
+
+
+def test_blocklist_check_runs_no_query_between_syncs(app, client, tokens):
+    assert authorized(client, tokens['access_token'])
+
+    statements = []
+    def record(*args):
+        statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        token_blocklist.check_token({}, decode_token(tokens['access_token']))
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert statements == []
+
+
+def test_revocations_after_a_prune_are_synced(app):
+    expires = (datetime.utcnow() + timedelta(hours=1)).timestamp()
+    first, second = TokenBlocklist(), TokenBlocklist()
+    first.revoke({'jti': 'old', 'type': 'access', 'sub': '1', 'exp': expires})
+    second.sync()
+    assert 'old' in second.revoked
+
+    # Pruning the newest row must not let the next revocation reuse its id
+    db.session.execute(db.delete(RevokedToken))
+    db.session.commit()
+    first.revoke({'jti': 'new', 'type': 'access', 'sub': '1', 'exp': expires})
+    second.sync()
+    assert 'new' in second.revoked